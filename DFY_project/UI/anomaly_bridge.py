@@ -0,0 +1,29 @@
+# UI/anomaly_bridge.py
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from engine.anomaly_detector import AnomalyStream
+
+
+class AnomalySignalBridge(QObject):
+    """
+    engine.anomaly_detector.AnomalyStream 이 계산한 이상 탐지 결과를 Qt 시그널로 넘겨준다.
+
+    stream listener 는 sampler 스레드에서 호출되므로, emit 된 시그널은
+    GUI 스레드의 슬롯으로 queued connection 으로 전달된다.
+    → 이상 탐지 페이지는 결과 dict 를 그리기만 하고, 추론은 하지 않는다.
+    """
+
+    result_ready = pyqtSignal(dict)     # get_latest_anomaly() 결과
+
+    def __init__(self, stream: AnomalyStream, parent=None):
+        super().__init__(parent)
+        self._stream = stream
+        self._stream.add_listener(self._on_result)
+
+    def _on_result(self, result: dict) -> None:
+        # sampler 스레드에서 호출됨
+        self.result_ready.emit(result)
+
+    def detach(self) -> None:
+        """윈도우 종료 시 stream listener 를 해제한다."""
+        self._stream.remove_listener(self._on_result)
@@ -1,6 +1,12 @@
-from PyQt5.QtWidgets import QMainWindow, QTabWidget
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QLabel, QMainWindow, QPushButton, QTabWidget
 
-from engine import collector, report_manager
+from engine import analyzer, anomaly_detector, collector, report_manager, metrics_hub, multitask, spike_detector, training_jobs
+
+from UI.anomaly_bridge import AnomalySignalBridge
+from UI.metrics_bridge import MetricsSignalBridge
+from UI.spike_bridge import SpikeSignalBridge
+from UI.training_bridge import TrainingSignalBridge
 
 from UI.pages.dashboard import DashboardPage
 from UI.pages.specs import SpecsPage
@@ -23,13 +29,26 @@ class MainWindow(QMainWindow):
         self.report_manager = report_manager.ReportManager()
         self.specs = collector.get_system_specs()
 
+        # 센서 샘플링은 GUI 스레드 밖의 sampler 스레드가 담당하고,
+        # 페이지들은 hub 구독(각자 주기)으로 값을 받아 읽기만 한다.
+        self.hub = metrics_hub.get_hub()
+        self.monitor_bridge = MetricsSignalBridge(self.hub, every=1, parent=self)
+        # 이상 탐지 추론은 sampler 스레드의 AnomalyStream 이 하고, 페이지는 결과만 받는다
+        self.anomaly_stream = anomaly_detector.get_stream()
+        self.anomaly_bridge = AnomalySignalBridge(self.anomaly_stream, parent=self)
+        # 매 tick 전체 메트릭 스파이크 판정 (감지된 이벤트는 이상 탐지 페이지 목록으로)
+        self.spikes = spike_detector.get_detector()
+        self.spike_bridge = SpikeSignalBridge(self.spikes, parent=self)
+        # 매 tick LSTM 상태를 한 step 씩 진행 (부하 예측은 샘플링 주기로 갱신됨)
+        self.load_stream = analyzer.get_load_stream()
+
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
         self.dashboard_page = DashboardPage(self.specs, self.report_manager)
         self.specs_page = SpecsPage(self.specs)
-        self.monitor_page = MonitorPage()
-        self.anomaly_page = AnomalyPage()
+        self.monitor_page = MonitorPage(self.monitor_bridge)
+        self.anomaly_page = AnomalyPage(self.anomaly_bridge, self.spike_bridge)
         self.report_page = ReportPage(self.report_manager)
         self.game_zone_page = GameZonePage(self.specs)
         self.upgrade_plan_page = UpgradePlanPage(self.specs)
@@ -49,3 +68,63 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.settings_page, "설정")
 
         self.dashboard_page.diagnosis_finished.connect(self.report_page.reload_reports)
+
+        # 모델 학습은 별도 프로세스에서 돌고, 진행 상황만 상태 표시줄로 받는다
+        self.training = training_jobs.get_runner()
+        self.training_bridge = TrainingSignalBridge(self.training, parent=self)
+        self.training_bridge.job_updated.connect(self._on_training_job, Qt.QueuedConnection)
+        self._init_training_status()
+
+        self.hub.start()
+        # AE 모델이 없으면 백그라운드로 학습 시작 (창은 바로 뜨고, 끝나면 이상 탐지가 자동으로 켜짐)
+        self.training.ensure_models()
+
+    def _init_training_status(self):
+        self.training_label = QLabel("")
+        self.training_cancel_btn = QPushButton("학습 취소")
+        self.training_cancel_btn.clicked.connect(lambda: self.training.cancel())
+        self.training_cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.training_label)
+        self.statusBar().addPermanentWidget(self.training_cancel_btn)
+
+    def _on_training_job(self, job: dict):
+        """학습 job 진행 / 종료를 상태 표시줄에 표시."""
+        name = {"ae": "이상 탐지 모델", "lstm": "부하 예측 모델"}.get(job.get("kind"), job.get("kind"))
+        state = job.get("state")
+
+        if state in (training_jobs.PENDING, training_jobs.RUNNING):
+            text = f"{name} 학습 중"
+            if job.get("epochs"):
+                text += f"  epoch {job.get('epoch', 0)}/{job['epochs']}"
+            if job.get("loss") is not None:
+                text += f"  loss {job['loss']:.4f}"
+            if job.get("eta") is not None:
+                text += f"  남은 시간 약 {int(job['eta']) + 1}초"
+            self.training_label.setText(text)
+            self.training_cancel_btn.show()
+            return
+
+        self.training_cancel_btn.setVisible(self.training.is_running())
+        if state == training_jobs.DONE:
+            self.training_label.setText("")
+            self.statusBar().showMessage(f"{name} 학습이 완료되어 적용되었습니다.", 10000)
+        elif state == training_jobs.CANCELLED:
+            self.training_label.setText("")
+            self.statusBar().showMessage(f"{name} 학습이 취소되었습니다.", 10000)
+        else:
+            self.training_label.setText(f"{name} 학습 실패")
+            self.training_label.setToolTip(job.get("error") or "")
+
+    def closeEvent(self, event):
+        self.monitor_bridge.detach()
+        self.anomaly_bridge.detach()
+        self.spike_bridge.detach()
+        self.training_bridge.detach()
+        self.anomaly_stream.detach(self.hub)
+        self.spikes.detach(self.hub)
+        self.load_stream.detach(self.hub)
+        self.hub.stop()
+        anomaly_detector.save_state()
+        multitask.save_state()
+        self.training.shutdown()
+        super().closeEvent(event)
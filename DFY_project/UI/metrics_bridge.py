@@ -0,0 +1,34 @@
+# UI/metrics_bridge.py
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from engine.metrics_hub import MetricsHub
+
+
+class MetricsSignalBridge(QObject):
+    """
+    engine.metrics_hub 구독을 Qt 시그널로 넘겨주는 다리 역할.
+
+    - every  : 샘플 every개마다 한 번 emit (페이지별 갱신 주기)
+    - window : samples_ready 로 넘겨줄 최근 샘플 개수
+
+    hub 콜백은 sampler 스레드에서 호출되므로, emit 된 시그널은
+    GUI 스레드에 있는 위젯 슬롯으로 queued connection 으로 전달된다.
+    → UI 쪽은 넘겨받은 값을 그리기만 하고, 직접 센서를 읽지 않는다.
+    """
+
+    sample_ready = pyqtSignal(dict)     # 최신 샘플 하나
+    samples_ready = pyqtSignal(list)    # 최근 window개 샘플
+
+    def __init__(self, hub: MetricsHub, every: int = 1, window: int = 1, parent=None):
+        super().__init__(parent)
+        self._hub = hub
+        self._sub = self._hub.subscribe(self._on_samples, every=every, window=window)
+
+    def _on_samples(self, samples: list) -> None:
+        # sampler 스레드에서 호출됨
+        self.samples_ready.emit(samples)
+        self.sample_ready.emit(samples[-1])
+
+    def detach(self) -> None:
+        """윈도우 종료 시 hub 구독을 해제한다."""
+        self._hub.unsubscribe(self._sub)
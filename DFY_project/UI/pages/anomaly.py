@@ -1,4 +1,7 @@
-from PyQt5.QtCore import QTimer
+from collections import deque
+from datetime import datetime
+
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -7,9 +10,9 @@ from PyQt5.QtWidgets import (
     QFrame,
 )
 
-import traceback
-
-from engine import anomaly_detector
+from engine.spike_detector import METRIC_LABELS
+from UI.anomaly_bridge import AnomalySignalBridge
+from UI.spike_bridge import SpikeSignalBridge
 
 
 FEATURE_LABELS = {
@@ -23,17 +26,26 @@ FEATURE_LABELS = {
     "net_download": "다운로드 속도",
 }
 
+# 최근 급변 목록에 남겨 둘 스파이크 이벤트 수
+SPIKE_ROWS = 10
+
 
 class AnomalyPage(QWidget):
     """
     스파이크 / 이상 탐지 & AI 부하 예측 페이지
     - Autoencoder 기반 이상도(AE) 결과를 카드 형태로 보여준다.
+    - 결과는 sampler 스레드의 AnomalyStream 이 계산해서 bridge 로 넘겨준다
+      (갱신 주기는 stream 구독 주기, 기본 3샘플). 이 페이지는 그리기만 한다.
+    - 스트리밍 스파이크 탐지기(SpikeDetector)가 감지한 메트릭별 급변을 최근 순으로 보여준다.
     """
 
-    def __init__(self, parent=None):
+    def __init__(self, bridge: AnomalySignalBridge, spike_bridge: SpikeSignalBridge = None, parent=None):
         super().__init__(parent)
+        self._spikes = deque(maxlen=SPIKE_ROWS)
         self._init_ui()
-        self._init_timer()
+        bridge.result_ready.connect(self._update_anomaly_status, Qt.QueuedConnection)
+        if spike_bridge is not None:
+            spike_bridge.events_ready.connect(self._add_spike_events, Qt.QueuedConnection)
 
     # ------------------------------------------------------------------ UI 구성
 
@@ -108,6 +120,18 @@ class AnomalyPage(QWidget):
         )
         layout.addWidget(self.detail_edit, 1)
 
+        # 최근 급변 (스트리밍 스파이크 이벤트)
+        spike_title = QLabel("최근 급변 감지")
+        spike_title.setStyleSheet("font-weight: bold;")
+        layout.addWidget(spike_title)
+
+        self.spike_edit = QTextEdit()
+        self.spike_edit.setReadOnly(True)
+        self.spike_edit.setMaximumHeight(140)
+        self.spike_edit.setStyleSheet(self.detail_edit.styleSheet())
+        self.spike_edit.setPlainText("아직 감지된 급변이 없습니다.")
+        layout.addWidget(self.spike_edit)
+
         # 하단 안내
         note = QLabel(
             "※ 이 화면은 CPU / 메모리 / 디스크 / 온도 등 여러 정보를 종합해서 "
@@ -153,32 +177,23 @@ class AnomalyPage(QWidget):
             detail_lines.append(action_detail.strip())
         self.detail_edit.setPlainText("\n".join(detail_lines))
 
-    # ------------------------------------------------------------------ 타이머 & 업데이트
-
-    def _init_timer(self):
-        self.timer = QTimer(self)
-        self.timer.setInterval(3000)  # 3초마다 갱신
-        self.timer.timeout.connect(self._update_anomaly_status)
-        self.timer.start()
-
-    def _update_anomaly_status(self):
-        """엔진에서 최신 이상 탐지 결과를 가져와 UI를 갱신한다."""
-        try:
-            result = anomaly_detector.get_latest_anomaly()
-        except Exception as e:
-            print("[DFY][AE][UI] get_latest_anomaly()에서 예외 발생:", e)
-            traceback.print_exc()
-
-            self._set_status_ui(
-                color="#e67e22",
-                badge_text="● 비활성화",
-                status_text="AI 이상 탐지 기능에 문제가 발생했습니다.",
-                summary_text="현재는 이상 여부를 분석할 수 없습니다.",
-                main_detail="터미널 로그를 확인한 뒤, 문제가 계속되면 개발자에게 문의해 주세요.",
-                action_detail="프로그램을 다시 실행하거나 나중에 다시 시도해 주세요.",
-            )
-            return
+    # ------------------------------------------------------------------ 업데이트
 
+    def _add_spike_events(self, events: list):
+        """SpikeDetector 이벤트(as_dict)를 최근 목록 맨 위에 붙인다."""
+        for ev in events:
+            self._spikes.appendleft(ev)
+
+        lines = []
+        for ev in self._spikes:
+            t = datetime.fromtimestamp(ev["timestamp"]).strftime("%H:%M:%S")
+            label = METRIC_LABELS.get(ev["key"], ev["key"])
+            arrow = "급상승" if ev["direction"] == "up" else "급하강"
+            lines.append(f"[{t}] {label} {arrow}: {ev['value']:.1f} (직전 기준 {ev['baseline']:.1f})")
+        self.spike_edit.setPlainText("\n".join(lines))
+
+    def _update_anomaly_status(self, result: dict):
+        """엔진(AnomalyStream)이 계산한 최신 이상 탐지 결과로 UI를 갱신한다."""
         status = result.get("status", "DISABLED")
 
         if status == "NORMAL":
@@ -231,6 +246,24 @@ class AnomalyPage(QWidget):
             )
             action_detail = "프로그램을 다시 실행하거나, 문제가 계속되면 개발자에게 문의해 주세요."
 
+        elif status == "TRAINING":
+            color = "#2980b9"
+            badge_text = "● 학습 중"
+            status_text = "AI가 PC 사용 패턴을 학습하고 있습니다."
+            summary_text = "학습이 끝나면 이 화면에서 바로 이상 여부를 분석합니다."
+            job = result.get("training") or {}
+            progress = ""
+            if job.get("epochs"):
+                progress = f"진행: epoch {job.get('epoch', 0)}/{job['epochs']}"
+                if job.get("eta") is not None:
+                    progress += f" (남은 시간 약 {int(job['eta']) + 1}초)"
+            main_detail = (
+                "Autoencoder 모델이 아직 없어 백그라운드에서 학습 중입니다. "
+                "학습 중에도 다른 기능은 그대로 사용할 수 있습니다."
+                + (f"\n\n{progress}" if progress else "")
+            )
+            action_detail = "프로그램을 다시 실행할 필요는 없습니다. 잠시만 기다려 주세요."
+
         elif status == "DISABLED":
             color = "#e67e22"
             badge_text = "● 비활성화"
@@ -1,7 +1,7 @@
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QHBoxLayout
 
-from engine import collector, analyzer, metrics_buffer
+from engine import analyzer, metrics_hub
 
 
 class DashboardPage(QWidget):
@@ -41,10 +41,11 @@ class DashboardPage(QWidget):
         self.btn_run.setEnabled(False)
         self.btn_run.setText("진단 중...")
 
-        metrics = collector.get_current_metrics()
-        history_cpu = metrics_buffer.get_series("cpu_temp")
+        # 센서를 새로 읽지 않고 hub 의 최신 샘플을 사용
+        metrics = metrics_hub.get_hub().current()
 
-        report = analyzer.run_full_diagnosis(self.specs, metrics, history_cpu)
+        # 스파이크 분석은 analyzer 가 버퍼 전체 메트릭을 한 번에 검사한다
+        report = analyzer.run_full_diagnosis(self.specs, metrics)
         self.report_manager.append_report(report)
 
         self.label_score.setText(f"전체 점수: {report['score']}점")
@@ -1,5 +1,5 @@
 # UI/pages/monitor.py
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPainter, QColor, QPen
 from PyQt5.QtWidgets import (
     QWidget,
@@ -8,7 +8,7 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
 )
 
-from engine import collector, metrics_buffer
+from UI.metrics_bridge import MetricsSignalBridge
 
 
 class HistoryGraph(QWidget):
@@ -100,12 +100,15 @@ class MonitorPage(QWidget):
       - CPU 온도 (℃)
       - GPU 온도 (℃)
     를 실시간 라인 그래프로 표시한다.
+
+    샘플링은 engine.sampler 스레드가 담당하고,
+    이 페이지는 bridge 시그널로 넘어온 값을 그리기만 한다.
     """
 
-    def __init__(self):
+    def __init__(self, bridge: MetricsSignalBridge):
         super().__init__()
         self._init_ui()
-        self._init_timer()
+        bridge.sample_ready.connect(self._on_sample, Qt.QueuedConnection)
 
     def _init_ui(self):
         layout = QVBoxLayout()
@@ -133,15 +136,7 @@ class MonitorPage(QWidget):
 
         self.setLayout(layout)
 
-    def _init_timer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._update_metrics)
-        self.timer.start(1000)  # 1초마다 업데이트
-
-    def _update_metrics(self):
-        metrics = collector.get_current_metrics()
-        metrics_buffer.add_sample(metrics)
-
+    def _on_sample(self, metrics: dict):
         cpu_usage = metrics.get("cpu_usage") or 0.0
         ram_usage = metrics.get("ram_usage") or 0.0
         gpu_usage = metrics.get("gpu_usage") or 0.0
@@ -1,6 +1,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QTextEdit, QSplitter
 from PyQt5.QtCore import Qt
 
+from engine.spike_detector import METRIC_LABELS
+
 
 class ReportPage(QWidget):
     def __init__(self, report_manager):
@@ -68,6 +70,10 @@ class ReportPage(QWidget):
             lines.append("")
             lines.append("[스파이크 분석]")
             lines.append(f"- 감지 개수: {len(spike_info.get('indices', []))}")
+            by_metric = spike_info.get("by_metric")
+            if by_metric:
+                counts = ", ".join(f"{METRIC_LABELS.get(k, k)} {c}회" for k, c in by_metric.items())
+                lines.append(f"- 메트릭별: {counts}")
             om = spike_info.get("original_mean")
             cm = spike_info.get("cleaned_mean")
             if om is not None:
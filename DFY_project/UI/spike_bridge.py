@@ -0,0 +1,28 @@
+# UI/spike_bridge.py
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from engine.spike_detector import SpikeDetector
+
+
+class SpikeSignalBridge(QObject):
+    """
+    engine.spike_detector.SpikeDetector 가 tick 마다 감지한 스파이크 이벤트를 Qt 시그널로 넘겨준다.
+
+    detector listener 는 sampler 스레드에서 (스파이크가 있는 tick 에만) 호출되므로,
+    emit 된 시그널은 GUI 스레드의 슬롯으로 queued connection 으로 전달된다.
+    """
+
+    events_ready = pyqtSignal(list)     # [SpikeEvent.as_dict(), ...]
+
+    def __init__(self, detector: SpikeDetector, parent=None):
+        super().__init__(parent)
+        self._detector = detector
+        self._detector.add_listener(self._on_events)
+
+    def _on_events(self, events: list) -> None:
+        # sampler 스레드에서 호출됨
+        self.events_ready.emit([e.as_dict() for e in events])
+
+    def detach(self) -> None:
+        """윈도우 종료 시 detector listener 를 해제한다."""
+        self._detector.remove_listener(self._on_events)
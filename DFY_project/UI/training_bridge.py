@@ -0,0 +1,28 @@
+# UI/training_bridge.py
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from engine.training_jobs import TrainingRunner
+
+
+class TrainingSignalBridge(QObject):
+    """
+    engine.training_jobs 의 job 진행 / 상태 변화를 Qt 시그널로 넘겨준다.
+
+    runner listener 는 모니터 스레드에서 호출되므로, emit 된 시그널은
+    GUI 스레드의 슬롯으로 queued connection 으로 전달된다.
+    """
+
+    job_updated = pyqtSignal(dict)      # job.snapshot()
+
+    def __init__(self, runner: TrainingRunner, parent=None):
+        super().__init__(parent)
+        self._runner = runner
+        self._runner.add_listener(self._on_job)
+
+    def _on_job(self, snapshot: dict) -> None:
+        # 모니터 스레드에서 호출됨
+        self.job_updated.emit(snapshot)
+
+    def detach(self) -> None:
+        """윈도우 종료 시 runner listener 를 해제한다."""
+        self._runner.remove_listener(self._on_job)
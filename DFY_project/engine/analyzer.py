@@ -1,70 +1,179 @@
-import statistics
 from datetime import datetime
-
-from . import metrics_buffer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import (
+    anomaly_detector,
+    cascade,
+    inference_cache,
+    metrics_buffer,
+    metrics_hub,
+    model_registry,
+    multitask,
+    spike_detector,
+)
+from model.bundle import ModelBundle
 from model.predictor import LoadPredictor
 
 
-# -------- 스파이크 감지 (통계 기반) --------
+# -------- 스파이크 감지 (rolling z-score + rolling MAD) --------
 
-def detect_spikes(values, threshold_std=2.5):
-    if not values or len(values) < 5:
+def detect_spikes(values, threshold_std=spike_detector.DEFAULT_Z):
+    """
+    한 시계열의 스파이크 감지 (리포트 호환 형식).
+    판정은 spike_detector.detect_batch 와 같다: 직전 윈도우 기준 rolling z-score 로 후보를 고르고
+    rolling MAD(robust z)로 확정하며, 스파이크 값은 기준선 median 으로 바꾼 cleaned_values 를 돌려준다.
+    """
+    if values is None or len(values) < 5:
         return {
             "indices": [],
             "original_mean": None,
             "cleaned_mean": None,
-            "cleaned_values": values,
+            "cleaned_values": list(values) if values is not None else [],
         }
 
-    mean_val = statistics.mean(values)
-    std_val = statistics.pstdev(values)
+    v = np.asarray(values, dtype=np.float64)
+    batch = spike_detector.detect_batch(v, keys=["value"], z_threshold=threshold_std)
+    cleaned = batch["cleaned"][:, 0]
 
-    if std_val == 0:
-        return {
-            "indices": [],
-            "original_mean": mean_val,
-            "cleaned_mean": mean_val,
-            "cleaned_values": values,
-        }
+    return {
+        "indices": [int(i) for i in batch["rows"]],
+        "original_mean": float(np.nanmean(v)),
+        "cleaned_mean": float(np.nanmean(cleaned)),
+        "cleaned_values": cleaned.tolist(),
+    }
 
-    indices = []
-    cleaned = []
-    for i, v in enumerate(values):
-        if abs(v - mean_val) > threshold_std * std_val:
-            indices.append(i)
-            cleaned.append(mean_val)
-        else:
-            cleaned.append(v)
 
-    cleaned_mean = statistics.mean(cleaned) if cleaned else None
+def detect_buffer_spikes():
+    """
+    버퍼에 있는 전체 메트릭을 한 번에 검사한다 (같은 tick 안에서는 캐시된 결과).
+    반환: cpu_temp 기준 리포트 호환 필드 + "by_metric" ({메트릭: 스파이크 수})
+    리포트에 그대로 저장되므로 버퍼 전체 값(cleaned_values)은 넣지 않는다.
+    """
+    return inference_cache.get_cache().get(("buffer_spikes",), _detect_buffer_spikes)
+
+
+def _detect_buffer_spikes():
+    _, values = metrics_buffer.get_window()
+    if values.shape[0] < 5:
+        return None
+
+    batch = spike_detector.detect_batch(values)
+    col = metrics_buffer.METRIC_KEYS.index("cpu_temp")
+    temp = values[:, col].astype(np.float64)
+    cleaned = batch["cleaned"][:, col]
+    has_temp = bool((~np.isnan(temp)).any())
 
     return {
-        "indices": indices,
-        "original_mean": mean_val,
-        "cleaned_mean": cleaned_mean,
-        "cleaned_values": cleaned,
+        "indices": [int(r) for r, c in zip(batch["rows"], batch["cols"]) if c == col],
+        "original_mean": float(np.nanmean(temp)) if has_temp else None,
+        "cleaned_mean": float(np.nanmean(cleaned)) if has_temp else None,
+        "by_metric": {k: c for k, c in batch["counts"].items() if c},
     }
 
 
 # -------- LSTM LoadPredictor --------
 
-_PREDICTOR: LoadPredictor | None = None
+def _load_predictor(bundle: ModelBundle, manifest: Dict[str, Any]) -> LoadPredictor:
+    """registry 로더: 검증된 "lstm" 번들로 LoadPredictor 를 만든다."""
+    predictor = LoadPredictor(bundle=bundle)
+    print("[DFY] LoadPredictor 로딩 완료")
+    return predictor
+
+
+model_registry.get_registry().register_loader("lstm", _load_predictor)
+
+
+def _get_predictor() -> Optional[LoadPredictor]:
+    """현재 사용할 LoadPredictor (model_registry 의 "lstm" 버전, 없으면 None)."""
+    return model_registry.get_registry().get("lstm")
+
+
+def _advance_load_stream(predictor: LoadPredictor) -> None:
+    """predictor 의 스트리밍 상태를 버퍼의 최신 샘플까지 진행한다 (새 샘플이 없으면 no-op)."""
+    seq, rows = metrics_buffer.get_feature_rows_since(predictor.stream_seq, predictor.seq_len)
+    predictor.stream_update(seq, rows)
+
+
+class LoadForecastStream:
+    """
+    hub 의 매 샘플마다 LSTM 상태를 한 step 씩 진행시켜 두는 구독자.
+    assess_load_risk() 는 이미 계산된 예측을 읽기만 한다.
+    (registry 가 새 버전으로 바꿔 끼우면 새 predictor 는 상태가 없으므로 윈도우로 다시 시작)
+    cascade 게이트가 정상으로 끝낸 tick 은 진행하지 않는다. 다음에 게이트를 넘는 tick 에서
+    놓친 샘플을 보고 최근 윈도우로 상태를 다시 만든다.
+    multitask 모델이 있으면 예측은 그쪽에서 나오므로 LSTM 은 진행하지 않는다.
+    """
+
+    def __init__(self) -> None:
+        self._sub: Optional[metrics_hub.Subscription] = None
 
+    def attach(self, hub: metrics_hub.MetricsHub) -> None:
+        if self._sub is None:
+            self._sub = hub.subscribe(self._on_samples, every=1, window=1)
 
-def _get_predictor() -> LoadPredictor:
-    global _PREDICTOR
-    if _PREDICTOR is None:
-        _PREDICTOR = LoadPredictor()  # internal/model_load_lstm.pth 필요
-        print("[DFY] LoadPredictor 로딩 완료")
-    return _PREDICTOR
+    def detach(self, hub: metrics_hub.MetricsHub) -> None:
+        if self._sub is not None:
+            hub.unsubscribe(self._sub)
+            self._sub = None
+
+    def _on_samples(self, samples: List[Dict[str, Any]]) -> None:
+        # sampler 스레드에서 호출됨 (metrics_buffer 에는 이미 기록된 뒤)
+        predictor = _get_predictor()
+        if predictor is None or multitask.get_detector() is not None:
+            return
+        gate = anomaly_detector.current_gate()
+        if gate is not None and gate["normal"]:
+            return
+        _advance_load_stream(predictor)
+
+
+_load_stream: Optional[LoadForecastStream] = None
+
+
+def get_load_stream() -> LoadForecastStream:
+    """hub 에 연결된 전역 LSTM 스트리밍 예측기."""
+    global _load_stream
+    if _load_stream is None:
+        _load_stream = LoadForecastStream()
+        _load_stream.attach(metrics_hub.get_hub())
+    return _load_stream
 
 
 def assess_load_risk():
+    """
+    LSTM 부하 예측 위험도 (같은 tick 안에서는 inference_cache 의 결과를 공유).
+    cascade 게이트가 정상으로 끝낸 tick 이면 LSTM 을 돌리지 않고 NORMAL 을 돌려준다.
+    multitask 모델이 있으면 이상 탐지와 같은 계산의 예측(load_risk)을 쓴다.
+    """
+    shared = multitask.get_latest()
+    if shared is not None and shared.get("load_risk") is not None:
+        return dict(shared["load_risk"])
+
     predictor = _get_predictor()
-    history = metrics_buffer.get_feature_history()
-    if not history:
+    if predictor is None:
         return None
-    return predictor.assess_risk(history)
+
+    def _assess():
+        gate = anomaly_detector.current_gate()
+        if gate is not None and gate["normal"]:
+            cascade.get_stats().record("lstm_gated")
+            return {
+                "status": "NORMAL",
+                "risk_score": 0.0,
+                "predicted_cpu": None,
+                "current_cpu": None,
+                "tier": "gate",
+            }
+        cascade.get_stats().record("lstm")
+        # hub 구독이 없는 환경(스크립트 등)에서도 여기서 밀린 샘플을 따라잡는다
+        _advance_load_stream(predictor)
+        if predictor.stream_seq is None:
+            return None
+        return predictor.assess_risk_stream()
+
+    return inference_cache.get_cache().get(("lstm", id(predictor)), _assess)
 
 
 # -------- 점수 계산 / 진단 --------
@@ -89,10 +198,36 @@ def _score_from_limits(value, warn, danger, reverse=False):
             return 90
 
 
-def run_full_diagnosis(specs: dict, metrics: dict, history_cpu_temp=None):
-    if history_cpu_temp is None:
-        history_cpu_temp = []
+# 다중 horizon 예측에서 미리 알려 줄 피처: 키 -> (경고 기준, 문구, 단위)
+_FORECAST_LIMITS = {
+    "ram": (90.0, "메모리 사용률이", "%"),
+    "gpu_temp": (85.0, "GPU 온도가", "℃"),
+}
+
 
+def _forecast_issues(forecast: Dict[int, Dict[str, float]]) -> List[str]:
+    """가장 가까운 horizon 부터 보고, 피처마다 처음 기준을 넘는 예측 하나만 알린다."""
+    issues = []
+    for key, (limit, label, unit) in _FORECAST_LIMITS.items():
+        for h in sorted(forecast):
+            v = forecast[h].get(key)
+            if v is not None and v >= limit:
+                issues.append(f"LSTM 예측 결과, 약 {h}초 뒤 {label} {v:.1f}{unit} 수준까지 오를 것으로 보입니다.")
+                break
+    return issues
+
+
+def _spike_issues(spike_info: Dict[str, Any]) -> List[str]:
+    """메트릭별 스파이크 횟수 문구 (history 로 받은 cpu_temp 만 검사했으면 by_metric 이 없다)."""
+    counts = spike_info.get("by_metric") or {"cpu_temp": len(spike_info["indices"])}
+    return [
+        f"최근 {spike_detector.METRIC_LABELS.get(k, k)}에서 급변 패턴이 {c}회 감지되었습니다."
+        for k, c in counts.items()
+        if c
+    ]
+
+
+def run_full_diagnosis(specs: dict, metrics: dict, history_cpu_temp=None):
     issues = []
     score_parts = []
 
@@ -132,14 +267,14 @@ def run_full_diagnosis(specs: dict, metrics: dict, history_cpu_temp=None):
     else:
         score_parts.append(80)
 
-    # 2) CPU 온도 시계열 스파이크 분석
+    # 2) 시계열 스파이크 분석 (history 를 넘기지 않으면 버퍼 전체 메트릭을 한 번에 검사)
     spike_info = None
-    if history_cpu_temp and len(history_cpu_temp) >= 10:
+    if history_cpu_temp is None:
+        spike_info = detect_buffer_spikes()
+    elif len(history_cpu_temp) >= 10:
         spike_info = detect_spikes(history_cpu_temp)
-        if spike_info["indices"]:
-            issues.append(
-                f"최근 CPU 온도에서 급상승 패턴이 {len(spike_info['indices'])}회 감지되었습니다."
-            )
+    if spike_info:
+        issues.extend(_spike_issues(spike_info))
 
     # 3) LSTM 부하 예측 기반 위험도
     load_risk = assess_load_risk()
@@ -158,6 +293,9 @@ def run_full_diagnosis(specs: dict, metrics: dict, history_cpu_temp=None):
                 f"불필요한 작업을 종료하고 냉각 상태를 점검하는 것을 권장합니다."
             )
 
+        # 모든 피처를 예측하는 모델이면 RAM / GPU 온도 포화도 미리 알린다
+        issues.extend(_forecast_issues(load_risk.get("forecast", {})))
+
         penalty = int(risk_score * 10)  # 최대 10점 깎기
         score_parts.append(max(0, 100 - penalty))
 
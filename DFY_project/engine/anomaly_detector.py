@@ -1,64 +1,97 @@
 # engine/anomaly_detector.py
 
-import json
+import threading
 import traceback
 from pathlib import Path
-from typing import Optional, Dict, Any
-
-import torch
-
-from model.dataset import FEATURE_KEYS
-from model.ae_model import LoadAutoencoder
-from engine import collector
-
-# 전역 상태
-_ae_detector: Optional["AEDetector"] = None
+from typing import Callable, List, Optional, Dict, Any
+
+import numpy as np
+
+from model.bundle import ModelBundle
+from model.features import FEATURE_KEYS
+from model.numpy_infer import NumpySequenceAutoencoder, load_autoencoder
+from engine import (
+    cascade,
+    inference_cache,
+    metrics_buffer,
+    metrics_hub,
+    model_registry,
+    score_thresholds,
+    training_jobs,
+)
+
+# 추론 중 오류 이유 (모델 로드 실패 이유는 model_registry 가 들고 있음)
 _ae_error_reason: Optional[str] = None
 
+# 이상 탐지 페이지 갱신 주기 (샘플 수)
+STREAM_EVERY = 3
+
 
 class AEDetector:
     """
     Autoencoder 기반 실시간 이상 탐지기.
 
     - 입력: 현재 시점의 metrics(dict)
-    - 출력: reconstruction error + NORMAL/WARN/CRITICAL 상태
+    - 출력: reconstruction error + 피처별 재구성 오차 + NORMAL/WARN/CRITICAL 상태
+    - 임계값: 실시간 정상 점수의 p99 / p99.9 기반 (score_thresholds.AdaptiveThresholds),
+      학습 때 정한 mean + k·std 값이 하한. 점수가 충분히 쌓이기 전에는 그 값을 그대로 쓴다.
+    - cascade: 먼저 피처별 z-score 게이트(cascade.ZScoreGate)로 보고, 모든 피처가
+      평균 ± gate_z·std 안이면 AE 없이 NORMAL 로 끝낸다.
+      그런 tick 도 AUDIT_EVERY 번에 한 번은 AE 를 돌려서, 분위수 스케치에는
+      게이트 결과와 상관없는 고른 표본(audit tick)만 들어가게 한다.
+    - 윈도우 AE 번들(arch type "sequence")이면 점수는 버퍼 최근 seq_len 시점의 평균 재구성 오차.
+      층별 최근 입력을 캐시해 두고 tick 마다 새 행만 step 으로 계산한다 (stream_update).
+      시간 패턴 이상은 피처 값이 게이트 범위 안에서도 생기므로 게이트로 건너뛰지 않고,
+      매 tick 의 정상 점수를 분위수 스케치에 넣는다.
     """
 
-    def __init__(self, model_path: Path, thresholds_path: Path, device: str = "cpu") -> None:
-        self.device = device
-
-        # 1) 임계값 / 통계 로드
-        with thresholds_path.open("r", encoding="utf-8") as f:
-            th = json.load(f)
-
-        self.feature_keys = th.get("feature_keys", FEATURE_KEYS)
-        self.feature_mean = torch.tensor(th["feature_mean"], dtype=torch.float32)
-        self.feature_std = torch.tensor(th["feature_std"], dtype=torch.float32)
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        device: str = "cpu",
+        version: Optional[str] = None,
+        thresholds_path: Optional[Path] = score_thresholds.STATE_PATH,
+        gate_z: float = cascade.GATE_Z,
+    ) -> None:
+        # device 는 호환용 (추론은 NumPy 로 CPU 에서 한다)
+        self.device = "cpu"
+
+        # 1) 임계값 / 통계 (번들 header)
+        th = bundle.thresholds
+        self.feature_keys = bundle.feature_keys
+        self.feature_mean = np.asarray(bundle.feature_mean, dtype=np.float32)
+        self.feature_std = np.maximum(np.asarray(bundle.feature_std, dtype=np.float32), 1e-6)
         self.error_mean = float(th["error_mean"])
         self.error_std = float(th["error_std"])
         self.warn_threshold = float(th["warn_threshold"])
         self.critical_threshold = float(th["critical_threshold"])
-        self.num_samples = int(th.get("num_samples", 0))
-
-        self.feature_std = torch.clamp(self.feature_std, min=1e-6)
-
-        # 2) AE 모델 로드
-        input_dim = len(self.feature_keys)
-        self.model = LoadAutoencoder(
-            input_dim=input_dim,
-            hidden_dim=32,
-            code_dim=8,
-        ).to(self.device)
-
-        state = torch.load(model_path, map_location=self.device)
-        self.model.load_state_dict(state)
-        self.model.eval()
+        self.num_samples = int(bundle.metadata.get("num_samples", 0))
+        self.adaptive = score_thresholds.AdaptiveThresholds(
+            version, self.warn_threshold, self.critical_threshold, path=thresholds_path
+        )
+
+        # 2) AE 모델: 번들 가중치(mmap view)로 NumPy forward (torch 불필요)
+        self.model = load_autoencoder(bundle)
+        self.is_sequence = isinstance(self.model, NumpySequenceAutoencoder)
+
+        # 윈도우 AE 스트리밍 상태 (버퍼 sequence 기준)
+        self._stream_lock = threading.Lock()
+        self.stream_seq: Optional[int] = None
+        self._stream_state = None
+        self._stream_count = 0                  # 마지막 재구성 이후 진행한 시점 수
+        self._stream_errors: Optional[np.ndarray] = None   # (<= seq_len, F) 시점별 제곱 오차
+        self._stream_codes: Optional[np.ndarray] = None    # (<= seq_len, code) 같은 시점들의 encoder 코드
+        self.stream_stats = {"steps": 0, "rebuilds": 0}
+
+        # 3) cascade 0단계 게이트 (같은 표준화 통계 사용)
+        self.gate = cascade.ZScoreGate(self.feature_mean, self.feature_std, gate_z, self.feature_keys)
+        self._ticks = 0
 
     # ---- 내부 유틸 ----
 
-    def _metrics_to_vector(self, metrics: Dict[str, Any]) -> torch.Tensor:
+    def _metrics_to_vector(self, metrics: Dict[str, Any]) -> np.ndarray:
         """
-        collector.get_current_metrics() 결과(dict)를 AE 입력 벡터로 변환.
+        metrics_hub 샘플(dict, collector.get_current_metrics() 포맷)을 AE 입력 벡터로 변환.
         FEATURE_KEYS 순서를 그대로 사용한다.
         """
         def get_val(key: str) -> float:
@@ -81,104 +114,248 @@ class AEDetector:
                 return 0.0
 
         vec = [get_val(k) for k in self.feature_keys]
-        x = torch.tensor(vec, dtype=torch.float32)
-        return x
+        return np.asarray(vec, dtype=np.float32)
+
+    def _feature_errors(self, x: np.ndarray) -> np.ndarray:
+        """단일 샘플 x (feature_dim,) 의 피처별 제곱 재구성 오차 (정규화 공간)."""
+        x_norm = ((x - self.feature_mean) / self.feature_std)[None, :]
+        diff = self.model(x_norm) - x_norm
+        return (diff * diff)[0]
 
-    def _compute_error(self, x: torch.Tensor) -> float:
+    def _compute_error(self, x: np.ndarray) -> float:
         """
         단일 샘플 x (feature_dim,) 에 대한 reconstruction error 계산.
         """
-        x_norm = (x - self.feature_mean) / self.feature_std
-        x_norm = x_norm.to(self.device).unsqueeze(0)  # (1, F)
+        return float(self._feature_errors(x).mean())
+
+    def _current_vector(self, metrics: Dict[str, Any]) -> np.ndarray:
+        # 버퍼의 최신 피처 행을 그대로 사용 (FEATURE_KEYS 순서가 같을 때)
+        window = metrics_buffer.get_feature_window(1)
+        if window is not None and list(self.feature_keys) == FEATURE_KEYS:
+            return window[-1]
+        return self._metrics_to_vector(metrics)
+
+    def _window_errors(self) -> Optional[np.ndarray]:
+        if self._stream_errors is None or self._stream_errors.shape[0] == 0:
+            return None
+        return self._stream_errors.mean(axis=0)
 
-        with torch.no_grad():
-            recon = self.model(x_norm)
-            err = ((recon - x_norm) ** 2).mean().item()
+    # ---- 윈도우 AE 스트리밍 ----
 
-        return float(err)
+    def stream_update(self, seq: int, rows: np.ndarray) -> Optional[np.ndarray]:
+        """
+        버퍼에 새로 들어온 피처 행들로 윈도우 AE 를 진행하고 피처별 윈도우 오차 (F,) 를 반환.
+
+        - seq  : rows 마지막 행의 버퍼 sequence (metrics_buffer.get_feature_rows_since)
+        - rows : stream_seq 이후의 행들 (최신 쪽 최대 span 개)
+        처음이거나 중간 샘플을 놓쳤으면 있는 행(최대 span)으로 다시 계산하고,
+        아니면 새 행만 step 한다. receptive field 가 유한해서 두 결과는 같다.
+        아직 receptive_field 행이 안 쌓였으면 None.
+        """
+        model = self.model
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, len(self.feature_keys))
+        with self._stream_lock:
+            if (self.stream_seq is not None and seq <= self.stream_seq) or rows.shape[0] == 0:
+                return self._window_errors()
+
+            x = (rows - self.feature_mean) / self.feature_std
+            warm = model.receptive_field - 1
+            n_new = None if self.stream_seq is None else seq - self.stream_seq
+            if n_new is None or n_new > rows.shape[0] or n_new >= model.span:
+                x = x[-model.span :]
+                recon, codes, self._stream_state = model.run_codes(x)
+                self._stream_errors = ((recon - x) ** 2)[warm:][-model.seq_len :]
+                self._stream_codes = codes[warm:][-model.seq_len :]
+                self._stream_count = x.shape[0]
+                self.stream_stats["rebuilds"] += 1
+            else:
+                state = self._stream_state
+                new_errors, new_codes = [], []
+                for r in x[-n_new:]:
+                    recon, code, state = model.step_codes(r, state)
+                    self._stream_count += 1
+                    if self._stream_count > warm:
+                        new_errors.append((recon - r) ** 2)
+                        new_codes.append(code)
+                self._stream_state = state
+                if new_errors:
+                    self._stream_errors = np.concatenate([self._stream_errors, new_errors])[-model.seq_len :]
+                    self._stream_codes = np.concatenate([self._stream_codes, new_codes])[-model.seq_len :]
+                self.stream_stats["steps"] += n_new
+
+            self.stream_seq = seq
+            return self._window_errors()
+
+    def stream_reset(self) -> None:
+        """윈도우 AE 스트리밍 상태를 버린다 (다음 stream_update 에서 버퍼로 다시 계산)."""
+        with self._stream_lock:
+            self.stream_seq = None
+            self._stream_state = None
+            self._stream_count = 0
+            self._stream_errors = None
+            self._stream_codes = None
 
     # ---- 외부 인터페이스 ----
 
+    def gate_current(self) -> Dict[str, Any]:
+        """버퍼 최신 샘플의 게이트 판정만 ({"normal", "max_z", "feature"}, 샘플이 없으면 normal=False)."""
+        window = metrics_buffer.get_feature_window(1)
+        if window is None or list(self.feature_keys) != FEATURE_KEYS:
+            return {"normal": False, "max_z": None, "feature": None}
+        return self.gate.evaluate(window[-1])
+
     def assess_current_state(self) -> Dict[str, Any]:
         """
-        현재 collector의 실시간 metrics를 읽어와
-        reconstruction error와 상태를 반환한다.
+        metrics_hub 의 최신 샘플을 읽어와
+        (게이트를 넘으면) reconstruction error와 상태를 반환한다.
+        (센서를 직접 다시 읽지 않으므로 디스크/네트워크 델타가 깨지지 않는다)
         """
-        metrics = collector.get_current_metrics()
-        x = self._metrics_to_vector(metrics)
-        score = self._compute_error(x)
+        metrics = metrics_hub.get_hub().current()
+        x = self._current_vector(metrics)
+        gate = self.gate.evaluate(x)
+        self._ticks += 1
+        audit = self._ticks % cascade.AUDIT_EVERY == 0
+        th = self.adaptive.current()
+
+        result = {
+            "warn_threshold": th["warn_threshold"],
+            "critical_threshold": th["critical_threshold"],
+            "threshold_source": th["source"],
+            "threshold_samples": th["samples"],
+            "error_mean": self.error_mean,
+            "error_std": self.error_std,
+            "num_samples": self.num_samples,
+            "max_z": gate["max_z"],
+            "max_z_feature": gate["feature"],
+            "metrics": metrics,
+        }
+        if self.is_sequence:
+            seq, rows = metrics_buffer.get_feature_rows_since(self.stream_seq, self.model.span)
+            errors = self.stream_update(seq, rows)
+            if errors is None:
+                # 윈도우를 채울 행이 아직 부족함 (시작 직후 receptive_field 초)
+                result.update({"status": "NORMAL", "score": None, "tier": "warmup"})
+                return result
+            # 게이트를 건너뛰고 모든 tick 을 계산하므로 스케치도 매 tick 갱신
+            # (gate / audit 통계를 흐리지 않게 tier 는 따로 센다)
+            audit = True
+            tier = "sequence"
+        elif gate["normal"] and not audit:
+            cascade.get_stats().record("gate")
+            result.update({"status": "NORMAL", "score": None, "tier": "gate"})
+            return result
+        else:
+            errors = self._feature_errors(x)
+            tier = "audit" if gate["normal"] else "ae"
 
-        if score >= self.critical_threshold:
+        cascade.get_stats().record(tier)
+        score = float(errors.mean())
+
+        # 이번 점수를 넣기 전의 분포로 판정하고, audit tick 의 정상 점수만 스케치에 반영
+        # (WARN / CRITICAL 점수까지 넣으면 이상이 이어질수록 임계값이 따라 올라간다)
+        if audit and score < th["warn_threshold"]:
+            self.adaptive.update(score)
+        if score >= th["critical_threshold"]:
             status = "CRITICAL"
-        elif score >= self.warn_threshold:
+        elif score >= th["warn_threshold"]:
             status = "WARN"
         else:
             status = "NORMAL"
 
-        return {
+        result.update({
             "status": status,
             "score": score,
-            "warn_threshold": self.warn_threshold,
-            "critical_threshold": self.critical_threshold,
-            "error_mean": self.error_mean,
-            "error_std": self.error_std,
-            "num_samples": self.num_samples,
-            "metrics": metrics,
-        }
+            "tier": tier,
+            "feature_errors": {k: float(e) for k, e in zip(self.feature_keys, errors)},
+        })
+        return result
 
 
 # ----------------------------------------------------------------------
-# 전역 detector 관리
+# detector 관리 (model_registry 의 "ae" 버전)
 # ----------------------------------------------------------------------
 
-def _init_detector_if_needed() -> Optional[AEDetector]:
+def _load_detector(bundle: ModelBundle, manifest: Dict[str, Any]) -> AEDetector:
+    """registry 로더: 검증된 "ae" 번들로 AEDetector 를 만든다."""
+    return AEDetector(bundle, version=manifest.get("version"))
+
+
+model_registry.get_registry().register_loader("ae", _load_detector)
+
+
+def get_detector() -> Optional[AEDetector]:
     """
-    모듈 전역으로 AEDetector를 lazy-init 한다.
+    현재 사용할 AEDetector (없으면 None).
+    새 버전이 publish / rollback 되면 registry 가 백그라운드에서 로드해 바꿔 끼우므로,
+    호출할 때마다 최신 detector 를 받는다 (재시작 불필요).
     """
-    global _ae_detector, _ae_error_reason
+    return model_registry.get_registry().get("ae")
 
-    if _ae_detector is not None:
-        return _ae_detector
 
-    root = Path(__file__).resolve().parents[1]
-    model_path = root / "internal" / "model_autoencoder.pth"
-    th_path = root / "internal" / "ae_thresholds.json"
-
-    if not model_path.exists() or not th_path.exists():
-        _ae_error_reason = f"AE 모델 또는 임계값 파일이 없습니다: {model_path.name}, {th_path.name}"
-        print("[DFY][AE] Failed to initialize AEDetector:", _ae_error_reason)
+def current_gate() -> Optional[Dict[str, Any]]:
+    """
+    이번 tick 의 게이트 판정 (AE 모델이 없으면 None).
+    LSTM 같은 다른 탐지기도 이 결과로 건너뛸지 정한다 (tick 당 한 번만 계산).
+    """
+    det = get_detector()
+    if det is None:
         return None
+    return inference_cache.get_cache().get(("gate", id(det)), det.gate_current)
 
-    try:
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        _ae_detector = AEDetector(model_path, th_path, device=device)
-        _ae_error_reason = None
-        print("[DFY][AE] AEDetector initialized.")
-        return _ae_detector
-    except Exception as e:
-        _ae_detector = None
-        _ae_error_reason = str(e)
-        print("[DFY][AE] Failed to initialize AEDetector:", e)
-        traceback.print_exc()
-        return None
+
+def save_state() -> None:
+    """현재 detector 의 분위수 스케치 상태를 저장한다 (앱 종료 시 호출)."""
+    det = model_registry.get_registry().get("ae")
+    if det is not None:
+        det.adaptive.save()
 
 
 def get_latest_anomaly() -> Dict[str, Any]:
     """
-    UI에서 주기적으로 호출하는 함수.
+    이번 tick 의 이상 탐지 결과 (UI 는 AnomalyStream 이 계산해 둔 결과를 받는다).
     - 항상 dict 하나를 반환하도록 하고, 내부 에러는 여기서 처리.
+    - 같은 샘플(tick)에서 다시 부르면 inference_cache 의 결과를 그대로 돌려준다.
+    - multitask 모델이 있으면 그 결과(부하 예측과 같은 계산)를 그대로 쓴다.
     """
     global _ae_error_reason
 
-    det = _init_detector_if_needed()
+    # engine.multitask 가 이 모듈의 AEDetector 를 상속하므로 순환 import 를 피해 여기서 가져온다
+    from engine import multitask
+
+    try:
+        shared = multitask.get_latest()
+    except Exception as e:
+        shared = None
+        print("[DFY][MT] multitask 추론 오류, AE 로 대신합니다:", e)
+        traceback.print_exc()
+    if shared is not None:
+        return shared
+
+    registry = model_registry.get_registry()
+    # 이번 tick 은 이 detector 하나로 끝까지 계산한다 (도중에 교체돼도 섞이지 않음)
+    det = get_detector()
     if det is None:
+        reason = registry.error("ae")
+        job = training_jobs.get_runner().current("ae")
+        if job is not None and job.running:
+            # 모델이 없어서 백그라운드 학습 중: publish 되면 다음 호출에서 바로 올라온다
+            return {
+                "status": "TRAINING",
+                "reason": reason or "ae_training",
+                "training": job.snapshot(),
+            }
         return {
             "status": "DISABLED",
-            "reason": _ae_error_reason or "ae_not_available",
+            "reason": reason or "ae_not_available",
         }
 
+    def _assess() -> Dict[str, Any]:
+        result = det.assess_current_state()
+        result["model_version"] = registry.loaded_version("ae")
+        return result
+
     try:
-        return det.assess_current_state()
+        return inference_cache.get_cache().get(("ae", id(det)), _assess)
     except Exception as e:
         _ae_error_reason = str(e)
         print("[DFY][AE] get_latest_anomaly() 내부 오류:", e)
@@ -187,3 +364,76 @@ def get_latest_anomaly() -> Dict[str, Any]:
             "status": "ERROR",
             "reason": _ae_error_reason,
         }
+
+
+AnomalyListener = Callable[[Dict[str, Any]], None]
+
+
+class AnomalyStream:
+    """
+    hub 의 every 샘플마다 get_latest_anomaly() 를 계산해 두는 구독자.
+    게이트 / AE / 윈도우 AE / multitask 추론과 분위수 스케치 갱신이 모두 sampler 스레드에서 끝나고,
+    UI 는 listener 로 넘겨받은 결과 dict 를 그리기만 한다.
+    """
+
+    def __init__(self, every: int = STREAM_EVERY) -> None:
+        self.every = max(1, int(every))
+        self._lock = threading.Lock()
+        self._listeners: List[AnomalyListener] = []
+        self._latest: Optional[Dict[str, Any]] = None
+        self._sub: Optional[metrics_hub.Subscription] = None
+
+    def attach(self, hub: metrics_hub.MetricsHub) -> None:
+        if self._sub is None:
+            self._sub = hub.subscribe(self._on_samples, every=self.every, window=1)
+
+    def detach(self, hub: metrics_hub.MetricsHub) -> None:
+        if self._sub is not None:
+            hub.unsubscribe(self._sub)
+            self._sub = None
+
+    def add_listener(self, cb: AnomalyListener) -> None:
+        with self._lock:
+            if cb not in self._listeners:
+                self._listeners.append(cb)
+
+    def remove_listener(self, cb: AnomalyListener) -> None:
+        with self._lock:
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """마지막으로 계산된 결과 (아직 없으면 None)."""
+        with self._lock:
+            return self._latest
+
+    def _on_samples(self, samples: List[Dict[str, Any]]) -> None:
+        # sampler 스레드에서 호출됨 (metrics_buffer 에는 이미 기록된 뒤)
+        try:
+            result = get_latest_anomaly()
+        except Exception as e:
+            print("[DFY][AE] AnomalyStream 오류:", e)
+            traceback.print_exc()
+            result = {"status": "ERROR", "reason": str(e)}
+
+        with self._lock:
+            self._latest = result
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(result)
+            except Exception:
+                print("[DFY][AE] AnomalyStream listener 오류")
+                traceback.print_exc()
+
+
+_stream: Optional[AnomalyStream] = None
+
+
+def get_stream() -> AnomalyStream:
+    """hub 에 연결된 전역 이상 탐지 구독자."""
+    global _stream
+    if _stream is None:
+        _stream = AnomalyStream()
+        _stream.attach(metrics_hub.get_hub())
+    return _stream
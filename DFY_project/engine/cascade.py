@@ -0,0 +1,93 @@
+# engine/cascade.py
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from model.features import FEATURE_KEYS
+
+# 1차 판정: 모든 피처가 학습 분포의 평균 ± GATE_Z·std 안이면 "확실히 정상"
+GATE_Z = 2.0
+# 게이트가 정상으로 끝낸 tick 중에서도 이 간격마다 한 번은 AE 를 돌린다
+# (분위수 임계값이 게이트를 통과한 tick 까지 고르게 보도록 하는 표본)
+AUDIT_EVERY = 10
+
+
+class ZScoreGate:
+    """
+    cascade 0단계: 피처별 z-score 범위 검사 (벡터 연산 한 번).
+
+    AE 번들의 feature_mean / feature_std 를 그대로 쓴다.
+    모든 |z| 가 z_limit 이하면 normal=True 로, AE / LSTM 을 건너뛰어도 되는 tick 이다.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        std: np.ndarray,
+        z_limit: float = GATE_Z,
+        feature_keys: Sequence[str] = FEATURE_KEYS,
+    ) -> None:
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.inv_std = 1.0 / np.maximum(np.asarray(std, dtype=np.float32), 1e-6)
+        self.z_limit = float(z_limit)
+        self.feature_keys = list(feature_keys)
+
+    def evaluate(self, x: np.ndarray) -> Dict[str, Any]:
+        """x: (F,) 원래 단위 피처 → {"normal", "max_z", "feature"}."""
+        z = np.abs((np.asarray(x, dtype=np.float32) - self.mean) * self.inv_std)
+        i = int(z.argmax())
+        return {"normal": bool(z[i] <= self.z_limit), "max_z": float(z[i]), "feature": self.feature_keys[i]}
+
+
+class CascadeStats:
+    """
+    tier 별로 몇 번 끝났는지 센다.
+
+    - gate       : 게이트에서 정상으로 끝남 (AE 안 돌림)
+    - audit      : 게이트는 정상이었지만 표본으로 AE 를 돌림
+    - ae         : 게이트를 넘어서 AE 까지 올라감
+    - sequence   : 윈도우 AE 라서 게이트 없이 매 tick 계산함 (gate / audit 비율에서 뺀다)
+    - lstm       : LSTM 예측까지 올라감
+    - lstm_gated : 게이트 덕분에 LSTM 을 건너뜀
+    """
+
+    TIERS = ("gate", "audit", "ae", "sequence", "lstm", "lstm_gated")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {t: 0 for t in self.TIERS}
+
+    def record(self, tier: str) -> None:
+        with self._lock:
+            self._counts[tier] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = {t: 0 for t in self.TIERS}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        ae_total = counts["gate"] + counts["audit"] + counts["ae"]
+        lstm_total = counts["lstm"] + counts["lstm_gated"]
+        scored = ae_total + counts["sequence"]
+        return {
+            "counts": counts,
+            # 게이트를 거친 AE 판정 중 게이트에서 끝난 비율 / LSTM 을 건너뛴 비율
+            "gate_rate": counts["gate"] / ae_total if ae_total else 0.0,
+            "lstm_skip_rate": counts["lstm_gated"] / lstm_total if lstm_total else 0.0,
+            # 이상 탐지 판정 중 게이트 없이 윈도우 AE 로 계산한 비율
+            "sequence_rate": counts["sequence"] / scored if scored else 0.0,
+        }
+
+
+_stats: Optional[CascadeStats] = None
+
+
+def get_stats() -> CascadeStats:
+    """AE / LSTM 이 같이 쓰는 전역 tier 통계."""
+    global _stats
+    if _stats is None:
+        _stats = CascadeStats()
+    return _stats
@@ -2,7 +2,9 @@
 import platform
 import os
 import time
+from dataclasses import dataclass, asdict
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 import psutil
 
@@ -96,15 +98,37 @@ def get_system_specs():
 
 
 # ---------- 내부: 센서 읽기 도우미 ----------
-
-def _get_cpu_temp_psutil():
-    """psutil로 CPU 온도 하나 가져오기 (안 되면 None)."""
+#
+# 한 틱(tick)에서 각 센서 소스는 딱 한 번만 읽는다.
+# (GPUtil.getGPUs()는 매번 nvidia-smi 프로세스를 띄우므로 특히 비싸다)
+# 아래 _read_* 함수들은 "원본"을 한 번 읽어오고,
+# _get_* 함수들은 이미 읽어온 원본에서 값만 뽑는다.
+
+def _read_temperatures():
+    """psutil.sensors_temperatures() 결과를 한 번 읽어옴 (안 되면 None)."""
     if not hasattr(psutil, "sensors_temperatures"):
         return None
     try:
-        temps = psutil.sensors_temperatures()
+        return psutil.sensors_temperatures()
+    except Exception:
+        return None
+
+
+def _read_primary_gpu():
+    """GPUtil로 첫 번째 GPU 객체 하나를 가져옴 (안 되면 None)."""
+    if GPUtil is None:
+        return None
+    try:
+        gpus = GPUtil.getGPUs()
     except Exception:
         return None
+    if not gpus:
+        return None
+    return gpus[0]
+
+
+def _get_cpu_temp_psutil(temps):
+    """이미 읽어온 온도 정보에서 CPU 온도 하나 가져오기 (안 되면 None)."""
     if not temps:
         return None
 
@@ -118,40 +142,44 @@ def _get_cpu_temp_psutil():
     return None
 
 
-def _get_gpu_temp_psutil():
-    """GPUtil로 GPU 온도 하나 가져오기 (안 되면 None)."""
-    if GPUtil is None:
+def _get_gpu_temp_psutil(gpu):
+    """이미 읽어온 GPU 객체에서 온도 하나 가져오기 (안 되면 None)."""
+    if gpu is None:
         return None
     try:
-        gpus = GPUtil.getGPUs()
-    except Exception:
+        return float(gpu.temperature)
+    except (TypeError, ValueError):
         return None
-    if not gpus:
-        return None
-    return float(gpus[0].temperature)
 
 
-def _get_gpu_usage_psutil():
-    """GPUtil로 GPU 사용률 하나 가져오기 (안 되면 None)."""
-    if GPUtil is None:
+def _get_gpu_usage_psutil(gpu):
+    """이미 읽어온 GPU 객체에서 사용률 하나 가져오기 (안 되면 None)."""
+    if gpu is None:
         return None
     try:
-        gpus = GPUtil.getGPUs()
-    except Exception:
-        return None
-    if not gpus:
+        return float(gpu.load * 100.0)
+    except (TypeError, ValueError):
         return None
-    return float(gpus[0].load * 100.0)
 
 
-def _get_disk_net_rates():
+def _get_system_drive_usage():
+    """시스템 드라이브(C:) 사용률 % (실패하면 0.0)."""
+    try:
+        system_drive = os.getenv("SystemDrive", "C:") + "\\"
+        return psutil.disk_usage(system_drive).percent
+    except Exception:
+        return 0.0
+
+
+def _get_disk_net_rates(now=None):
     """
     디스크/네트워크 속도를 MB/s 단위로 근사 계산.
     이전 호출과의 차이로 계산하며, 최초 호출 시에는 0으로 리턴.
     """
     global _last_disk_io, _last_net_io, _last_io_time
 
-    now = time.time()
+    if now is None:
+        now = time.time()
     try:
         disk = psutil.disk_io_counters()
         net = psutil.net_io_counters()
@@ -188,10 +216,81 @@ def _get_disk_net_rates():
 
 # ---------- 실시간 상태 (모니터링/대시보드/엔진에서 사용) ----------
 
+@dataclass(frozen=True)
+class SensorSnapshot:
+    """
+    한 틱에서 읽은 모든 센서 값을 묶은 불변(immutable) 스냅샷.
+
+    collect_snapshot() 한 번에 각 소스(psutil / GPUtil)를 한 번씩만 읽고,
+    여러 소비자(모니터, 버퍼, 이상 탐지)는 같은 스냅샷을 공유한다.
+    필드 의미는 get_current_metrics() 설명과 같다.
+    """
+
+    timestamp: float
+    cpu_usage: float
+    ram_usage: float
+    disk_usage: float
+    disk_read: float
+    disk_write: float
+    net_upload: float
+    net_download: float
+    net_sent_mb: float
+    net_recv_mb: float
+    cpu_temp: Optional[float]
+    gpu_temp: Optional[float]
+    gpu_usage: Optional[float]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """기존 get_current_metrics() 와 같은 dict 형태로 변환 (리포트 JSON 저장용)."""
+        return asdict(self)
+
+
+def collect_snapshot() -> SensorSnapshot:
+    """
+    모든 센서 소스를 한 번씩만 읽어서 SensorSnapshot 하나로 돌려준다.
+
+    psutil.Process.oneshot() 처럼, 같은 틱 안에서는 원본을 한 번만 가져오고
+    파생 값(GPU 온도/사용률 등)은 그 원본을 공유해서 계산한다.
+    → 한 틱 = GPU 쿼리 1회 (기존에는 2회 이상)
+    """
+    now = time.time()
+
+    # CPU / RAM
+    cpu_usage = psutil.cpu_percent(interval=None)
+    vm = psutil.virtual_memory()
+
+    # 디스크 사용률 (시스템 드라이브 기준)
+    disk_usage = _get_system_drive_usage()
+
+    # 디스크 / 네트워크 속도 & 누적치
+    disk_read_mb_s, disk_write_mb_s, net_up_mb_s, net_down_mb_s, net_sent_mb, net_recv_mb = _get_disk_net_rates(now)
+
+    # 온도 / GPU: 원본은 한 번씩만 읽는다
+    temps = _read_temperatures()
+    gpu = _read_primary_gpu()
+
+    return SensorSnapshot(
+        timestamp=now,
+        cpu_usage=cpu_usage,
+        ram_usage=vm.percent,
+        disk_usage=disk_usage,
+        disk_read=disk_read_mb_s,
+        disk_write=disk_write_mb_s,
+        net_upload=net_up_mb_s,
+        net_download=net_down_mb_s,
+        net_sent_mb=net_sent_mb,
+        net_recv_mb=net_recv_mb,
+        cpu_temp=_get_cpu_temp_psutil(temps),
+        gpu_temp=_get_gpu_temp_psutil(gpu),
+        gpu_usage=_get_gpu_usage_psutil(gpu),
+    )
+
+
 def get_current_metrics():
     """
     실시간 모니터링용 현재 상태.
 
+    - timestamp      : 샘플을 읽은 시각 (time.time())
     - cpu_usage      : psutil.cpu_percent()
     - ram_usage      : psutil.virtual_memory().percent
     - disk_usage     : 시스템 드라이브(C:) 사용률 %
@@ -204,42 +303,7 @@ def get_current_metrics():
     - cpu_temp       : psutil.sensors_temperatures() (지원 안 되면 None)
     - gpu_temp       : GPUtil GPU 온도 (없으면 None)
     - gpu_usage      : GPUtil GPU 사용률 (없으면 None)
-    """
-
-    # CPU / RAM
-    cpu_usage = psutil.cpu_percent(interval=None)
-    vm = psutil.virtual_memory()
-    ram_usage = vm.percent
 
-    # 디스크 사용률 (시스템 드라이브 기준)
-    try:
-        system_drive = os.getenv("SystemDrive", "C:") + "\\"
-        d = psutil.disk_usage(system_drive)
-        disk_usage = d.percent
-    except Exception:
-        disk_usage = 0.0
-
-    # 디스크 / 네트워크 속도 & 누적치
-    disk_read_mb_s, disk_write_mb_s, net_up_mb_s, net_down_mb_s, net_sent_mb, net_recv_mb = _get_disk_net_rates()
-
-    # 온도 / GPU 사용률
-    cpu_temp = _get_cpu_temp_psutil()
-    gpu_temp = _get_gpu_temp_psutil()
-    gpu_usage = _get_gpu_usage_psutil()
-
-    metrics = {
-        "cpu_usage": cpu_usage,
-        "ram_usage": ram_usage,
-        "disk_usage": disk_usage,
-        "disk_read": disk_read_mb_s,
-        "disk_write": disk_write_mb_s,
-        "net_upload": net_up_mb_s,
-        "net_download": net_down_mb_s,
-        "net_sent_mb": net_sent_mb,
-        "net_recv_mb": net_recv_mb,
-        "cpu_temp": cpu_temp,
-        "gpu_temp": gpu_temp,
-        "gpu_usage": gpu_usage,
-    }
-
-    return metrics
+    내부적으로는 collect_snapshot() 한 번으로 모든 값을 읽는다.
+    """
+    return collect_snapshot().as_dict()
@@ -0,0 +1,393 @@
+# engine/history_store.py
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from engine.metrics_buffer import FEATURE_KEYS, FEATURE_TO_METRIC, METRIC_KEYS, metrics_to_row
+
+# ---------- 파일 포맷 ----------
+#
+# data/history/YYYYMMDD.dfyh  (하루 = 한 세그먼트)
+#
+#   [헤더 HEADER_SIZE 바이트]
+#     magic        8s   b"DFYHIST1"
+#     header_size  u32
+#     record_size  u32
+#     num_columns  u32
+#     columns_len  u32
+#     columns      JSON(list[str]) UTF-8, 나머지는 0 패딩
+#   [레코드 record_size 바이트] x N   (append-only, 시간순)
+#     timestamp    f8
+#     values       f4 x num_columns  (값 없음 = NaN)
+#
+# 레코드 크기가 고정이라 np.memmap 으로 바로 (N,) 구조체 배열로 열 수 있다.
+
+MAGIC = b"DFYHIST1"
+HEADER_SIZE = 512
+_HEADER_FMT = "<8sIIII"
+SEGMENT_SUFFIX = ".dfyh"
+
+# 주기적으로 fsync 할 레코드 간격 (그 사이에 죽으면 tail recovery 로 정리)
+_FSYNC_EVERY = 60
+
+# 학습용 구간 분리 기준: 샘플 간격이 이보다 길면 (앱 종료 / 절전 등) 거기서 구간을 끊는다
+MAX_GAP = 5.0
+
+
+def default_history_dir() -> Path:
+    root = Path(__file__).resolve().parents[1]
+    return root / "data" / "history"
+
+
+def record_dtype(num_columns: int) -> np.dtype:
+    return np.dtype([("timestamp", "<f8"), ("values", "<f4", (num_columns,))])
+
+
+def _segment_name(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y%m%d") + SEGMENT_SUFFIX
+
+
+def _build_header(columns: List[str]) -> bytes:
+    cols = json.dumps(columns).encode("utf-8")
+    dtype = record_dtype(len(columns))
+    head = struct.pack(_HEADER_FMT, MAGIC, HEADER_SIZE, dtype.itemsize, len(columns), len(cols))
+    if len(head) + len(cols) > HEADER_SIZE:
+        raise ValueError("컬럼 이름이 너무 길어 헤더에 들어가지 않습니다.")
+    return (head + cols).ljust(HEADER_SIZE, b"\0")
+
+
+def _read_header(f) -> Tuple[int, int, List[str]]:
+    """(header_size, record_size, columns) 반환. 형식이 다르면 ValueError."""
+    raw = f.read(HEADER_SIZE)
+    base = struct.calcsize(_HEADER_FMT)
+    if len(raw) < base:
+        raise ValueError("헤더가 잘려 있습니다.")
+    magic, header_size, record_size, num_columns, cols_len = struct.unpack(_HEADER_FMT, raw[:base])
+    if magic != MAGIC:
+        raise ValueError("DFY history 파일이 아닙니다.")
+    columns = json.loads(raw[base:base + cols_len].decode("utf-8"))
+    if len(columns) != num_columns or record_dtype(num_columns).itemsize != record_size:
+        raise ValueError("헤더의 컬럼 정보가 맞지 않습니다.")
+    return header_size, record_size, columns
+
+
+# ---------- 쓰기 ----------
+
+class HistoryWriter:
+    """
+    sampler 가 매 틱 호출하는 append-only 기록기.
+
+    - 날짜가 바뀌면 새 세그먼트 파일로 넘어간다 (rotation by day)
+    - 매 레코드 flush, _FSYNC_EVERY 개마다 fsync
+    - 기존 세그먼트를 이어서 열 때는 tail recovery:
+        * 레코드 크기로 나누어 떨어지지 않는 잘린 꼬리는 잘라낸다
+        * 끝쪽의 0 / 비정상 timestamp 레코드(미완성 기록)도 잘라낸다
+    """
+
+    def __init__(self, directory: Optional[Path] = None, columns: Optional[List[str]] = None) -> None:
+        self.directory = Path(directory) if directory is not None else default_history_dir()
+        self.columns = list(columns) if columns is not None else list(METRIC_KEYS)
+        self.dtype = record_dtype(len(self.columns))
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment: Optional[str] = None
+        self._since_fsync = 0
+        self._disabled_reason: Optional[str] = None
+
+    # ---- 세그먼트 열기 / 닫기 ----
+
+    def _open_segment(self, name: str) -> None:
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+
+        if path.exists() and path.stat().st_size > 0:
+            try:
+                with path.open("rb") as f:
+                    _, _, columns = _read_header(f)
+                if columns != self.columns:
+                    raise ValueError("컬럼 구성이 다릅니다.")
+                recover_tail(path)
+            except ValueError as e:
+                # 형식이 다른 파일은 옆으로 치워 두고 새로 시작
+                aside = path.with_suffix(SEGMENT_SUFFIX + f".old{int(time.time())}")
+                print(f"[DFY][History] 세그먼트 형식 불일치({e}), 이동: {aside.name}")
+                os.replace(path, aside)
+
+        f = path.open("ab")
+        if f.tell() == 0:
+            f.write(_build_header(self.columns))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file = f
+        self._segment = name
+        self._since_fsync = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                finally:
+                    self._file.close()
+            self._file = None
+            self._segment = None
+
+    # ---- 기록 ----
+
+    def append(self, ts: float, row: np.ndarray) -> None:
+        if self._disabled_reason is not None:
+            return
+
+        rec = np.empty(1, dtype=self.dtype)
+        rec["timestamp"] = ts
+        rec["values"] = row
+
+        try:
+            name = _segment_name(ts)
+            if name != self._segment:
+                self._open_segment(name)
+            with self._lock:
+                self._file.write(rec.tobytes())
+                self._file.flush()
+                self._since_fsync += 1
+                if self._since_fsync >= _FSYNC_EVERY:
+                    os.fsync(self._file.fileno())
+                    self._since_fsync = 0
+        except OSError as e:
+            # 디스크 문제로 기록이 안 되면 앱은 계속 돌고, 영구 기록만 끈다
+            self._disabled_reason = str(e)
+            print("[DFY][History] 기록 실패, 영구 저장을 중단합니다:", e)
+
+    def append_metrics(self, metrics: Dict[str, Any]) -> None:
+        """collector 샘플(dict)을 한 레코드로 기록."""
+        ts = metrics.get("timestamp") or time.time()
+        self.append(ts, metrics_to_row(metrics))
+
+
+def recover_tail(path: Path) -> int:
+    """
+    세그먼트 끝의 불완전한 레코드를 잘라낸다. 잘라낸 바이트 수를 반환.
+    (쓰는 도중 앱/OS 가 죽었을 때 다음 실행에서 호출)
+    """
+    with path.open("r+b") as f:
+        header_size, record_size, _ = _read_header(f)
+        size = f.seek(0, os.SEEK_END)
+        body = max(0, size - header_size)
+        keep = body - body % record_size
+
+        # 끝쪽에 timestamp 가 0/NaN 인 레코드가 있으면 미완성으로 보고 버린다
+        while keep >= record_size:
+            f.seek(header_size + keep - record_size)
+            (ts,) = struct.unpack("<d", f.read(8))
+            if np.isfinite(ts) and ts > 0:
+                break
+            keep -= record_size
+
+        new_size = header_size + keep
+        if new_size < size:
+            f.truncate(new_size)
+            print(f"[DFY][History] tail recovery: {path.name} 에서 {size - new_size} 바이트 정리")
+        return size - new_size
+
+
+# ---------- 읽기 ----------
+
+class SegmentIndex:
+    """세그먼트 하나의 timestamp 색인 (첫/마지막 시각, 레코드 수)."""
+
+    def __init__(self, path: Path, header_size: int, columns: List[str], count: int,
+                 first_ts: float, last_ts: float, size: int) -> None:
+        self.path = path
+        self.header_size = header_size
+        self.columns = columns
+        self.count = count
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.size = size
+
+
+_index_cache: Dict[Path, SegmentIndex] = {}
+
+
+def _index_segment(path: Path) -> Optional[SegmentIndex]:
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return None
+
+    cached = _index_cache.get(path)
+    if cached is not None and cached.size == size:
+        return cached
+
+    try:
+        with path.open("rb") as f:
+            header_size, record_size, columns = _read_header(f)
+            count = max(0, size - header_size) // record_size
+            if count == 0:
+                return None
+            f.seek(header_size)
+            (first_ts,) = struct.unpack("<d", f.read(8))
+            f.seek(header_size + (count - 1) * record_size)
+            (last_ts,) = struct.unpack("<d", f.read(8))
+    except (OSError, ValueError):
+        return None
+
+    idx = SegmentIndex(path, header_size, columns, count, first_ts, last_ts, size)
+    _index_cache[path] = idx
+    return idx
+
+
+def list_segments(directory: Optional[Path] = None) -> List[SegmentIndex]:
+    """시간순으로 정렬된 세그먼트 색인 목록."""
+    directory = Path(directory) if directory is not None else default_history_dir()
+    if not directory.exists():
+        return []
+    out = []
+    for p in sorted(directory.glob("*" + SEGMENT_SUFFIX)):
+        idx = _index_segment(p)
+        if idx is not None:
+            out.append(idx)
+    return out
+
+
+def open_segment(idx: SegmentIndex) -> np.ndarray:
+    """세그먼트를 읽기 전용 memmap 구조체 배열 (N,) 로 연다 (복사 없음)."""
+    return np.memmap(
+        idx.path,
+        dtype=record_dtype(len(idx.columns)),
+        mode="r",
+        offset=idx.header_size,
+        shape=(idx.count,),
+    )
+
+
+def _project(idx: SegmentIndex, rec: np.ndarray, lo: int, hi: int, keys: List[str]) -> np.ndarray:
+    """세그먼트 레코드 [lo, hi) 의 keys 컬럼만 (n, len(keys)) float32 로 (세그먼트에 없는 컬럼은 NaN)."""
+    col_idx = [idx.columns.index(k) if k in idx.columns else -1 for k in keys]
+    vals = rec["values"][lo:hi]
+    out = np.full((hi - lo, len(keys)), np.nan, dtype=np.float32)
+    for j, c in enumerate(col_idx):
+        if c >= 0:
+            out[:, j] = vals[:, c]
+    return out
+
+
+def read_range(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    keys: Optional[List[str]] = None,
+    directory: Optional[Path] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    [start, end] 구간 기록을 (timestamps (N,), values (N, len(keys))) 로 반환.
+
+    세그먼트 색인으로 겹치는 파일만 고르고, 각 파일 안에서는
+    timestamp 컬럼에 searchsorted 를 써서 필요한 구간만 잘라 읽는다.
+    """
+    if keys is None:
+        keys = list(METRIC_KEYS)
+
+    ts_parts: List[np.ndarray] = []
+    val_parts: List[np.ndarray] = []
+
+    for idx in list_segments(directory):
+        if start is not None and idx.last_ts < start:
+            continue
+        if end is not None and idx.first_ts > end:
+            continue
+
+        rec = open_segment(idx)
+        ts = rec["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = idx.count if end is None else int(np.searchsorted(ts, end, side="right"))
+        if hi <= lo:
+            continue
+
+        ts_parts.append(np.asarray(ts[lo:hi], dtype=np.float64))
+        val_parts.append(_project(idx, rec, lo, hi, keys))
+
+    if not ts_parts:
+        return np.zeros(0, dtype=np.float64), np.zeros((0, len(keys)), dtype=np.float32)
+    return np.concatenate(ts_parts), np.concatenate(val_parts)
+
+
+def read_recent(seconds: float, directory: Optional[Path] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """최근 seconds 초 동안의 기록 (전체 METRIC_KEYS 컬럼)."""
+    return read_range(time.time() - seconds, None, directory=directory)
+
+
+def load_feature_matrix(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    directory: Optional[Path] = None,
+) -> np.ndarray:
+    """
+    학습/분석용 (N, len(FEATURE_KEYS)) float32 피처 행렬.
+    FEATURE_KEYS 순서, 값이 없던 자리는 0.0 (metrics_buffer 피처 규칙과 동일).
+    """
+    keys = [FEATURE_TO_METRIC.get(k, k) for k in FEATURE_KEYS]
+    _, values = read_range(start, end, keys=keys, directory=directory)
+    return np.nan_to_num(values, nan=0.0)
+
+
+def load_feature_runs(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    directory: Optional[Path] = None,
+    min_rows: int = 1,
+    max_gap: float = MAX_GAP,
+) -> List[np.ndarray]:
+    """
+    학습용 피처 행렬 목록 (model.streaming 의 "history" 학습 소스).
+
+    세그먼트(하루)마다, 그리고 그 안에서도 샘플 간격이 max_gap 초를 넘는 곳에서 끊어서
+    연속으로 기록된 구간 하나를 (n, len(FEATURE_KEYS)) float32 행렬 하나로 돌려준다
+    → 학습 윈도우가 앱이 꺼져 있던 시간을 걸치지 않는다.
+    값이 없던 자리는 0.0 (load_feature_matrix 와 같은 규칙), min_rows 보다 짧은 구간은 뺀다.
+    """
+    keys = [FEATURE_TO_METRIC.get(k, k) for k in FEATURE_KEYS]
+    runs: List[np.ndarray] = []
+
+    for idx in list_segments(directory):
+        if start is not None and idx.last_ts < start:
+            continue
+        if end is not None and idx.first_ts > end:
+            continue
+
+        rec = open_segment(idx)
+        ts = np.asarray(rec["timestamp"], dtype=np.float64)
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = idx.count if end is None else int(np.searchsorted(ts, end, side="right"))
+        if hi - lo < min_rows:
+            continue
+
+        values = np.nan_to_num(_project(idx, rec, lo, hi, keys), nan=0.0)
+        cuts = np.flatnonzero(np.diff(ts[lo:hi]) > max_gap) + 1
+        runs.extend(part for part in np.split(values, cuts) if part.shape[0] >= max(min_rows, 1))
+    return runs
+
+
+# ----------------------------------------------------------------------
+# 전역 writer 관리
+# ----------------------------------------------------------------------
+
+_writer: Optional[HistoryWriter] = None
+
+
+def get_writer() -> HistoryWriter:
+    """앱 전체에서 공유하는 HistoryWriter (data/history)."""
+    global _writer
+    if _writer is None:
+        _writer = HistoryWriter()
+    return _writer
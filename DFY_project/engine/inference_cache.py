@@ -0,0 +1,72 @@
+# engine/inference_cache.py
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from engine import metrics_buffer
+
+
+class InferenceCache:
+    """
+    tick(버퍼 샘플) 단위 추론 결과 memo.
+
+    - 키는 metrics_buffer.feature_seq() 와 호출자가 정한 key (보통 (이름, 모델 객체 id)) 의 조합
+    - 새 샘플이 기록되면 seq 가 바뀌므로 이전 tick 의 결과는 전부 자동으로 버려진다
+    - 같은 tick 안에서 대시보드 / 이상 탐지 페이지 / 리포트가 같은 값을 물으면
+      forward 는 한 번만 돈다
+    결과는 호출자마다 얕은 복사로 돌려주므로 받은 dict 에 키를 더해도 캐시에는 영향이 없다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seq: Optional[int] = None
+        self._entries: Dict[Hashable, Any] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """이번 tick 에 key 로 계산한 결과가 있으면 그것을, 없으면 compute() 결과를 저장해서 반환."""
+        seq = metrics_buffer.feature_seq()
+        with self._lock:
+            if seq != self._seq:
+                self._entries.clear()
+                self._seq = seq
+            if key in self._entries:
+                self._hits += 1
+                return copy.copy(self._entries[key])
+            self._misses += 1
+
+        value = compute()
+        # 계산하는 동안 새 샘플이 들어왔으면 이미 지난 tick 결과라 저장하지 않는다
+        still_current = metrics_buffer.feature_seq() == seq
+        with self._lock:
+            if still_current and self._seq == seq:
+                self._entries[key] = value
+        return copy.copy(value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._seq = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "seq": self._seq,
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
+
+
+_cache: Optional[InferenceCache] = None
+
+
+def get_cache() -> InferenceCache:
+    """대시보드 / 이상 탐지 / 리포트가 공유하는 전역 추론 캐시."""
+    global _cache
+    if _cache is None:
+        _cache = InferenceCache()
+    return _cache
@@ -1,10 +1,16 @@
 # engine/metrics_buffer.py
+import threading
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from engine.rollup import RollupTier, aggregate_blocks, to_result
+from engine.stream_stats import StreamingStats
 
 # LSTM이 사용하는 피처 키 목록을 공유해서, 순서/이름 불일치를 막는다.
 try:
-    from model.dataset import FEATURE_KEYS
+    from model.features import FEATURE_KEYS
 except ImportError:
     # 모델 쪽이 아직 없을 때를 대비한 기본값 (실제 실행 시에는 model.dataset 쪽이 우선)
     FEATURE_KEYS = [
@@ -18,89 +24,265 @@ except ImportError:
         "net_download",
     ]
 
-_MAX_SAMPLES = 600  # 대략 10분 분량(1초 간격)이라고 가정
-
-# 각 원소 예시:
-# {
-#     "timestamp": 1710000000.0,
-#     "cpu_temp": 55.0,
-#     "gpu_temp": 60.0,
-#     "cpu_usage": 35.0,
-#     "ram_usage": 60.0,
-#     "disk_usage": 40.0,
-#     "gpu_usage": 10.0,
-#     "features": {
-#         "cpu": ...,
-#         "ram": ...,
-#         ...
-#     }
-# }
-_buffer: List[Dict[str, Any]] = []
-
-
-def _safe_float(val: Any, default: float = 0.0) -> float:
+_MAX_SAMPLES = 3600  # raw 샘플 1시간 분량(1초 간격)이라고 가정
+_RAW_RESOLUTION = 1.0  # raw 샘플 간격 (초)
+
+# 장기 보관용 다운샘플 tier: (bucket 초, 보관 bucket 수)
+#   - 10초 집계 x 8640  = 1일
+#   - 1분 집계  x 43200 = 30일
+# 메트릭 10개 기준 bucket 당 168바이트 → 두 tier 합쳐 약 9MB
+_ROLLUP_SPECS = [
+    (10.0, 8640),
+    (60.0, 43200),
+]
+
+# 버퍼에 저장하는 collector 메트릭 (컬럼 순서 = 저장 순서)
+METRIC_KEYS: List[str] = [
+    "cpu_usage",
+    "ram_usage",
+    "gpu_usage",
+    "gpu_temp",
+    "disk_read",      # MB/s
+    "disk_write",     # MB/s
+    "net_upload",     # MB/s
+    "net_download",   # MB/s
+    "cpu_temp",
+    "disk_usage",
+]
+
+# LSTM/AE 피처 이름 → collector 메트릭 이름
+# (collector.get_current_metrics() 의 키와 맞춰야 한다)
+FEATURE_TO_METRIC: Dict[str, str] = {
+    "cpu": "cpu_usage",
+    "ram": "ram_usage",
+    "gpu": "gpu_usage",
+    "gpu_temp": "gpu_temp",
+    "disk_read": "disk_read",
+    "disk_write": "disk_write",
+    "net_upload": "net_upload",
+    "net_download": "net_download",
+}
+
+_METRIC_INDEX: Dict[str, int] = {k: i for i, k in enumerate(METRIC_KEYS)}
+
+# get_all() 에서 예전 dict 포맷으로 돌려줄 메타 키들
+_LEGACY_SAMPLE_KEYS = ["cpu_temp", "gpu_temp", "cpu_usage", "ram_usage", "disk_usage", "gpu_usage"]
+
+
+class RingStore:
+    """
+    미리 할당해 둔 numpy 배열 기반 원형(circular) 버퍼.
+
+    - timestamps : float64 (capacity,)
+    - values     : float32 (capacity, len(METRIC_KEYS)), 값이 없으면 NaN
+    - append 는 O(1) (리스트 앞에서 del 하던 O(n) 제거)
+
+    각 행을 [i] 와 [i + capacity] 두 곳에 같이 써 두는 "미러" 방식이라,
+    최근 n개(n <= capacity)는 항상 연속된 구간이 되고
+    window() 는 복사 없이 view 로 잘라서 돌려줄 수 있다.
+    (샘플당 저장 공간: (8 + 4 * 메트릭 수) 바이트 x 2)
+    """
+
+    def __init__(self, capacity: int, num_columns: int) -> None:
+        self.capacity = int(capacity)
+        self.num_columns = int(num_columns)
+        self._ts = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._values = np.full((2 * self.capacity, self.num_columns), np.nan, dtype=np.float32)
+        self._head = 0      # 다음에 쓸 위치 (0 ~ capacity-1)
+        self._count = 0     # 현재 저장된 행 수 (최대 capacity)
+        self.seq = 0        # 지금까지 append 된 총 행 수
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ts: float, row: np.ndarray) -> None:
+        i = self._head
+        j = i + self.capacity
+        self._ts[i] = ts
+        self._ts[j] = ts
+        self._values[i] = row
+        self._values[j] = row
+
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.seq += 1
+
+    def extend(self, ts: np.ndarray, rows: np.ndarray) -> None:
+        """여러 행을 한 번에 append (기록 복원용). capacity 보다 많으면 최근 것만 남긴다."""
+        total = ts.shape[0]
+        if total > self.capacity:
+            ts, rows = ts[-self.capacity:], rows[-self.capacity:]
+        n = ts.shape[0]
+        idx = (self._head + np.arange(n)) % self.capacity
+        self._ts[idx] = ts
+        self._ts[idx + self.capacity] = ts
+        self._values[idx] = rows
+        self._values[idx + self.capacity] = rows
+
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self.capacity, self._count + n)
+        self.seq += total
+
+    def row_from_end(self, k: int) -> np.ndarray:
+        """뒤에서 k번째 행(1 = 최신)의 복사본."""
+        return self._values[self._head + self.capacity - k].copy()
+
+    def window(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        최근 n개 행을 (timestamps, values) view 로 반환 (오래된 것 → 최신 순).
+        n이 None 이면 저장된 전체.
+        """
+        if n is None or n > self._count:
+            n = self._count
+        end = self._head + self.capacity
+        start = end - n
+        return self._ts[start:end], self._values[start:end]
+
+    def clear(self) -> None:
+        self._ts[:] = 0.0
+        self._values[:] = np.nan
+        self._head = 0
+        self._count = 0
+
+
+_lock = threading.Lock()
+_store = RingStore(_MAX_SAMPLES, len(METRIC_KEYS))
+
+# LSTM/AE 입력용 피처 행렬 (FEATURE_KEYS 순서, 결측값은 0.0)
+# _store 와 같은 타이밍으로 append 되므로 행 위치가 항상 같다.
+_feature_store = RingStore(_MAX_SAMPLES, len(FEATURE_KEYS))
+_FEATURE_COLS = [_METRIC_INDEX[FEATURE_TO_METRIC.get(k, k)] for k in FEATURE_KEYS]
+
+# 장기 보관용 집계 tier (세밀한 것 → 거친 것 순)
+_rollups: List[RollupTier] = [
+    RollupTier(bucket, capacity, len(METRIC_KEYS)) for bucket, capacity in _ROLLUP_SPECS
+]
+
+# 메트릭별 스트리밍 통계 (누적 Welford / EWMA / 최근 60·300 샘플 윈도우)
+_stats = StreamingStats(len(METRIC_KEYS), windows=(60, 300), ewma_spans=(10, 60, 300))
+
+
+def _to_float_or_nan(val: Any) -> float:
     if val is None:
-        return default
+        return np.nan
     try:
         return float(val)
     except (TypeError, ValueError):
-        return default
+        return np.nan
+
+
+def metrics_to_row(metrics: Dict[str, Any]) -> np.ndarray:
+    """collector 샘플(dict) → METRIC_KEYS 순서 float32 행 (값 없음 = NaN)."""
+    return np.fromiter(
+        (_to_float_or_nan(metrics.get(k)) for k in METRIC_KEYS),
+        dtype=np.float32,
+        count=len(METRIC_KEYS),
+    )
 
 
 def add_sample(metrics: Dict[str, Any]) -> None:
     """
-    collector.get_current_metrics() 결과를 버퍼에 기록하고,
-    LSTM 입력용 feature 벡터도 같이 저장한다.
-    """
-    # 기본 메타 정보
-    sample: Dict[str, Any] = {
-        "timestamp": time.time(),
-        "cpu_temp": metrics.get("cpu_temp"),
-        "gpu_temp": metrics.get("gpu_temp"),
-        "cpu_usage": metrics.get("cpu_usage"),
-        "ram_usage": metrics.get("ram_usage"),
-        "disk_usage": metrics.get("disk_usage"),
-        "gpu_usage": metrics.get("gpu_usage"),
-    }
+    collector.get_current_metrics() 결과를 버퍼에 한 행으로 기록한다.
+    값이 없거나 숫자가 아니면 NaN 으로 저장.
+    """
+    ts = metrics.get("timestamp") or time.time()
+    row = metrics_to_row(metrics)
+    feat_row = np.nan_to_num(row[_FEATURE_COLS], nan=0.0)
+    with _lock:
+        # 이번 append 로 각 통계 윈도우에서 빠져나갈 샘플 (append 전에 꺼내 둔다)
+        evicted = [_store.row_from_end(w) if len(_store) >= w else None for w in _stats.windows]
 
-    # LSTM이 기대하는 8개 피처를 collector 값에서 매핑
-    # (collector.get_current_metrics() 의 키와 맞춰야 한다)
-    cpu = metrics.get("cpu_usage")
-    ram = metrics.get("ram_usage")
-    gpu = metrics.get("gpu_usage")
-    gpu_temp = metrics.get("gpu_temp")
-
-    disk_read = metrics.get("disk_read")       # MB/s
-    disk_write = metrics.get("disk_write")     # MB/s
-    net_up = metrics.get("net_upload")         # MB/s
-    net_down = metrics.get("net_download")     # MB/s
-
-    feature_snap: Dict[str, float] = {
-        "cpu": _safe_float(cpu),
-        "ram": _safe_float(ram),
-        "gpu": _safe_float(gpu),
-        "gpu_temp": _safe_float(gpu_temp),
-        "disk_read": _safe_float(disk_read),
-        "disk_write": _safe_float(disk_write),
-        "net_upload": _safe_float(net_up),
-        "net_download": _safe_float(net_down),
-    }
+        _store.append(ts, row)
+        _feature_store.append(ts, feat_row)
+        for tier in _rollups:
+            tier.add(ts, row)
 
-    # 혹시 FEATURE_KEYS가 달라졌을 때도 순서/필터를 맞춰주기 위해 다시 정리
-    ordered_features = {k: feature_snap.get(k, 0.0) for k in FEATURE_KEYS}
+        _stats.update(row, evicted)
+        if _stats.needs_resync():
+            _resync_stats_windows()
 
-    sample["features"] = ordered_features
 
-    _buffer.append(sample)
+def restore(ts: np.ndarray, values: np.ndarray) -> None:
+    """
+    영구 기록(engine.history_store)에서 읽은 시간순 (N,) / (N, len(METRIC_KEYS)) 배열로
+    raw 버퍼와 집계 tier 를 한 번에 채운다 (앱 시작 시 이력 복원용).
+    """
+    if ts.shape[0] == 0:
+        return
+    values = np.asarray(values, dtype=np.float32)
+    feats = np.nan_to_num(values[:, _FEATURE_COLS], nan=0.0)
+    with _lock:
+        _store.extend(ts, values)
+        _feature_store.extend(ts, feats)
+        for tier in _rollups:
+            tier.add_bulk(ts, values)
+        _stats.update_bulk(values)
+        _resync_stats_windows()
 
-    # 오래된 샘플은 버린다
-    if len(_buffer) > _MAX_SAMPLES:
-        del _buffer[0]
+
+def _resync_stats_windows() -> None:
+    """통계 윈도우 합계를 raw 버퍼 기준으로 다시 맞춘다 (_lock 안에서 호출)."""
+    _stats.resync_windows([_store.window(w)[1] for w in _stats.windows])
 
 
 def clear() -> None:
     """버퍼를 완전히 비운다 (테스트용)."""
-    _buffer.clear()
+    with _lock:
+        _store.clear()
+        _feature_store.clear()
+        for tier in _rollups:
+            tier.clear()
+        _stats.reset()
+
+
+def size() -> int:
+    """현재 버퍼에 들어 있는 샘플 수."""
+    return len(_store)
+
+
+def get_window(limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    최근 limit개 샘플을 (timestamps (N,), values (N, len(METRIC_KEYS))) view 로 반환.
+
+    복사 없이 내부 배열을 그대로 잘라서 주므로, 이후 add_sample 로 덮어써질 수 있다.
+    오래 들고 있어야 하면 호출한 쪽에서 .copy() 할 것.
+    """
+    with _lock:
+        return _store.window(limit)
+
+
+def get_column(key: str, limit: Optional[int] = None) -> np.ndarray:
+    """
+    특정 메트릭(cpu_usage, cpu_temp 등) 또는 "timestamp" 의 최근 limit개 view.
+    값이 없던 자리는 NaN.
+    """
+    ts, values = get_window(limit)
+    if key == "timestamp":
+        return ts
+    return values[:, _METRIC_INDEX[key]]
+
+
+def get_stats(key: str) -> Dict[str, Any]:
+    """
+    메트릭 하나의 현재 통계를 O(1)로 반환 (history 를 다시 훑지 않음).
+
+    {
+        "count", "mean", "std", "min", "max", "last",      # 누적 (Welford)
+        "ewma":   {span: {"mean", "std"}},                 # span = 10 / 60 / 300 샘플
+        "window": {w: {"mean", "std", "count"}},           # 최근 60 / 300 샘플
+    }
+    """
+    with _lock:
+        return _stats.column_summary(_METRIC_INDEX[key])
+
+
+def get_streaming_stats() -> StreamingStats:
+    """
+    전체 메트릭 통계 객체 (벡터화된 소비자용, METRIC_KEYS 순서의 배열들).
+    읽기 전용으로만 사용할 것.
+    """
+    return _stats
 
 
 def get_series(key: str) -> List[float]:
@@ -108,22 +290,163 @@ def get_series(key: str) -> List[float]:
     buffer에서 특정 키(cpu_usage, cpu_temp 등)의 시계열만 뽑아서 반환.
     None 값은 제외.
     """
-    return [s[key] for s in _buffer if s.get(key) is not None]
+    if key != "timestamp" and key not in _METRIC_INDEX:
+        return []
+    col = get_column(key)
+    return col[~np.isnan(col)].tolist()
+
+
+def get_feature_window(seq_len: int, pad: bool = True) -> Optional[np.ndarray]:
+    """
+    LSTM/AE 입력용 최근 seq_len개 피처 행렬을 반환.
+
+    - shape : (seq_len, len(FEATURE_KEYS)), float32, C-contiguous, FEATURE_KEYS 순서
+    - 샘플이 seq_len개 이상이면 내부 배열의 view 를 그대로 준다 (복사 없음).
+      torch.from_numpy(...) 로 감싸도 메모리를 공유한다.
+      view 는 이후 (capacity - seq_len)번의 add_sample 동안은 덮어써지지 않는다.
+    - 샘플이 모자라면 pad=True 일 때 첫 행을 앞쪽에 복제해서 채운다
+      (기존 LoadPredictor._build_sequence 의 패딩 규칙과 동일).
+      pad=False 면 있는 만큼만 돌려준다.
+    - 샘플이 하나도 없으면 None.
+    """
+    with _lock:
+        _, feats = _feature_store.window(seq_len)
+
+    n = feats.shape[0]
+    if n == 0:
+        return None
+    if n >= seq_len or not pad:
+        return feats
+
+    padding = np.repeat(feats[:1], seq_len - n, axis=0)
+    return np.concatenate([padding, feats], axis=0)
+
+
+def feature_seq() -> int:
+    """지금까지 기록된 총 샘플 수 (새 샘플마다 1씩 증가, clear() 해도 줄지 않음)."""
+    with _lock:
+        return _feature_store.seq
+
+
+def get_feature_rows_since(since_seq: Optional[int], limit: int) -> Tuple[int, np.ndarray]:
+    """
+    since_seq 이후에 기록된 피처 행(최신 쪽 최대 limit개 view)과 현재 sequence 번호.
+
+    - since_seq 가 None 이면 최근 limit개
+    - 돌려준 행 수가 (seq - since_seq) 보다 적으면 중간 샘플을 놓친 것
+      (limit 초과, 버퍼 밖으로 밀려남, restore() 로 한꺼번에 채워짐 등)
+    """
+    with _lock:
+        seq = _feature_store.seq
+        n = limit if since_seq is None else max(0, min(seq - since_seq, limit))
+        _, feats = _feature_store.window(n)
+    return seq, feats
 
 
 def get_all() -> List[Dict[str, Any]]:
-    """버퍼 전체를 shallow copy로 반환."""
-    return list(_buffer)
+    """
+    버퍼 전체를 예전 포맷(list of dict)으로 반환 (호환용 view).
+    각 원소는 timestamp / 메타 메트릭 / features(dict) 를 가진다.
+    """
+    with _lock:
+        ts, values = _store.window()
+        _, feats = _feature_store.window()
+
+    out: List[Dict[str, Any]] = []
+    for i in range(len(ts)):
+        sample: Dict[str, Any] = {"timestamp": float(ts[i])}
+        for k in _LEGACY_SAMPLE_KEYS:
+            v = values[i, _METRIC_INDEX[k]]
+            sample[k] = None if np.isnan(v) else float(v)
+        sample["features"] = dict(zip(FEATURE_KEYS, feats[i].tolist()))
+        out.append(sample)
+    return out
 
 
 def get_feature_history(limit: Optional[int] = None) -> List[Dict[str, float]]:
     """
-    LSTM 입력용 feature history를 반환.
+    LSTM 입력용 feature history를 반환 (호환용 view).
 
     각 원소는 {feature_name: value} dict이고,
     limit가 주어지면 뒤에서부터 해당 개수만큼만 잘라서 반환.
     """
-    hist = [s["features"] for s in _buffer if "features" in s]
-    if limit is not None and len(hist) > limit:
-        hist = hist[-limit:]
-    return hist
+    with _lock:
+        _, feats = _feature_store.window(limit)
+    return [dict(zip(FEATURE_KEYS, row)) for row in feats.tolist()]
+
+
+# ---------- 장기 이력 조회 (raw + 다운샘플 tier) ----------
+
+def _raw_snapshot():
+    """raw 버퍼를 tier 와 같은 (ts (N,), agg (N, 4, M)) 형태로 복사."""
+    ts, values = _store.window()
+    agg = np.repeat(values[:, None, :], 4, axis=1)
+    return ts.copy(), agg
+
+
+def query_range(
+    start: float,
+    end: Optional[float] = None,
+    max_points: int = 600,
+    keys: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    [start, end] 구간 이력을 max_points 이하의 점으로 반환.
+
+    raw(1초) → 10초 → 1분 tier 순서로 보면서,
+    구간 시작을 덮고 있고 점 수가 예산(max_points) 안에 들어오는 가장 세밀한 tier 를 고른다.
+    그래도 점이 많으면 연속 블록 단위로 한 번 더 묶는다.
+
+    반환:
+    {
+        "resolution": 선택된 tier 의 간격(초),
+        "keys":       메트릭 이름 리스트,
+        "timestamp":  (N,) 각 점의 시작 시각,
+        "min" / "max" / "mean" / "last": (N, len(keys)) float32,
+    }
+    raw tier 에서는 min/max/mean/last 가 모두 원래 값과 같다.
+    """
+    if end is None:
+        end = time.time()
+    if keys is None:
+        keys = list(METRIC_KEYS)
+    cols = [_METRIC_INDEX[k] for k in keys]
+    span = max(0.0, end - start)
+
+    with _lock:
+        tiers = [(_RAW_RESOLUTION, _store_oldest(), _raw_snapshot)]
+        for tier in _rollups:
+            tiers.append((tier.bucket_seconds, tier.oldest_timestamp(), tier.snapshot))
+
+        chosen = None
+        for resolution, oldest, snap in tiers:
+            if oldest is None:
+                continue
+            if oldest <= start and span / resolution <= max_points:
+                chosen = (resolution, snap)
+                break
+
+        if chosen is None:
+            # 구간 시작을 덮는 tier 가 있으면 그중 가장 거친 것,
+            # 없으면(앱을 켠 지 얼마 안 됨) 데이터가 가장 촘촘한 raw 를 쓴다.
+            covering = [(r, s) for r, o, s in tiers if o is not None and o <= start]
+            chosen = covering[-1] if covering else (tiers[0][0], tiers[0][2])
+
+        resolution, snap = chosen
+        ts, agg = snap()
+
+    lo = int(np.searchsorted(ts, start, side="left"))
+    hi = int(np.searchsorted(ts, end, side="right"))
+    ts, agg = ts[lo:hi], agg[lo:hi][:, :, cols]
+    ts, agg = aggregate_blocks(ts, agg, max_points)
+
+    result = to_result(resolution, ts, agg)
+    result["keys"] = keys
+    return result
+
+
+def _store_oldest() -> Optional[float]:
+    if len(_store) == 0:
+        return None
+    ts, _ = _store.window()
+    return float(ts[0])
@@ -0,0 +1,151 @@
+# engine/metrics_hub.py
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from engine.sampler import MetricsSampler, get_sampler
+
+# 구독 콜백: 최근 window개 샘플(list[dict], 오래된 것 → 최신 순) -> None
+WindowListener = Callable[[List[Dict[str, Any]]], None]
+
+
+class Subscription:
+    """
+    MetricsHub 구독 정보.
+
+    - every  : 샘플 every개마다 한 번씩 콜백 (1이면 매 샘플)
+    - window : 콜백에 넘겨줄 최근 샘플 개수
+    """
+
+    def __init__(self, callback: WindowListener, every: int = 1, window: int = 1) -> None:
+        self.callback = callback
+        self.every = max(1, int(every))
+        self.window = max(1, int(window))
+        self._count = 0
+
+
+class MetricsHub:
+    """
+    앱 전체의 샘플 스트림을 소유하는 중앙 허브.
+
+    - 실제 센서 읽기는 MetricsSampler 한 곳에서만 일어나고,
+      페이지/탐지기들은 허브에 구독하거나 latest()로 최신 샘플을 읽기만 한다.
+    - collector._last_disk_io / _last_net_io 같은 델타 상태는
+      샘플러만 갱신하므로, 소비자가 늘어나도 디스크/네트워크 속도가 깨지지 않는다.
+    """
+
+    def __init__(self, sampler: MetricsSampler, history: int = 1) -> None:
+        self.sampler = sampler
+        self.sampler.add_listener(self._publish)
+
+        self._lock = threading.Lock()
+        self._subs: List[Subscription] = []
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=max(1, history))
+        self._seq = 0
+
+    # ---- 시작 / 종료 (sampler 위임) ----
+
+    def start(self) -> None:
+        self.sampler.start()
+
+    def stop(self) -> None:
+        self.sampler.stop()
+
+    # ---- 구독 ----
+
+    def subscribe(self, callback: WindowListener, every: int = 1, window: int = 1) -> Subscription:
+        """
+        샘플 스트림 구독.
+        콜백은 sampler 스레드에서 호출되므로 UI 쪽은 queued signal 로 넘겨 받아야 한다.
+        """
+        sub = Subscription(callback, every=every, window=window)
+        with self._lock:
+            self._subs.append(sub)
+            # 가장 긴 window 를 담을 수 있게 최근 샘플 보관 길이를 늘린다
+            if sub.window > (self._recent.maxlen or 1):
+                self._recent = deque(self._recent, maxlen=sub.window)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    # ---- 최신 샘플 읽기 ----
+
+    @property
+    def seq(self) -> int:
+        """지금까지 발행된 샘플 수 (새 샘플이 들어올 때마다 1씩 증가)."""
+        return self._seq
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        가장 최근 샘플을 반환 (센서를 새로 읽지 않음).
+        max_age(초)가 주어지면 그보다 오래된 샘플은 None 취급.
+        """
+        with self._lock:
+            sample = self._recent[-1] if self._recent else None
+        if sample is None:
+            return None
+        if max_age is not None:
+            ts = sample.get("timestamp") or 0.0
+            if time.time() - ts > max_age:
+                return None
+        return sample
+
+    def current(self) -> Dict[str, Any]:
+        """
+        최신 샘플을 반환하되, 아직 샘플이 없고 sampler 도 돌고 있지 않으면
+        (스크립트/테스트 환경 등) 허브를 통해 한 번 샘플링한다.
+        """
+        sample = self.latest()
+        if sample is not None:
+            return sample
+        if not self.sampler.is_running():
+            self.sampler.sample_once()
+        else:
+            # sampler 가 막 시작된 경우 첫 샘플이 나올 때까지 잠깐 기다린다
+            deadline = time.monotonic() + self.sampler.interval * 2
+            while sample is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+                sample = self.latest()
+        return self.latest() or {}
+
+    # ---- 내부: sampler 로부터 샘플 수신 ----
+
+    def _publish(self, metrics: Dict[str, Any]) -> None:
+        with self._lock:
+            self._recent.append(metrics)
+            self._seq += 1
+
+            due = []
+            for sub in self._subs:
+                sub._count += 1
+                if sub._count >= sub.every:
+                    sub._count = 0
+                    window = list(self._recent)[-sub.window:]
+                    due.append((sub, window))
+
+        for sub, window in due:
+            try:
+                sub.callback(window)
+            except Exception as e:
+                print("[DFY][Hub] 구독 콜백 처리 중 오류:", e)
+                traceback.print_exc()
+
+
+# ----------------------------------------------------------------------
+# 전역 hub 관리
+# ----------------------------------------------------------------------
+
+_hub: Optional[MetricsHub] = None
+
+
+def get_hub() -> MetricsHub:
+    """앱 전체에서 공유하는 MetricsHub (전역 sampler 사용)."""
+    global _hub
+    if _hub is None:
+        _hub = MetricsHub(get_sampler())
+    return _hub
@@ -0,0 +1,344 @@
+# engine/model_registry.py
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from model import bundle as model_bundle
+from model.bundle import BUNDLE_NAMES, ModelBundle
+
+# 레지스트리 이전의 모델 파일 위치. 버전이 따로 없으면 이 폴더의 파일을 "legacy" 버전으로 쓴다
+# (번들 파일이 있으면 그것을, 없으면 예전 .pth + ae_thresholds.json 을 읽는다).
+LEGACY_DIR = Path(__file__).resolve().parents[1] / "internal"
+# 버전별 모델 번들 위치: internal/models/<kind>/<version>/
+REGISTRY_DIR = LEGACY_DIR / "models"
+
+LEGACY_VERSION = "legacy"
+MANIFEST_NAME = "manifest.json"
+_CURRENT_NAME = "CURRENT"
+
+# 새 버전을 올릴 때 남겨 두는 버전 수 (롤백용). 현재 버전과 legacy 는 지우지 않는다.
+KEEP_VERSIONS = 5
+
+# 로더: (검증된 번들, manifest) -> 추론 객체 (AEDetector / LoadPredictor 등)
+Loader = Callable[[ModelBundle, Dict[str, Any]], Any]
+# 교체 콜백: (kind, 새 version) -> None (로드한 스레드에서 호출됨)
+SwapListener = Callable[[str, str], None]
+
+
+class _Slot:
+    """kind 하나의 로드 상태. model / version 은 항상 같이 바뀐다."""
+
+    def __init__(self, loader: Loader) -> None:
+        self.loader = loader
+        self.model: Any = None
+        self.version: Optional[str] = None
+        self.error: Optional[str] = None
+        self.failed_version: Optional[str] = None
+        self.loading = False
+        self.checked_at = 0.0
+
+
+class ModelRegistry:
+    """
+    버전별 모델 번들 저장소 + hot reload.
+
+    저장 구조 (internal/models/<kind>/):
+      <version>/          번들 파일(model.bundle 형식, BUNDLE_NAMES[kind]) + manifest.json
+                          (feature_keys, 학습 메타데이터, 생성 시각)
+      CURRENT             사용할 버전 이름 (os.replace 로 교체)
+
+    - publish()  : 학습이 끝난 staging 폴더를 새 버전 폴더로 rename 하고 CURRENT 를 넘긴다
+    - rollback() : CURRENT 를 바로 이전 버전으로 되돌린다
+    - get()      : 지금 로드된 추론 객체를 반환. WATCH_INTERVAL 마다 CURRENT 를 확인해서
+                   바뀌었으면 백그라운드 스레드에서 새 버전을 로드한 뒤 참조만 교체한다
+                   → 추론 쪽은 tick 마다 get() 한 번으로 이전 / 새 객체 중 하나를 통째로 쓴다
+    """
+
+    WATCH_INTERVAL = 2.0
+
+    def __init__(self, root: Path = REGISTRY_DIR, legacy_dir: Path = LEGACY_DIR) -> None:
+        self.root = Path(root)
+        self.legacy_dir = Path(legacy_dir)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _Slot] = {}
+        self._listeners: List[SwapListener] = []
+
+    # ------------------------------------------------------------------
+    # 저장소 (파일)
+    # ------------------------------------------------------------------
+
+    def kind_dir(self, kind: str) -> Path:
+        if kind not in BUNDLE_NAMES:
+            raise ValueError(f"알 수 없는 모델 종류: {kind}")
+        return self.root / kind
+
+    def _has_legacy(self, kind: str) -> bool:
+        return model_bundle.has_model(kind, self.legacy_dir)
+
+    def versions(self, kind: str) -> List[str]:
+        """사용 가능한 버전 (오래된 것 → 최신 순, legacy 가 있으면 맨 앞)."""
+        out = [LEGACY_VERSION] if self._has_legacy(kind) else []
+        d = self.kind_dir(kind)
+        if d.is_dir():
+            out.extend(sorted(p.name for p in d.iterdir() if (p / MANIFEST_NAME).exists()))
+        return out
+
+    def current_version(self, kind: str) -> Optional[str]:
+        """CURRENT 가 가리키는 버전. 없거나 지워진 버전이면 가장 최신 버전."""
+        versions = self.versions(kind)
+        try:
+            name = (self.kind_dir(kind) / _CURRENT_NAME).read_text(encoding="utf-8").strip()
+        except OSError:
+            name = ""
+        if name in versions:
+            return name
+        return versions[-1] if versions else None
+
+    def version_dir(self, kind: str, version: str) -> Path:
+        return self.legacy_dir if version == LEGACY_VERSION else self.kind_dir(kind) / version
+
+    def manifest(self, kind: str, version: Optional[str] = None) -> Dict[str, Any]:
+        version = version or self.current_version(kind)
+        if version is None:
+            raise FileNotFoundError(f"{kind} 모델 버전이 없습니다.")
+        if version == LEGACY_VERSION:
+            return self._legacy_manifest(kind)
+        with (self.version_dir(kind, version) / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _legacy_manifest(self, kind: str) -> Dict[str, Any]:
+        """internal/ 파일용 manifest (번들 header 에서 만든다)."""
+        b = model_bundle.open_in_dir(kind, self.legacy_dir, cache=True)
+        return {
+            "kind": kind,
+            "version": LEGACY_VERSION,
+            "files": [b.path.name] if b.path else [],
+            "feature_keys": b.feature_keys,
+            "metadata": b.metadata,
+        }
+
+    def open_bundle(self, kind: str, version: Optional[str] = None) -> ModelBundle:
+        """버전의 번들을 열고 kind / FEATURE_KEYS 로 검증한다."""
+        version = version or self.current_version(kind)
+        if version is None:
+            raise FileNotFoundError(f"{kind} 모델 버전이 없습니다.")
+        return model_bundle.open_in_dir(kind, self.version_dir(kind, version), cache=True)
+
+    def new_staging(self, kind: str) -> Path:
+        """학습 결과를 쓸 임시 폴더 (publish 때 rename 되므로 같은 파일 시스템에 만든다)."""
+        path = self.kind_dir(kind) / f".staging-{uuid.uuid4().hex[:8]}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def publish(
+        self,
+        kind: str,
+        staging: Path,
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = True,
+    ) -> str:
+        """
+        staging 폴더(BUNDLE_NAMES[kind] 번들이 들어 있어야 함)를 새 버전으로 등록한다.
+        번들은 등록 전에 한 번 열어서 검증하고, 폴더째 os.replace 하므로
+        반쯤 만들어진 버전이 보이는 일은 없다.
+        """
+        staging = Path(staging)
+        b = model_bundle.read_bundle(staging / BUNDLE_NAMES[kind], kind=kind)
+
+        # 같은 초에 여러 번 publish 해도 이름 순서가 등록 순서가 되도록 일련번호를 앞에 붙인다
+        # (versions() / rollback() 은 이름 순서로 이전 버전을 고른다)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        n = sum(1 for v in self.versions(kind) if v.startswith(stamp))
+        version = f"{stamp}-{n:02d}{uuid.uuid4().hex[:4]}"
+        manifest = {
+            "kind": kind,
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": [BUNDLE_NAMES[kind]],
+            "feature_keys": b.feature_keys,
+            "metadata": {**b.metadata, **(metadata or {})},
+        }
+        del b
+        with (staging / MANIFEST_NAME).open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+
+        os.replace(staging, self.kind_dir(kind) / version)
+        print(f"[DFY][Registry] {kind} 새 버전 등록: {version}")
+        if activate:
+            self.activate(kind, version)
+        self.prune(kind)
+        return version
+
+    def activate(self, kind: str, version: str, wait: bool = False) -> None:
+        """CURRENT 를 version 으로 바꾸고 reload 를 건다 (wait=True 면 로드가 끝날 때까지 대기)."""
+        if version not in self.versions(kind):
+            raise ValueError(f"{kind} 에 {version} 버전이 없습니다.")
+        d = self.kind_dir(kind)
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / (_CURRENT_NAME + ".tmp")
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, d / _CURRENT_NAME)
+        print(f"[DFY][Registry] {kind} 사용 버전 → {version}")
+        self.refresh(kind, wait=wait)
+
+    def rollback(self, kind: str, wait: bool = False) -> Optional[str]:
+        """현재 버전 바로 이전 버전으로 되돌린다. 이전 버전이 없으면 None."""
+        versions = self.versions(kind)
+        current = self.current_version(kind)
+        if current not in versions or versions.index(current) == 0:
+            print(f"[DFY][Registry] {kind}: 되돌릴 이전 버전이 없습니다.")
+            return None
+        previous = versions[versions.index(current) - 1]
+        self.activate(kind, previous, wait=wait)
+        return previous
+
+    def prune(self, kind: str, keep: int = KEEP_VERSIONS) -> None:
+        """오래된 버전 정리 (현재 / 로드된 버전과 legacy 는 남긴다)."""
+        protected = {LEGACY_VERSION, self.current_version(kind), self.loaded_version(kind)}
+        versions = [v for v in self.versions(kind) if v != LEGACY_VERSION]
+        for v in versions[: max(0, len(versions) - keep)]:
+            if v not in protected:
+                shutil.rmtree(self.version_dir(kind, v), ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # 로드 / hot swap
+    # ------------------------------------------------------------------
+
+    def register_loader(self, kind: str, loader: Loader) -> None:
+        with self._lock:
+            if kind not in self._slots:
+                self._slots[kind] = _Slot(loader)
+            else:
+                self._slots[kind].loader = loader
+
+    def add_listener(self, callback: SwapListener) -> None:
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: SwapListener) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def loaded_version(self, kind: str) -> Optional[str]:
+        slot = self._slots.get(kind)
+        return slot.version if slot else None
+
+    def error(self, kind: str) -> Optional[str]:
+        slot = self._slots.get(kind)
+        return slot.error if slot else None
+
+    def get(self, kind: str) -> Any:
+        """
+        kind 의 현재 추론 객체 (없으면 None). 추론 경로에서 매 tick 호출해도 되도록 가볍다.
+        - 아직 아무것도 로드되지 않았으면 이 호출에서 바로 로드한다
+        - 이미 로드돼 있으면 WATCH_INTERVAL 마다 CURRENT 만 확인하고, 바뀌었으면 백그라운드로 로드
+        """
+        slot = self._slots.get(kind)
+        if slot is None:
+            raise KeyError(f"{kind} 로더가 등록되지 않았습니다.")
+
+        now = time.monotonic()
+        if now - slot.checked_at >= self.WATCH_INTERVAL:
+            slot.checked_at = now
+            self._check(kind, slot, wait=slot.model is None)
+        return slot.model
+
+    def refresh(self, kind: str, wait: bool = False) -> None:
+        """CURRENT 를 지금 확인해서 바뀌었으면 로드 (로더가 없는 kind 는 무시)."""
+        slot = self._slots.get(kind)
+        if slot is None:
+            return
+        slot.checked_at = time.monotonic()
+        slot.failed_version = None
+        self._check(kind, slot, wait=wait)
+
+    def _check(self, kind: str, slot: _Slot, wait: bool) -> None:
+        version = self.current_version(kind)
+        if version is None:
+            slot.error = f"{kind} 모델이 아직 없습니다 (학습 전)."
+            return
+        if version in (slot.version, slot.failed_version):
+            return
+
+        with self._lock:
+            if slot.loading:
+                return
+            slot.loading = True
+        if wait:
+            self._load(kind, slot, version)
+        else:
+            threading.Thread(
+                target=self._load, args=(kind, slot, version), name=f"dfy-registry-{kind}", daemon=True
+            ).start()
+
+    def _load(self, kind: str, slot: _Slot, version: str) -> None:
+        try:
+            manifest = self.manifest(kind, version)
+            model = slot.loader(self.open_bundle(kind, version), manifest)
+        except Exception as e:
+            slot.error = f"{kind} {version} 로드 실패: {e}"
+            slot.failed_version = version
+            print(f"[DFY][Registry][WARN] {slot.error}")
+            traceback.print_exc()
+            return
+        finally:
+            with self._lock:
+                slot.loading = False
+
+        # 참조 교체 (읽는 쪽은 이전 / 새 객체 중 하나만 본다)
+        with self._lock:
+            slot.model, slot.version, slot.error = model, version, None
+            listeners = list(self._listeners)
+        print(f"[DFY][Registry] {kind} 모델 로드: {version}")
+        for cb in listeners:
+            try:
+                cb(kind, version)
+            except Exception as e:
+                print("[DFY][Registry] listener 처리 중 오류:", e)
+                traceback.print_exc()
+
+
+# ----------------------------------------------------------------------
+# 전역 registry 관리
+# ----------------------------------------------------------------------
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """앱 전체에서 공유하는 ModelRegistry."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DFY 모델 레지스트리 (버전 목록 / 전환 / 롤백)")
+    parser.add_argument("command", choices=["list", "activate", "rollback"])
+    parser.add_argument("kind", choices=sorted(BUNDLE_NAMES))
+    parser.add_argument("version", nargs="?")
+    args = parser.parse_args()
+
+    reg = get_registry()
+    if args.command == "list":
+        current = reg.current_version(args.kind)
+        for v in reg.versions(args.kind):
+            meta = reg.manifest(args.kind, v).get("metadata", {})
+            print(f"{'*' if v == current else ' '} {v}  {json.dumps(meta, ensure_ascii=False, default=str)}")
+    elif args.command == "activate":
+        if not args.version:
+            parser.error("activate 에는 version 이 필요합니다.")
+        reg.activate(args.kind, args.version)
+    else:
+        reg.rollback(args.kind)
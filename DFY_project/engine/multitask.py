@@ -0,0 +1,136 @@
+# engine/multitask.py
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from model.bundle import BundleError, ModelBundle
+from model.features import FEATURE_KEYS
+from model.numpy_infer import NumpyMultitask
+from model.predictor import cpu_risk
+from engine import inference_cache, metrics_buffer, model_registry
+from engine.anomaly_detector import AEDetector
+
+# multitask 모델 재구성 점수의 분위수 상태 (AE 와 따로 둔다)
+STATE_PATH = Path(__file__).resolve().parents[1] / "internal" / "mt_score_quantiles.json"
+
+_CPU_INDEX = FEATURE_KEYS.index("cpu")
+
+
+class MultitaskDetector(AEDetector):
+    """
+    공유 encoder multi-task 모델 (model.multitask_model.LoadMultitaskModel) 로
+    이상 탐지와 부하 예측을 tick 당 한 번의 계산으로 처리한다.
+
+    - 재구성 쪽은 윈도우 AE 와 같다 (AEDetector 의 stream_update / 임계값 / 결과 형식 그대로)
+    - stream_update 가 쌓아 둔 최근 seq_len 개 encoder 코드로 forecast head 만 더 부른다
+    - assess_current_state() 결과 하나에 anomaly score / feature_errors / forecast / risk 가 같이 들어 있어서
+      이상 탐지 페이지(anomaly_detector)와 대시보드(analyzer.assess_load_risk)가 나눠 쓴다
+    """
+
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        version: Optional[str] = None,
+        thresholds_path: Optional[Path] = STATE_PATH,
+    ) -> None:
+        super().__init__(bundle, version=version, thresholds_path=thresholds_path)
+        if not isinstance(self.model, NumpyMultitask):
+            raise BundleError(f"multitask 번들이 아닙니다 (arch type={bundle.arch.get('type')})")
+        self.horizons = self.model.horizons
+        self.targets = self.model.targets
+        if "cpu" not in self.targets:
+            raise BundleError(f"multitask 번들 targets 에 cpu 가 없습니다: {self.targets}")
+        cols = [FEATURE_KEYS.index(k) for k in self.targets]
+        self._target_mean = self.feature_mean[cols]
+        self._target_std = self.feature_std[cols]
+        # 위험도는 가장 가까운 horizon 의 cpu 로 계산 (LoadPredictor 와 같은 기준)
+        self._risk_pos = (self.horizons.index(min(self.horizons)), self.targets.index("cpu"))
+
+    def forecast(self) -> Optional[np.ndarray]:
+        """스트리밍 코드 버퍼로 (H, T) 예측 (원래 단위). 코드가 seq_len 개 안 쌓였으면 None."""
+        with self._stream_lock:
+            codes = self._stream_codes
+        if codes is None or codes.shape[0] < self.model.seq_len:
+            return None
+        out = self.model.head(codes).reshape(len(self.horizons), len(self.targets))
+        return out * self._target_std + self._target_mean
+
+    def forecast_dict(self, out: np.ndarray) -> Dict[int, Dict[str, float]]:
+        """(H, T) 예측 → {horizon: {피처: 값}}."""
+        return {
+            h: {k: float(out[i, j]) for j, k in enumerate(self.targets)}
+            for i, h in enumerate(self.horizons)
+        }
+
+    def assess_current_state(self) -> Dict[str, Any]:
+        """
+        AEDetector 결과에 예측을 더한다:
+        "forecast" ({horizon: {피처: 값}}, 아직 없으면 None) 와
+        "load_risk" (analyzer.assess_load_risk 와 같은 형식, 아직 없으면 None).
+        """
+        result = super().assess_current_state()
+        out = self.forecast()
+        if out is None:
+            result.update({"forecast": None, "load_risk": None})
+            return result
+
+        window = metrics_buffer.get_feature_window(1)
+        current_cpu = None if window is None else float(window[-1, _CPU_INDEX])
+        pred_cpu = float(out[self._risk_pos])
+        status, risk_score = cpu_risk(pred_cpu)
+        forecast = self.forecast_dict(out)
+        result.update({
+            "forecast": forecast,
+            "load_risk": {
+                "status": status,
+                "risk_score": risk_score,
+                "predicted_cpu": pred_cpu,
+                "current_cpu": current_cpu,
+                "forecast": forecast,
+                "tier": "multitask",
+            },
+        })
+        return result
+
+
+# ----------------------------------------------------------------------
+# detector 관리 (model_registry 의 "multitask" 버전)
+# ----------------------------------------------------------------------
+
+def _load_detector(bundle: ModelBundle, manifest: Dict[str, Any]) -> MultitaskDetector:
+    """registry 로더: 검증된 "multitask" 번들로 MultitaskDetector 를 만든다."""
+    return MultitaskDetector(bundle, version=manifest.get("version"))
+
+
+model_registry.get_registry().register_loader("multitask", _load_detector)
+
+
+def get_detector() -> Optional[MultitaskDetector]:
+    """현재 multitask detector (학습된 버전이 없으면 None, 그때는 AE / LSTM 을 따로 쓴다)."""
+    return model_registry.get_registry().get("multitask")
+
+
+def get_latest() -> Optional[Dict[str, Any]]:
+    """
+    이번 tick 의 multitask 결과 (detector 가 없으면 None).
+    이상 탐지 / 부하 예측이 같은 tick 에 부르면 inference_cache 로 한 번만 계산한다.
+    """
+    det = get_detector()
+    if det is None:
+        return None
+
+    def _assess() -> Dict[str, Any]:
+        result = det.assess_current_state()
+        result["model_version"] = model_registry.get_registry().loaded_version("multitask")
+        result["model_kind"] = "multitask"
+        return result
+
+    return inference_cache.get_cache().get(("multitask", id(det)), _assess)
+
+
+def save_state() -> None:
+    """분위수 스케치 상태 저장 (앱 종료 시 호출)."""
+    det = model_registry.get_registry().get("multitask")
+    if det is not None:
+        det.adaptive.save()
@@ -0,0 +1,230 @@
+# engine/rollup.py
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+# 집계 필드 순서 (RollupTier._agg 의 두 번째 축)
+AGG_FIELDS = ["min", "max", "mean", "last"]
+_MIN, _MAX, _MEAN, _LAST = range(4)
+
+
+class RollupTier:
+    """
+    bucket_seconds 단위로 다운샘플한 집계 원형 버퍼.
+
+    - 각 bucket 은 메트릭별 min / max / mean / last 를 float32 로 저장
+    - bucket 시작 시각은 float64
+    - add() 가 들어올 때마다 진행 중인 bucket 누적값만 갱신하고 (O(메트릭 수)),
+      시간이 다음 bucket 으로 넘어가면 그때 한 행을 확정해서 기록한다.
+    - NaN(값 없음)은 집계에서 제외한다.
+    """
+
+    def __init__(self, bucket_seconds: float, capacity: int, num_columns: int) -> None:
+        self.bucket_seconds = float(bucket_seconds)
+        self.capacity = int(capacity)
+        self.num_columns = int(num_columns)
+
+        self._ts = np.zeros(self.capacity, dtype=np.float64)
+        self._agg = np.full((self.capacity, 4, self.num_columns), np.nan, dtype=np.float32)
+        self._head = 0
+        self._count = 0
+
+        self._reset_current()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def span_seconds(self) -> float:
+        """이 tier 가 보관할 수 있는 최대 기간 (초)."""
+        return self.bucket_seconds * self.capacity
+
+    # ---- 누적 ----
+
+    def _reset_current(self) -> None:
+        self._cur_bucket: Optional[int] = None
+        self._sum = np.zeros(self.num_columns, dtype=np.float64)
+        self._cnt = np.zeros(self.num_columns, dtype=np.int64)
+        self._min = np.full(self.num_columns, np.nan, dtype=np.float32)
+        self._max = np.full(self.num_columns, np.nan, dtype=np.float32)
+        self._last = np.full(self.num_columns, np.nan, dtype=np.float32)
+
+    def _current_row(self) -> np.ndarray:
+        row = np.empty((4, self.num_columns), dtype=np.float32)
+        row[_MIN] = self._min
+        row[_MAX] = self._max
+        with np.errstate(invalid="ignore", divide="ignore"):
+            row[_MEAN] = np.where(self._cnt > 0, self._sum / np.maximum(self._cnt, 1), np.nan)
+        row[_LAST] = self._last
+        return row
+
+    def _flush(self) -> None:
+        if self._cur_bucket is None:
+            return
+        i = self._head
+        self._ts[i] = self._cur_bucket * self.bucket_seconds
+        self._agg[i] = self._current_row()
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self._reset_current()
+
+    def add(self, ts: float, row: np.ndarray) -> None:
+        bucket = int(math.floor(ts / self.bucket_seconds))
+        if self._cur_bucket is not None and bucket != self._cur_bucket:
+            self._flush()
+        self._cur_bucket = bucket
+
+        mask = ~np.isnan(row)
+        self._sum[mask] += row[mask]
+        self._cnt[mask] += 1
+        self._min = np.fmin(self._min, row)
+        self._max = np.fmax(self._max, row)
+        self._last = np.where(mask, row, self._last)
+
+    def add_bulk(self, ts: np.ndarray, values: np.ndarray) -> None:
+        """
+        시간순 (N,) / (N, M) 배열을 한 번에 집계해서 넣는다 (기록 복원용).
+        bucket 경계는 reduceat 으로 벡터화해서 계산하고,
+        마지막 bucket 은 진행 중 누적값으로 남겨 이후 add() 와 이어지게 한다.
+        """
+        n = ts.shape[0]
+        if n == 0:
+            return
+
+        buckets = np.floor(ts / self.bucket_seconds).astype(np.int64)
+        if self._cur_bucket is not None and buckets[0] != self._cur_bucket:
+            self._flush()
+
+        # 진행 중 bucket 과 이어지는 앞부분은 add() 로 처리
+        head_n = int(np.searchsorted(buckets, buckets[0], side="right")) if buckets[0] == self._cur_bucket else 0
+        for i in range(head_n):
+            self.add(float(ts[i]), values[i])
+        ts, values, buckets = ts[head_n:], values[head_n:], buckets[head_n:]
+        n = ts.shape[0]
+        if n == 0:
+            return
+        if self._cur_bucket is not None:
+            self._flush()
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], n] - 1
+
+        valid = ~np.isnan(values)
+        mins = np.fmin.reduceat(values, starts, axis=0)
+        maxs = np.fmax.reduceat(values, starts, axis=0)
+        sums = np.add.reduceat(np.where(valid, values, 0.0).astype(np.float64), starts, axis=0)
+        cnts = np.add.reduceat(valid.astype(np.int64), starts, axis=0)
+
+        # 각 bucket 안에서 마지막으로 값이 있던 행의 값 (forward-fill 인덱스)
+        pos = np.where(valid, np.arange(n)[:, None], -1)
+        ffill = np.maximum.accumulate(pos, axis=0)
+        last_pos = ffill[ends]
+        has_last = last_pos >= starts[:, None]
+        lasts = np.where(has_last, values[np.maximum(last_pos, 0), np.arange(self.num_columns)], np.nan)
+
+        # 마지막 bucket 을 제외한 나머지는 확정 행으로 기록
+        done = len(starts) - 1
+        if done > 0:
+            agg = np.empty((done, 4, self.num_columns), dtype=np.float32)
+            agg[:, _MIN] = mins[:done]
+            agg[:, _MAX] = maxs[:done]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                agg[:, _MEAN] = np.where(cnts[:done] > 0, sums[:done] / np.maximum(cnts[:done], 1), np.nan)
+            agg[:, _LAST] = lasts[:done]
+            bts = buckets[starts[:done]] * self.bucket_seconds
+            if done > self.capacity:
+                agg, bts = agg[-self.capacity:], bts[-self.capacity:]
+                done = self.capacity
+            idx = (self._head + np.arange(done)) % self.capacity
+            self._ts[idx] = bts
+            self._agg[idx] = agg
+            self._head = (self._head + done) % self.capacity
+            self._count = min(self.capacity, self._count + done)
+
+        # 마지막 bucket 은 진행 중 상태로
+        self._cur_bucket = int(buckets[starts[-1]])
+        self._sum = sums[-1].astype(np.float64)
+        self._cnt = cnts[-1].astype(np.int64)
+        self._min = mins[-1].astype(np.float32)
+        self._max = maxs[-1].astype(np.float32)
+        self._last = lasts[-1].astype(np.float32)
+
+    def clear(self) -> None:
+        self._ts[:] = 0.0
+        self._agg[:] = np.nan
+        self._head = 0
+        self._count = 0
+        self._reset_current()
+
+    # ---- 조회 ----
+
+    def oldest_timestamp(self) -> Optional[float]:
+        if self._count > 0:
+            return float(self._ts[(self._head - self._count) % self.capacity])
+        if self._cur_bucket is not None:
+            return self._cur_bucket * self.bucket_seconds
+        return None
+
+    def snapshot(self, include_current: bool = True):
+        """
+        (bucket 시작 시각 (N,), 집계 (N, 4, M)) 를 시간순으로 복사해서 반환.
+        include_current=True 면 아직 확정되지 않은 진행 중 bucket 도 마지막에 붙인다.
+        """
+        idx = (np.arange(self._count) + self._head - self._count) % self.capacity
+        ts = self._ts[idx]
+        agg = self._agg[idx]
+        if include_current and self._cur_bucket is not None:
+            ts = np.append(ts, self._cur_bucket * self.bucket_seconds)
+            agg = np.concatenate([agg, self._current_row()[None]], axis=0)
+        return ts, agg
+
+
+def aggregate_blocks(ts: np.ndarray, agg: np.ndarray, max_points: int):
+    """
+    (N,) / (N, 4, M) 집계 배열을 max_points 이하가 되도록 연속 블록 단위로 다시 묶는다.
+    min/max/mean/last 의미는 그대로 유지 (mean 은 블록 내 bucket 평균).
+    """
+    n = ts.shape[0]
+    if max_points <= 0 or n <= max_points:
+        return ts, agg
+
+    block = int(math.ceil(n / max_points))
+    pad = (-n) % block
+    if pad:
+        # 앞쪽을 NaN 으로 채워서 마지막 블록이 최신 값으로 끝나게 한다
+        ts = np.concatenate([np.full(pad, ts[0]), ts])
+        agg = np.concatenate([np.full((pad,) + agg.shape[1:], np.nan, dtype=agg.dtype), agg])
+
+    ts_b = ts.reshape(-1, block)
+    agg_b = agg.reshape(-1, block, *agg.shape[1:])
+
+    out = np.empty((agg_b.shape[0],) + agg.shape[1:], dtype=agg.dtype)
+    with np.errstate(invalid="ignore"):
+        # fmin/fmax 는 NaN 을 무시한다 (전부 NaN 이면 NaN)
+        out[:, _MIN] = np.fmin.reduce(agg_b[:, :, _MIN], axis=1)
+        out[:, _MAX] = np.fmax.reduce(agg_b[:, :, _MAX], axis=1)
+        mean_vals = agg_b[:, :, _MEAN]
+        valid = ~np.isnan(mean_vals)
+        out[:, _MEAN] = np.where(
+            valid.any(axis=1),
+            np.nansum(mean_vals, axis=1) / np.maximum(valid.sum(axis=1), 1),
+            np.nan,
+        )
+        # 블록 안에서 마지막으로 값이 있던 bucket 의 last
+        last_vals = agg_b[:, :, _LAST]
+        last_valid = ~np.isnan(last_vals)
+        last_idx = block - 1 - np.argmax(last_valid[:, ::-1], axis=1)
+        picked = np.take_along_axis(last_vals, last_idx[:, None, :], axis=1)[:, 0]
+        out[:, _LAST] = np.where(last_valid.any(axis=1), picked, np.nan)
+
+    return ts_b[:, 0], out
+
+
+def to_result(resolution: float, ts: np.ndarray, agg: np.ndarray) -> Dict[str, np.ndarray]:
+    """query 결과 dict 로 변환: {"resolution", "timestamp", "min", "max", "mean", "last"}."""
+    result: Dict[str, np.ndarray] = {"resolution": resolution, "timestamp": ts}
+    for i, name in enumerate(AGG_FIELDS):
+        result[name] = agg[:, i]
+    return result
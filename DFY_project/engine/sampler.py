@@ -0,0 +1,158 @@
+# engine/sampler.py
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from engine import collector, metrics_buffer
+from engine.history_store import HistoryWriter, get_writer, read_recent
+
+# 샘플 하나를 받는 콜백: metrics(dict) -> None
+SampleListener = Callable[[Dict[str, Any]], None]
+
+
+class MetricsSampler:
+    """
+    Qt 이벤트 루프와 분리된 백그라운드 샘플링 스레드.
+
+    - time.monotonic() 기준 고정 주기(interval)로 collector 스냅샷을 읽는다.
+    - 각 틱의 목표 시각은 "시작 시각 + k * interval" 로 고정해서,
+      센서 읽기 시간이 조금씩 밀려도 주기가 누적해서 틀어지지 않게 한다.
+    - 한 틱이 interval 보다 오래 걸리면 밀린 틱은 건너뛴다 (몰아서 읽지 않음).
+    - 읽은 샘플은 metrics_buffer 에 기록한 뒤 등록된 listener 들에게 전달한다.
+    - store(HistoryWriter)가 주어지면 같은 샘플을 디스크에도 append 하고,
+      시작할 때 최근 기록으로 metrics_buffer 를 복원한다.
+
+    보통은 engine.metrics_hub 가 유일한 listener 로 붙어서
+    페이지/탐지기들에게 샘플을 나눠준다.
+    """
+
+    # 시작 시 디스크 기록에서 복원할 기간 (초)
+    RESTORE_SECONDS = 24 * 3600
+
+    def __init__(self, interval: float = 1.0, store: Optional[HistoryWriter] = None) -> None:
+        self.interval = float(interval)
+        self.store = store
+        self.missed_ticks = 0
+
+        self._listeners: List[SampleListener] = []
+        self._lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- listener 관리 ----
+
+    def add_listener(self, listener: SampleListener) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: SampleListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    # ---- 시작 / 종료 ----
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        if self.store is not None and metrics_buffer.size() == 0:
+            self._restore_history()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="DFY-MetricsSampler",
+            daemon=True,
+        )
+        self._thread.start()
+        print(f"[DFY][Sampler] 샘플링 시작 (interval={self.interval:.2f}s)")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        if self.store is not None:
+            self.store.close()
+
+    def _restore_history(self) -> None:
+        """재시작해도 이력이 이어지도록, 최근 기록으로 버퍼를 채운다."""
+        try:
+            ts, values = read_recent(self.RESTORE_SECONDS, directory=self.store.directory)
+            metrics_buffer.restore(ts, values)
+            if ts.shape[0]:
+                print(f"[DFY][Sampler] 이전 기록 {ts.shape[0]}개 복원")
+        except Exception as e:
+            print("[DFY][Sampler] 이전 기록 복원 실패:", e)
+            traceback.print_exc()
+
+    def sample_once(self) -> Dict[str, Any]:
+        """
+        스레드 없이 한 틱만 직접 실행 (스크립트/테스트용).
+        스레드 루프와 동시에 불려도 틱 단위로 직렬화된다.
+        """
+        return self._tick()
+
+    # ---- 내부 루프 ----
+
+    def _tick(self) -> Dict[str, Any]:
+        """센서를 한 번 읽고 버퍼/리스너에 전달."""
+        with self._lock:
+            listeners = list(self._listeners)
+
+        # 틱 단위로 직렬화해서 버퍼/리스너에 들어가는 순서가 섞이지 않게 한다
+        with self._tick_lock:
+            metrics = collector.collect_snapshot().as_dict()
+            metrics_buffer.add_sample(metrics)
+            if self.store is not None:
+                self.store.append_metrics(metrics)
+
+            for listener in listeners:
+                try:
+                    listener(metrics)
+                except Exception as e:
+                    print("[DFY][Sampler] listener 처리 중 오류:", e)
+                    traceback.print_exc()
+
+        return metrics
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+
+        while not self._stop_event.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                print("[DFY][Sampler] 샘플링 중 오류:", e)
+                traceback.print_exc()
+
+            # 다음 목표 시각은 이전 목표 시각 기준 (drift 보정)
+            next_tick += self.interval
+            now = time.monotonic()
+            if now > next_tick:
+                # 이미 지나간 틱들은 건너뛰고 다음 격자 시각에 맞춘다
+                missed = int((now - next_tick) // self.interval) + 1
+                next_tick += missed * self.interval
+                self.missed_ticks += missed
+
+            self._stop_event.wait(max(0.0, next_tick - now))
+
+
+# ----------------------------------------------------------------------
+# 전역 sampler 관리
+# ----------------------------------------------------------------------
+
+_sampler: Optional[MetricsSampler] = None
+
+
+def get_sampler() -> MetricsSampler:
+    """앱 전체에서 공유하는 MetricsSampler (1초 주기, data/history 에 기록)를 돌려준다."""
+    global _sampler
+    if _sampler is None:
+        _sampler = MetricsSampler(interval=1.0, store=get_writer())
+    return _sampler
@@ -0,0 +1,145 @@
+# engine/score_thresholds.py
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from engine.stream_stats import P2Quantile
+
+# 실시간 AE 점수 분위수 상태 (모델 버전별로 하나, 버전이 바뀌면 새로 시작)
+STATE_PATH = Path(__file__).resolve().parents[1] / "internal" / "ae_score_quantiles.json"
+
+WARN_QUANTILE = 0.99
+CRITICAL_QUANTILE = 0.999
+# 이만큼 점수가 쌓이기 전에는 학습 때 정한 고정 임계값을 쓴다.
+# 스케치는 판정 tick(STREAM_EVERY=3 샘플마다) 중 정상 점수만 받으므로, 1초 샘플링 기준으로
+# 점 단위 AE 는 audit tick(cascade.AUDIT_EVERY=10 tick 에 하나)만 → 약 5시간,
+# 윈도우 AE 는 매 tick → 약 30분이 걸린다 (p99.9 추정에 필요한 최소 표본이라 줄이지 않는다)
+MIN_SAMPLES = 600
+# 상태 파일 저장 주기 (update 횟수)
+SAVE_EVERY = 60
+# 스케치에는 정상 점수만 넣으므로, 임계값은 정상 분포의 분위수에서 이만큼 띄운다
+# (배율 없이 잘린 분포의 분위수를 그대로 쓰면 임계값이 계속 내려가기만 한다)
+HEADROOM = 1.25
+# 스케치 저장 형식 (정상 점수만 넣도록 바뀌기 전의 상태는 버린다)
+_STATE_FORMAT = 2
+
+
+class AdaptiveThresholds:
+    """
+    실시간 재구성 오차 분포에서 WARN / CRITICAL 임계값을 계속 다시 잡는 엔진.
+
+    - 정상(현재 warn 미만) 점수의 p99 / p99.9 를 P² 스케치(고정 메모리)로 추정하고,
+      HEADROOM 배를 warn / critical 로 쓴다
+      (오차 분포는 꼬리가 길어서 mean + k·std 보다 분위수가 사용 패턴 변화를 잘 따라간다)
+    - WARN / CRITICAL 점수는 스케치에 넣지 않는다 → 오래 이어지는 이상이 자기 임계값을 끌어올리지 못한다
+    - 임계값은 번들의 고정 임계값(static_*, 학습 때 mean + 2σ / 4σ) 아래로 내려가지 않는다
+      → 건강한 PC 에서 "자기 출력의 p99" 때문에 항상 1% 가 경고로 뜨는 일이 없다
+    - min_samples 개가 쌓이기 전에는 고정 임계값을 그대로 쓴다
+    - 스케치 상태는 path 에 model_version 과 함께 저장되어, 재시작해도 이어서 쓴다
+      (path=None 이면 메모리에만 둔다)
+    """
+
+    def __init__(
+        self,
+        model_version: Optional[str],
+        static_warn: float,
+        static_critical: float,
+        path: Optional[Path] = STATE_PATH,
+        min_samples: int = MIN_SAMPLES,
+    ) -> None:
+        self.model_version = model_version
+        self.static_warn = float(static_warn)
+        self.static_critical = float(static_critical)
+        self.path = Path(path) if path is not None else None
+        self.min_samples = int(min_samples)
+
+        self._lock = threading.Lock()
+        self._warn = P2Quantile(WARN_QUANTILE)
+        self._critical = P2Quantile(CRITICAL_QUANTILE)
+        self._pending = 0
+        self._load()
+
+    # ---- 상태 저장 / 복원 ----
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("format") != _STATE_FORMAT:
+                print("[DFY][AE] 분위수 상태 형식이 예전 것이라 새로 시작합니다.")
+                return
+            if state.get("model_version") != self.model_version:
+                print(f"[DFY][AE] 분위수 상태가 다른 모델 버전({state.get('model_version')}) 것이라 새로 시작합니다.")
+                return
+            self._warn = P2Quantile.from_dict(state["warn"])
+            self._critical = P2Quantile.from_dict(state["critical"])
+        except Exception as e:
+            print(f"[DFY][AE] 분위수 상태 로드 실패, 새로 시작합니다: {e}")
+
+    def save(self) -> None:
+        """스케치 상태를 임시 파일에 쓴 뒤 os.replace 로 교체한다."""
+        if self.path is None:
+            return
+        with self._lock:
+            state = {
+                "format": _STATE_FORMAT,
+                "model_version": self.model_version,
+                "updated_at": time.time(),
+                "warn": self._warn.to_dict(),
+                "critical": self._critical.to_dict(),
+            }
+            self._pending = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[DFY][AE] 분위수 상태 저장 실패: {e}")
+
+    # ---- 갱신 / 조회 ----
+
+    def update(self, score: float) -> None:
+        """정상 점수 하나를 스케치에 넣는다 (현재 warn 이상인 점수는 호출하는 쪽에서 거른다)."""
+        with self._lock:
+            self._warn.update(score)
+            self._critical.update(score)
+            self._pending += 1
+            due = self._pending >= SAVE_EVERY
+        if due:
+            self.save()
+
+    @property
+    def count(self) -> int:
+        return self._warn.count
+
+    def current(self) -> Dict[str, Any]:
+        """
+        지금 쓸 임계값.
+        {"warn_threshold", "critical_threshold", "source": "adaptive" | "static",
+         "samples", "p99", "p999"}
+        """
+        with self._lock:
+            n = self._warn.count
+            p99 = self._warn.value()
+            p999 = self._critical.value()
+        if n >= self.min_samples and p99 is not None and p999 is not None:
+            warn = max(self.static_warn, HEADROOM * p99)
+            critical = max(self.static_critical, HEADROOM * p999, warn)
+            source = "adaptive"
+        else:
+            warn, critical, source = self.static_warn, self.static_critical, "static"
+        return {
+            "warn_threshold": warn,
+            "critical_threshold": critical,
+            "source": source,
+            "samples": n,
+            "p99": p99,
+            "p999": p999,
+        }
@@ -0,0 +1,356 @@
+# engine/spike_detector.py
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from engine import metrics_buffer, metrics_hub
+from engine.metrics_buffer import METRIC_KEYS
+
+# MAD → 표준편차 환산 계수 (정규분포 가정)
+_MAD_SCALE = 0.6745
+
+DEFAULT_WINDOW = 60         # 기준선으로 쓰는 직전 샘플 수
+DEFAULT_Z = 3.0             # rolling z-score 1차 게이트
+DEFAULT_MAD_Z = 3.5         # rolling MAD 기반 robust z 확정 기준
+DEFAULT_MIN_PERIODS = 10    # 기준선에 최소 이만큼 값이 있어야 판정
+# 기준선이 거의 평평할 때 표준편차 하한 (|평균| 대비 비율). 사용률이 고정돼 있다가
+# 소수점 단위로만 바뀌는 메트릭(disk_usage 등)이 매번 스파이크로 잡히지 않게 한다.
+_REL_STD_FLOOR = 0.01
+
+# 진단 문구 / 이상 탐지 페이지에 쓰는 메트릭 이름
+METRIC_LABELS: Dict[str, str] = {
+    "cpu_usage": "CPU 사용률",
+    "ram_usage": "메모리 사용률",
+    "gpu_usage": "GPU 사용률",
+    "gpu_temp": "GPU 온도",
+    "disk_read": "디스크 읽기 속도",
+    "disk_write": "디스크 쓰기 속도",
+    "net_upload": "업로드 속도",
+    "net_download": "다운로드 속도",
+    "cpu_temp": "CPU 온도",
+    "disk_usage": "시스템 드라이브 사용량",
+}
+
+
+@dataclass(frozen=True)
+class SpikeEvent:
+    """한 메트릭의 한 샘플에서 감지된 스파이크."""
+
+    key: str
+    timestamp: float
+    value: float
+    baseline: float     # 직전 window 의 median
+    z: float            # rolling z-score
+    robust_z: float     # 0.6745 * (value - median) / MAD
+
+    @property
+    def direction(self) -> str:
+        return "up" if self.value >= self.baseline else "down"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "timestamp": self.timestamp,
+            "value": self.value,
+            "baseline": self.baseline,
+            "z": self.z,
+            "robust_z": self.robust_z,
+            "direction": self.direction,
+        }
+
+
+def _zscore(x: np.ndarray, mean: np.ndarray, var: np.ndarray, ok: np.ndarray) -> np.ndarray:
+    """기준선 (mean, var) 대비 z-score. ok 가 아닌 위치는 0, 표준편차는 _REL_STD_FLOOR 로 하한."""
+    std = np.maximum(np.sqrt(np.maximum(var, 0.0)), _REL_STD_FLOOR * np.abs(mean))
+    dev = x - mean
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(std > 0, dev / np.where(std > 0, std, 1.0), np.sign(dev) * np.inf)
+    return np.where(ok, z, 0.0)
+
+
+def _robust_z(x: np.ndarray, windows: np.ndarray):
+    """
+    x (K,) 값들을 각자의 기준 윈도우 windows (K, w) 의 median / MAD 로 평가.
+    MAD 가 0(기준선이 평평)이면 median 에서 벗어난 값은 무한대로 본다.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        med = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - med[:, None]), axis=1)
+        dev = x - med
+        rz = np.where(mad > 0, _MAD_SCALE * dev / np.where(mad > 0, mad, 1.0), np.sign(dev) * np.inf)
+    return med, np.where(dev == 0, 0.0, rz)
+
+
+# ---------- batch 모드 (하루치 기록 등 전체 배열) ----------
+
+def detect_batch(
+    values: np.ndarray,
+    timestamps: Optional[np.ndarray] = None,
+    keys: Optional[Sequence[str]] = None,
+    window: int = DEFAULT_WINDOW,
+    z_threshold: float = DEFAULT_Z,
+    mad_threshold: float = DEFAULT_MAD_Z,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+) -> Dict[str, Any]:
+    """
+    (N, M) 배열 전체를 한 번에 검사한다. 각 샘플은 자기 직전 window개 샘플을 기준선으로 삼는다
+    (스트리밍 SpikeDetector.update 와 같은 판정).
+
+    1) 누적합으로 모든 (행, 메트릭) 의 rolling mean / std → |z| > z_threshold 인 후보만 추림
+    2) 후보 위치에서만 직전 윈도우의 median / MAD 를 계산 → |robust z| > mad_threshold 이면 확정
+
+    반환:
+    {
+        "keys", "mask" (N, M) bool,
+        "rows", "cols", "timestamp", "value", "baseline", "z", "robust_z"   # 확정 스파이크별 (K,)
+        "counts": {key: 개수},
+        "cleaned": 스파이크 위치를 기준선 median 으로 바꾼 (N, M) 배열,
+    }
+    """
+    v = np.asarray(values, dtype=np.float64)
+    if v.ndim == 1:
+        v = v[:, None]
+    n, m = v.shape
+    if keys is None:
+        keys = list(METRIC_KEYS) if m == len(METRIC_KEYS) else [str(i) for i in range(m)]
+    keys = list(keys)
+    window = max(1, int(window))
+
+    valid = ~np.isnan(v)
+    v0 = np.where(valid, v, 0.0)
+
+    # 직전 window개 구간 [i - window, i) 의 합 / 제곱합 / 개수
+    zero = np.zeros((1, m))
+    cs = np.concatenate([zero, np.cumsum(v0, axis=0)])
+    cs2 = np.concatenate([zero, np.cumsum(v0 * v0, axis=0)])
+    cn = np.concatenate([zero, np.cumsum(valid, axis=0)])
+    hi = np.arange(n)
+    lo = np.maximum(hi - window, 0)
+    s = cs[hi] - cs[lo]
+    s2 = cs2[hi] - cs2[lo]
+    cnt = cn[hi] - cn[lo]
+
+    mean = s / np.maximum(cnt, 1)
+    var = s2 / np.maximum(cnt, 1) - mean * mean
+    z = _zscore(v0, mean, var, valid & (cnt >= min_periods))
+
+    rows, cols = np.nonzero(np.abs(z) > z_threshold)
+
+    # 후보 위치의 직전 윈도우: 앞을 NaN 으로 채운 배열에서 [i, i + window) 가 원래의 [i - window, i)
+    padded = np.concatenate([np.full((window, m), np.nan), v])
+    views = sliding_window_view(padded, window, axis=0)   # (N + 1, M, window), 복사 없음
+    med, rz = _robust_z(v[rows, cols], views[rows, cols])
+
+    keep = np.abs(rz) > mad_threshold
+    rows, cols, med, rz = rows[keep], cols[keep], med[keep], rz[keep]
+
+    mask = np.zeros((n, m), dtype=bool)
+    mask[rows, cols] = True
+    cleaned = v.copy()
+    cleaned[rows, cols] = med
+
+    ts = np.asarray(timestamps, dtype=np.float64) if timestamps is not None else np.arange(n, dtype=np.float64)
+    counts = np.bincount(cols, minlength=m)
+    return {
+        "keys": keys,
+        "mask": mask,
+        "rows": rows,
+        "cols": cols,
+        "timestamp": ts[rows],
+        "value": v[rows, cols],
+        "baseline": med,
+        "z": z[rows, cols],
+        "robust_z": rz,
+        "counts": {k: int(c) for k, c in zip(keys, counts)},
+        "cleaned": cleaned,
+    }
+
+
+def batch_events(result: Dict[str, Any]) -> List[SpikeEvent]:
+    """detect_batch 결과를 SpikeEvent 리스트(시간순)로 변환."""
+    keys = result["keys"]
+    return [
+        SpikeEvent(keys[c], float(t), float(x), float(b), float(z), float(r))
+        for c, t, x, b, z, r in zip(
+            result["cols"], result["timestamp"], result["value"],
+            result["baseline"], result["z"], result["robust_z"],
+        )
+    ]
+
+
+def scan_history(start: float, end: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+    """영구 기록(history_store)의 [start, end] 구간을 batch 모드로 검사."""
+    from engine import history_store
+
+    ts, values = history_store.read_range(start, end)
+    return detect_batch(values, timestamps=ts, keys=METRIC_KEYS, **kwargs)
+
+
+# ---------- 스트리밍 모드 (매 tick) ----------
+
+SpikeListener = Callable[[List[SpikeEvent]], None]
+
+
+class SpikeDetector:
+    """
+    샘플이 들어올 때마다 전체 메트릭을 한 번에 판정하는 스트리밍 스파이크 탐지기.
+
+    - 직전 window개 샘플을 (window, M) 원형 배열로 들고, 합 / 제곱합을 append 시 갱신 (O(M))
+    - |z| 가 게이트를 넘은 메트릭에 대해서만 median / MAD 를 계산
+    - 판정 기준은 detect_batch 와 같으므로, 같은 데이터에 대해 같은 스파이크를 낸다
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = METRIC_KEYS,
+        window: int = DEFAULT_WINDOW,
+        z_threshold: float = DEFAULT_Z,
+        mad_threshold: float = DEFAULT_MAD_Z,
+        min_periods: int = DEFAULT_MIN_PERIODS,
+        max_events: int = 500,
+    ) -> None:
+        self.keys = list(keys)
+        self.window = max(1, int(window))
+        self.z_threshold = float(z_threshold)
+        self.mad_threshold = float(mad_threshold)
+        self.min_periods = int(min_periods)
+
+        self._lock = threading.Lock()
+        self._listeners: List[SpikeListener] = []
+        self._events: Deque[SpikeEvent] = deque(maxlen=max_events)
+        self._sub: Optional[metrics_hub.Subscription] = None
+        self.reset()
+
+    def reset(self) -> None:
+        m = len(self.keys)
+        self._ring = np.full((self.window, m), np.nan, dtype=np.float64)
+        self._pos = 0
+        self._sum = np.zeros(m, dtype=np.float64)
+        self._sumsq = np.zeros(m, dtype=np.float64)
+        self._cnt = np.zeros(m, dtype=np.int64)
+
+    # ---- 기준선 갱신 ----
+
+    def _push(self, row: np.ndarray) -> None:
+        old = self._ring[self._pos]
+        ovalid = ~np.isnan(old)
+        o0 = np.where(ovalid, old, 0.0)
+        self._sum -= o0
+        self._sumsq -= o0 * o0
+        self._cnt -= ovalid
+
+        valid = ~np.isnan(row)
+        x0 = np.where(valid, row, 0.0)
+        self._sum += x0
+        self._sumsq += x0 * x0
+        self._cnt += valid
+
+        self._ring[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+
+    def prime(self, values: np.ndarray) -> None:
+        """최근 기록 (N, M) 으로 기준선을 채운다 (판정 없이)."""
+        v = np.asarray(values, dtype=np.float64)[-self.window:]
+        with self._lock:
+            self.reset()
+            self._ring[: len(v)] = v
+            self._pos = len(v) % self.window
+            valid = ~np.isnan(self._ring)
+            r0 = np.where(valid, self._ring, 0.0)
+            self._sum = r0.sum(axis=0)
+            self._sumsq = (r0 * r0).sum(axis=0)
+            self._cnt = valid.sum(axis=0)
+
+    # ---- 판정 ----
+
+    def update(self, timestamp: float, row: np.ndarray) -> List[SpikeEvent]:
+        """새 샘플 한 행 (M,) 을 판정하고, 기준선에 넣은 뒤 이번 tick 의 스파이크 이벤트를 반환."""
+        x = np.asarray(row, dtype=np.float64)
+        with self._lock:
+            cnt = self._cnt
+            mean = self._sum / np.maximum(cnt, 1)
+            var = self._sumsq / np.maximum(cnt, 1) - mean * mean
+            valid = ~np.isnan(x)
+            z = _zscore(np.where(valid, x, 0.0), mean, var, valid & (cnt >= self.min_periods))
+
+            cols = np.flatnonzero(np.abs(z) > self.z_threshold)
+            events: List[SpikeEvent] = []
+            if cols.size:
+                # 원형 배열 순서는 median / MAD 에 영향이 없으므로 그대로 사용
+                med, rz = _robust_z(x[cols], self._ring[:, cols].T)
+                for c, b, r in zip(cols, med, rz):
+                    if abs(r) > self.mad_threshold:
+                        events.append(SpikeEvent(self.keys[c], float(timestamp), float(x[c]), float(b), float(z[c]), float(r)))
+                self._events.extend(events)
+
+            self._push(x)
+            listeners = list(self._listeners) if events else []
+
+        for cb in listeners:
+            try:
+                cb(events)
+            except Exception:
+                print("[DFY][Spike] listener 오류")
+                traceback.print_exc()
+        return events
+
+    def update_metrics(self, metrics: Dict[str, Any]) -> List[SpikeEvent]:
+        ts = metrics.get("timestamp")
+        return self.update(float(ts) if ts is not None else time.time(), metrics_buffer.metrics_to_row(metrics))
+
+    # ---- 이벤트 조회 / 구독 ----
+
+    def add_listener(self, cb: SpikeListener) -> None:
+        with self._lock:
+            if cb not in self._listeners:
+                self._listeners.append(cb)
+
+    def remove_listener(self, cb: SpikeListener) -> None:
+        with self._lock:
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+    def recent_events(self, since: Optional[float] = None) -> List[SpikeEvent]:
+        """최근 스파이크 이벤트 (since 이후만, 시간순)."""
+        with self._lock:
+            events = list(self._events)
+        if since is not None:
+            events = [e for e in events if e.timestamp > since]
+        return events
+
+    # ---- hub 연결 ----
+
+    def attach(self, hub: metrics_hub.MetricsHub) -> None:
+        """버퍼의 최근 기록으로 기준선을 채우고 hub 의 매 샘플을 구독한다."""
+        if self._sub is not None:
+            return
+        _, values = metrics_buffer.get_window(self.window)
+        self.prime(values)
+        self._sub = hub.subscribe(self._on_samples, every=1, window=1)
+
+    def detach(self, hub: metrics_hub.MetricsHub) -> None:
+        if self._sub is not None:
+            hub.unsubscribe(self._sub)
+            self._sub = None
+
+    def _on_samples(self, samples: List[Dict[str, Any]]) -> None:
+        # sampler 스레드에서 호출됨
+        self.update_metrics(samples[-1])
+
+
+_detector: Optional[SpikeDetector] = None
+
+
+def get_detector() -> SpikeDetector:
+    """hub 에 연결된 전역 스트리밍 탐지기."""
+    global _detector
+    if _detector is None:
+        _detector = SpikeDetector()
+        _detector.attach(metrics_hub.get_hub())
+    return _detector
@@ -0,0 +1,275 @@
+# engine/stream_stats.py
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+class StreamingStats:
+    """
+    샘플이 들어올 때마다 O(메트릭 수)로 갱신되는 메트릭별 통계.
+
+    - 누적(Welford)  : count / mean / variance / min / max
+    - EWMA           : span 별 지수가중 평균 / 분산 (alpha = 2 / (span + 1))
+    - 고정 윈도우    : 최근 w개 샘플의 mean / std
+                       (버퍼에서 빠져나가는 샘플 값을 같이 받아서 합/제곱합을 빼 준다)
+
+    모든 값은 (메트릭 수,) 배열로 들고 있어서, 소비자는 history 를 다시 훑지 않고
+    바로 읽을 수 있다. NaN(값 없음)은 해당 메트릭 갱신에서 제외한다.
+    """
+
+    # 윈도우 합/제곱합의 부동소수점 누적 오차를 없애기 위한 재동기화 주기 (샘플 수)
+    RESYNC_EVERY = 3600
+
+    def __init__(
+        self,
+        num_columns: int,
+        windows: Sequence[int] = (60, 300),
+        ewma_spans: Sequence[int] = (10, 60, 300),
+    ) -> None:
+        self.num_columns = int(num_columns)
+        self.windows = [int(w) for w in windows]
+        self.ewma_spans = [int(s) for s in ewma_spans]
+        self._alphas = np.array([2.0 / (s + 1.0) for s in self.ewma_spans], dtype=np.float64)[:, None]
+        self.reset()
+
+    def reset(self) -> None:
+        m = self.num_columns
+        # Welford
+        self.count = np.zeros(m, dtype=np.int64)
+        self.mean = np.zeros(m, dtype=np.float64)
+        self._m2 = np.zeros(m, dtype=np.float64)
+        self.min = np.full(m, np.nan, dtype=np.float64)
+        self.max = np.full(m, np.nan, dtype=np.float64)
+        self.last = np.full(m, np.nan, dtype=np.float64)
+        # EWMA (span 수, 메트릭 수)
+        self.ewm_mean = np.full((len(self.ewma_spans), m), np.nan, dtype=np.float64)
+        self.ewm_var = np.zeros((len(self.ewma_spans), m), dtype=np.float64)
+        # 고정 윈도우 (윈도우 수, 메트릭 수)
+        self._w_sum = np.zeros((len(self.windows), m), dtype=np.float64)
+        self._w_sumsq = np.zeros((len(self.windows), m), dtype=np.float64)
+        self._w_cnt = np.zeros((len(self.windows), m), dtype=np.int64)
+        self._since_resync = 0
+
+    # ---- 갱신 ----
+
+    def update(self, row: np.ndarray, evicted: Optional[Sequence[Optional[np.ndarray]]] = None) -> None:
+        """
+        row     : 새 샘플 (메트릭 수,)
+        evicted : self.windows 순서대로, 이번 샘플로 각 윈도우에서 빠져나가는 샘플
+                  (아직 윈도우가 안 찼으면 None)
+        """
+        x = np.asarray(row, dtype=np.float64)
+        valid = ~np.isnan(x)
+        x0 = np.where(valid, x, 0.0)
+
+        # Welford 누적
+        self.count += valid
+        delta = np.where(valid, x - self.mean, 0.0)
+        self.mean += np.where(valid, delta / np.maximum(self.count, 1), 0.0)
+        self._m2 += np.where(valid, delta * (x0 - self.mean), 0.0)
+        self.min = np.fmin(self.min, x)
+        self.max = np.fmax(self.max, x)
+        self._ewma_step(x, valid, x0)
+
+        # 고정 윈도우
+        self._w_sum += x0
+        self._w_sumsq += x0 * x0
+        self._w_cnt += valid
+        if evicted is not None:
+            for i, old in enumerate(evicted):
+                if old is None:
+                    continue
+                o = np.asarray(old, dtype=np.float64)
+                ovalid = ~np.isnan(o)
+                o0 = np.where(ovalid, o, 0.0)
+                self._w_sum[i] -= o0
+                self._w_sumsq[i] -= o0 * o0
+                self._w_cnt[i] -= ovalid
+
+        self._since_resync += 1
+
+    def _ewma_step(self, x: np.ndarray, valid: np.ndarray, x0: np.ndarray) -> None:
+        """EWMA 평균/분산과 last 를 한 샘플만큼 갱신 (첫 값은 그대로 초기화)."""
+        first = valid & np.isnan(self.ewm_mean)
+        self.ewm_mean = np.where(first, x0, self.ewm_mean)
+        diff = np.where(valid, x0 - self.ewm_mean, 0.0)
+        incr = self._alphas * diff
+        self.ewm_mean = self.ewm_mean + incr
+        self.ewm_var = np.where(valid, (1.0 - self._alphas) * (self.ewm_var + diff * incr), self.ewm_var)
+        self.last = np.where(valid, x, self.last)
+
+    def needs_resync(self) -> bool:
+        return self._since_resync >= self.RESYNC_EVERY
+
+    def resync_windows(self, windows: Sequence[np.ndarray]) -> None:
+        """
+        윈도우 합계를 실제 최근 샘플들(self.windows 순서, 각 (w, 메트릭 수))로 다시 계산.
+        장시간 실행 시 뺄셈 누적 오차를 없애거나, 기록 복원 후 한 번 맞춰 줄 때 사용.
+        """
+        for i, vals in enumerate(windows):
+            v = np.asarray(vals, dtype=np.float64)
+            valid = ~np.isnan(v)
+            v0 = np.where(valid, v, 0.0)
+            self._w_sum[i] = v0.sum(axis=0)
+            self._w_sumsq[i] = (v0 * v0).sum(axis=0)
+            self._w_cnt[i] = valid.sum(axis=0)
+        self._since_resync = 0
+
+    def update_bulk(self, values: np.ndarray) -> None:
+        """
+        (N, 메트릭 수) 배열을 한 번에 반영 (기록 복원용).
+        누적 통계는 Chan 병렬 병합으로, EWMA 는 가장 긴 span 의 5배 구간만 순서대로 반영한다
+        (그보다 오래된 샘플의 가중치는 1% 미만). 윈도우는 호출한 쪽에서 resync_windows 로 맞춘다.
+        """
+        v = np.asarray(values, dtype=np.float64)
+        if v.shape[0] == 0:
+            return
+        valid = ~np.isnan(v)
+        n_b = valid.sum(axis=0)
+        v0 = np.where(valid, v, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, v0.sum(axis=0) / np.maximum(n_b, 1), 0.0)
+            m2_b = np.where(valid, (v0 - mean_b) ** 2, 0.0).sum(axis=0)
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.where(n > 0, self.mean + delta * n_b / np.maximum(n, 1), self.mean)
+            self._m2 = self._m2 + m2_b + delta * delta * n_a * n_b / np.maximum(n, 1)
+        self.count = n
+        self.min = np.fmin(self.min, np.fmin.reduce(v, axis=0))
+        self.max = np.fmax(self.max, np.fmax.reduce(v, axis=0))
+
+        tail = max(self.ewma_spans) * 5 if self.ewma_spans else 1
+        for x, ok, x0 in zip(v[-tail:], valid[-tail:], v0[-tail:]):
+            self._ewma_step(x, ok, x0)
+
+    # ---- 조회 ----
+
+    @property
+    def variance(self) -> np.ndarray:
+        """누적 모분산 (statistics.pvariance 와 같은 정의)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self._m2 / np.maximum(self.count, 1), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(np.maximum(self.variance, 0.0))
+
+    def window_mean_std(self, window: int):
+        """고정 윈도우 w 의 (mean, std, count) 배열."""
+        i = self.windows.index(int(window))
+        cnt = self._w_cnt[i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(cnt > 0, self._w_sum[i] / np.maximum(cnt, 1), np.nan)
+            var = np.where(cnt > 0, self._w_sumsq[i] / np.maximum(cnt, 1) - mean * mean, np.nan)
+        return mean, np.sqrt(np.maximum(var, 0.0)), cnt
+
+    def column_summary(self, col: int) -> Dict[str, Any]:
+        """메트릭 하나의 통계를 dict 로 정리."""
+
+        def _f(v) -> Optional[float]:
+            v = float(v)
+            return None if np.isnan(v) else v
+
+        out: Dict[str, Any] = {
+            "count": int(self.count[col]),
+            "mean": _f(self.mean[col]) if self.count[col] > 0 else None,
+            "std": _f(self.std[col]),
+            "min": _f(self.min[col]),
+            "max": _f(self.max[col]),
+            "last": _f(self.last[col]),
+            "ewma": {},
+            "window": {},
+        }
+        ewm_std = np.sqrt(np.maximum(self.ewm_var, 0.0))
+        for i, span in enumerate(self.ewma_spans):
+            out["ewma"][span] = {"mean": _f(self.ewm_mean[i, col]), "std": _f(ewm_std[i, col])}
+        for w in self.windows:
+            mean, std, cnt = self.window_mean_std(w)
+            out["window"][w] = {"mean": _f(mean[col]), "std": _f(std[col]), "count": int(cnt[col])}
+        return out
+
+
+class P2Quantile:
+    """
+    P² 알고리즘 (Jain & Chlamtac, 1985) 으로 분위수 하나를 스트리밍 추정한다.
+
+    - 마커 5개 (최소 / p/2 / p / (1+p)/2 / 최대) 의 높이와 위치만 들고 있어서
+      메모리는 샘플 수와 상관없이 일정하고, update 는 O(1)
+    - 마커 높이는 포물선(P²) 보간으로 조정하고, 순서가 깨지면 선형 보간으로 대신한다
+    - to_dict / from_dict 로 상태를 JSON 에 저장했다가 이어서 쓸 수 있다
+    """
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"분위수는 0 과 1 사이여야 합니다: {p}")
+        self.p = float(p)
+        self.count = 0
+        self._q: list = []                                   # 마커 높이
+        self._n = [0, 1, 2, 3, 4]                            # 마커 실제 위치
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]       # 마커 목표 위치
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x: float) -> None:
+        x = float(x)
+        if x != x:      # NaN 은 무시
+            return
+        self.count += 1
+        q = self._q
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        for i in (1, 2, 3):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                qp = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = qp
+                n[i] += s
+
+    def value(self) -> Optional[float]:
+        """현재 분위수 추정값 (샘플이 없으면 None, 5개 이하면 정확한 표본 분위수)."""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return float(np.quantile(self._q, self.p))
+        return float(self._q[2])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.p, "count": self.count, "q": list(self._q), "n": list(self._n), "np": list(self._np)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "P2Quantile":
+        sketch = cls(float(state["p"]))
+        sketch.count = int(state["count"])
+        sketch._q = [float(v) for v in state["q"]]
+        sketch._n = [int(v) for v in state["n"]]
+        sketch._np = [float(v) for v in state["np"]]
+        if len(sketch._q) != min(sketch.count, 5) or len(sketch._n) != 5 or len(sketch._np) != 5:
+            raise ValueError("P2Quantile 상태 형식이 올바르지 않습니다.")
+        return sketch
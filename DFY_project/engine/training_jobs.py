@@ -0,0 +1,344 @@
+# engine/training_jobs.py
+import multiprocessing as mp
+import queue
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from engine.model_registry import ModelRegistry, get_registry
+from model.bundle import BUNDLE_NAMES
+from model.hwinfo_csv import HWINFO_LOG_PATH
+
+# 학습 소스: HWiNFO 로그가 있으면 쓰고, 앱이 직접 기록한 data/history 는 항상 쓴다
+# ("history" = model.streaming.HISTORY_SOURCE. 이 프로세스에서 torch 를 import 하지 않으려고 문자열로 둔다)
+_TRAIN_SOURCES = [str(HWINFO_LOG_PATH), "history"]
+
+# 모델이 없을 때 앱 시작과 함께 돌리는 기본 학습 설정 (예전 main 프리플라이트와 같은 epoch 수)
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "ae": {"epochs": 5, "streaming": True, "csv_rel_path": _TRAIN_SOURCES},
+    "lstm": {"num_epochs": 5, "streaming": True, "csv_paths": _TRAIN_SOURCES},
+    "multitask": {"epochs": 5},
+}
+
+# job 상태
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "PENDING", "RUNNING", "DONE", "FAILED", "CANCELLED"
+
+# 상태 변화 / 진행 콜백: job.snapshot() dict -> None (모니터 스레드에서 호출됨)
+JobListener = Callable[[Dict[str, Any]], None]
+
+
+def _job_main(kind: str, params: Dict[str, Any], staging_dir: str, events, cancel_event) -> None:
+    """
+    자식 프로세스 진입점. torch / 학습 모듈은 여기서만 import 된다.
+    진행 상황과 결과는 events 큐로 ("progress" | "done" | "failed" | "cancelled", payload) 를 보낸다.
+    """
+
+    def report(info: Dict[str, Any]) -> None:
+        events.put(("progress", info))
+
+    def should_stop() -> bool:
+        return cancel_event.is_set()
+
+    try:
+        if kind == "ae":
+            from model.train_ae import train_ae
+
+            result = train_ae(model_dir=staging_dir, progress=report, should_stop=should_stop, **params)
+        elif kind == "lstm":
+            from model.train_lstm import train
+
+            save_path = str(Path(staging_dir) / BUNDLE_NAMES["lstm"])
+            result = train(save_path=save_path, progress=report, should_stop=should_stop, **params)
+        elif kind == "multitask":
+            from model.train_multitask import train_multitask
+
+            result = train_multitask(model_dir=staging_dir, progress=report, should_stop=should_stop, **params)
+        else:
+            raise ValueError(f"알 수 없는 학습 종류: {kind}")
+    except BaseException as e:
+        traceback.print_exc()
+        events.put(("failed", repr(e)))
+        return
+
+    if cancel_event.is_set():
+        events.put(("cancelled", None))
+    elif result is None:
+        events.put(("failed", "학습 데이터가 부족하거나 로드에 실패했습니다."))
+    else:
+        events.put(("done", result if isinstance(result, dict) else None))
+
+
+class TrainingJob:
+    """
+    백그라운드 학습 한 건의 상태.
+
+    - 학습은 spawn 으로 띄운 별도 프로세스에서 돌아서 GUI / sampler 스레드를 막지 않는다
+      (torch 연산이 GIL 을 잡고 있어도 UI 는 영향이 없음)
+    - epoch 이 끝날 때마다 epoch / loss / ETA 가 갱신된다
+    """
+
+    def __init__(self, kind: str, params: Dict[str, Any], staging_dir: Path) -> None:
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.params = dict(params)
+        self.state = PENDING
+        self.epoch = 0
+        self.epochs: Optional[int] = None
+        self.loss: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.version: Optional[str] = None
+        self.staging_dir = Path(staging_dir)
+
+        ctx = mp.get_context("spawn")
+        self._events = ctx.Queue()
+        self._cancel = ctx.Event()
+        self._proc = ctx.Process(
+            target=_job_main,
+            args=(kind, self.params, str(self.staging_dir), self._events, self._cancel),
+            name=f"dfy-train-{kind}",
+            daemon=True,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.state in (PENDING, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def eta(self) -> Optional[float]:
+        """남은 시간(초) 추정: 지금까지의 epoch 당 평균 시간 x 남은 epoch 수."""
+        if self.state != RUNNING or not self.epochs or self.epoch <= 0:
+            return None
+        return self.elapsed / self.epoch * max(self.epochs - self.epoch, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "epoch": self.epoch,
+            "epochs": self.epochs,
+            "loss": self.loss,
+            "elapsed": self.elapsed,
+            "eta": self.eta,
+            "error": self.error,
+            "version": self.version,
+        }
+
+
+class TrainingRunner:
+    """
+    AE / LSTM 학습 job 관리자.
+
+    - submit() 은 바로 반환하고, 학습은 자식 프로세스에서 진행된다 (종류별로 동시에 하나)
+    - 모니터 스레드가 자식의 진행 메시지를 받아 listener 에게 넘긴다
+    - 자식은 registry 의 staging 폴더에만 쓰고, 성공했을 때만 새 버전으로 publish 한다
+      → 학습 도중 / 실패 / 취소 시에도 기존 모델은 그대로 남는다
+    - publish 된 버전은 model_registry 가 로드해서 anomaly_detector / analyzer 쪽 객체를 교체한다
+    """
+
+    # 취소 요청 후 자식이 스스로 멈추기를 기다리는 시간 (초). 넘으면 terminate.
+    CANCEL_GRACE = 10.0
+    _POLL_INTERVAL = 0.2
+
+    def __init__(self, registry: Optional[ModelRegistry] = None) -> None:
+        self.registry = registry or get_registry()
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._listeners: List[JobListener] = []
+
+    # ---- listener ----
+
+    def add_listener(self, callback: JobListener) -> None:
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: JobListener) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, job: TrainingJob) -> None:
+        snap = job.snapshot()
+        with self._lock:
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(snap)
+            except Exception as e:
+                print("[DFY][Train] listener 처리 중 오류:", e)
+                traceback.print_exc()
+
+    # ---- 조회 ----
+
+    def current(self, kind: str) -> Optional[TrainingJob]:
+        """kind 의 가장 최근 job (진행 중이든 끝났든)."""
+        with self._lock:
+            return self._jobs.get(kind)
+
+    def is_running(self, kind: Optional[str] = None) -> bool:
+        with self._lock:
+            jobs = [self._jobs.get(kind)] if kind else list(self._jobs.values())
+        return any(j is not None and j.running for j in jobs)
+
+    def missing_models(self) -> List[str]:
+        """registry 에 사용할 버전이 하나도 없는 학습 종류."""
+        return [k for k in BUNDLE_NAMES if self.registry.current_version(k) is None]
+
+    # ---- 시작 / 취소 ----
+
+    def submit(self, kind: str, **params: Any) -> TrainingJob:
+        """
+        kind("ae" | "lstm" | "multitask") 학습을 백그라운드로 시작한다.
+        같은 종류가 이미 돌고 있으면 새로 띄우지 않고 그 job 을 반환한다.
+        params 는 train_ae() / train_lstm.train() / train_multitask() 인자 그대로 (저장 경로는 runner 가 정함).
+        """
+        if kind not in BUNDLE_NAMES:
+            raise ValueError(f"알 수 없는 학습 종류: {kind}")
+
+        with self._lock:
+            job = self._jobs.get(kind)
+            if job is not None and job.running:
+                return job
+            job = TrainingJob(kind, {**DEFAULT_PARAMS.get(kind, {}), **params}, self.registry.new_staging(kind))
+            self._jobs[kind] = job
+
+        job.started_at = time.monotonic()
+        job._proc.start()
+        job.state = RUNNING
+        print(f"[DFY][Train] {kind} 학습을 백그라운드에서 시작합니다 (job={job.id}, pid={job._proc.pid}).")
+
+        threading.Thread(target=self._monitor, args=(job,), name=f"dfy-train-monitor-{kind}", daemon=True).start()
+        self._notify(job)
+        return job
+
+    def ensure_models(self, kinds: Sequence[str] = ("ae",)) -> List[TrainingJob]:
+        """모델 파일이 없는 종류만 학습을 시작한다 (앱 시작 시 호출, 바로 반환)."""
+        missing = self.missing_models()
+        return [self.submit(k) for k in kinds if k in missing]
+
+    def cancel(self, kind: Optional[str] = None) -> None:
+        """
+        진행 중인 학습 취소 (kind 가 None 이면 전부).
+        자식은 다음 batch 전에 멈추고, CANCEL_GRACE 안에 안 끝나면 강제 종료한다.
+        """
+        with self._lock:
+            jobs = [self._jobs.get(kind)] if kind else list(self._jobs.values())
+        for job in jobs:
+            if job is None or not job.running:
+                continue
+            print(f"[DFY][Train] {job.kind} 학습 취소 요청 (job={job.id})")
+            job._cancel.set()
+            timer = threading.Timer(self.CANCEL_GRACE, self._terminate, args=(job,))
+            timer.daemon = True
+            timer.start()
+
+    @staticmethod
+    def _terminate(job: TrainingJob) -> None:
+        if job._proc.is_alive():
+            print(f"[DFY][Train] {job.kind} 학습 프로세스가 응답하지 않아 종료합니다 (job={job.id})")
+            job._proc.terminate()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """앱 종료 시: 진행 중인 학습을 모두 취소하고 자식 프로세스를 정리한다."""
+        self.cancel()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        deadline = time.monotonic() + timeout
+        for job in jobs:
+            if job._proc.pid is None:
+                continue
+            job._proc.join(max(0.0, deadline - time.monotonic()))
+            if job._proc.is_alive():
+                job._proc.terminate()
+                job._proc.join(1.0)
+
+    # ---- 내부: 진행 메시지 수신 / 결과 반영 ----
+
+    def _monitor(self, job: TrainingJob) -> None:
+        """모니터 스레드: 자식이 보내는 메시지를 받아 job 상태를 갱신한다."""
+        final: Optional[str] = None
+        detail: Optional[str] = None
+        while final is None:
+            try:
+                msg, payload = job._events.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                if not job._proc.is_alive():
+                    # 메시지 없이 끝남 (terminate / 비정상 종료)
+                    final = CANCELLED if job._cancel.is_set() else FAILED
+                    detail = None if final == CANCELLED else f"학습 프로세스가 비정상 종료되었습니다 (exit={job._proc.exitcode})"
+                continue
+
+            if msg == "progress":
+                job.epoch = int(payload.get("epoch", job.epoch))
+                job.epochs = payload.get("epochs", job.epochs)
+                job.loss = payload.get("loss", job.loss)
+                self._notify(job)
+            elif msg == "done":
+                final = DONE
+                job.result = payload
+            elif msg == "cancelled":
+                final = CANCELLED
+            else:
+                final, detail = FAILED, str(payload)
+
+        job._proc.join(timeout=self.CANCEL_GRACE)
+        if final == DONE:
+            try:
+                self._install(job)
+            except Exception as e:
+                final, detail = FAILED, f"모델 교체 실패: {e}"
+                traceback.print_exc()
+
+        shutil.rmtree(job.staging_dir, ignore_errors=True)
+        job.error = detail
+        job.finished_at = time.monotonic()
+        job.state = final
+        if final == DONE:
+            print(f"[DFY][Train] {job.kind} 학습 완료 ({job.elapsed:.1f}s, job={job.id}, version={job.version})")
+        elif final == FAILED:
+            print(f"[DFY][Train][WARN] {job.kind} 학습 실패: {detail}")
+        else:
+            print(f"[DFY][Train] {job.kind} 학습이 취소되었습니다 (job={job.id})")
+        self._notify(job)
+
+    def _install(self, job: TrainingJob) -> None:
+        """staging 을 새 버전으로 publish (CURRENT 교체 → registry 가 로드해서 바꿔 끼움)."""
+        metadata = {
+            "job_id": job.id,
+            "params": job.params,
+            "epochs": job.epochs,
+            "final_loss": job.loss,
+            "train_seconds": round(job.elapsed, 2),
+        }
+        if job.kind in ("ae", "multitask") and job.result:
+            metadata["num_samples"] = job.result.get("num_samples")
+        job.version = self.registry.publish(job.kind, job.staging_dir, metadata)
+
+
+# ----------------------------------------------------------------------
+# 전역 runner 관리
+# ----------------------------------------------------------------------
+
+_runner: Optional[TrainingRunner] = None
+
+
+def get_runner() -> TrainingRunner:
+    """앱 전체에서 공유하는 TrainingRunner."""
+    global _runner
+    if _runner is None:
+        _runner = TrainingRunner()
+    return _runner
@@ -74,6 +74,315 @@ def main():
         print("risk:", risk)
     step("predictor + analyzer.assess_load_risk (간접)", _step_predict_and_risk)
 
+    # 8. NumPy 추론 vs torch forward 결과 비교 (같은 번들 가중치)
+    def _step_numpy_parity():
+        import numpy as np
+        import torch
+        from model import bundle as model_bundle
+        from model.ae_model import LoadAutoencoder
+        from model.lstm_model import LoadLSTM
+        from model.numpy_infer import NumpyAutoencoder, NumpyLSTM
+
+        rng = np.random.default_rng(0)
+
+        ae_b = model_bundle.open_in_dir("ae", "internal")
+        ae_t = LoadAutoencoder(**ae_b.arch)
+        ae_t.load_state_dict(ae_b.state_dict())
+        ae_t.eval()
+        x = rng.standard_normal((64, ae_b.arch["input_dim"])).astype(np.float32)
+        with torch.no_grad():
+            ref = ae_t(torch.from_numpy(x)).numpy()
+        ae_diff = float(np.abs(NumpyAutoencoder(ae_b)(x) - ref).max())
+
+        lstm_b = model_bundle.open_in_dir("lstm", "internal")
+        lstm_t = LoadLSTM(**lstm_b.arch)
+        lstm_t.load_state_dict(lstm_b.state_dict())
+        lstm_t.eval()
+        seq = (rng.random((8, 30, lstm_b.arch["input_dim"])) * 100).astype(np.float32)
+        with torch.no_grad():
+            ref = lstm_t(torch.from_numpy(seq)).numpy()
+        lstm_diff = float(np.abs(NumpyLSTM(lstm_b)(seq) - ref).max())
+
+        print(f"AE max |diff|: {ae_diff:.3e}, LSTM max |diff|: {lstm_diff:.3e}")
+        assert ae_diff < 1e-4 and lstm_diff < 1e-3, "NumPy 추론 결과가 torch 와 다릅니다"
+    step("numpy inference parity (AE / LSTM)", _step_numpy_parity)
+
+    # 9. 스트리밍 LSTM: 한 step 씩 진행한 상태 == 윈도우 전체 계산
+    def _step_stream():
+        import numpy as np
+        window = (np.random.default_rng(1).random((45, predictor.model.input_dim)) * 100).astype(np.float32)
+        predictor.stream_reset()
+        predictor.stream_update(29, window[:30])        # 첫 윈도우로 상태 생성
+        for i in range(30, 45):
+            streamed = predictor.stream_update(i, window[i : i + 1])
+        h, _ = predictor.model.run(predictor._normalize(window)[None])
+        full = predictor._denormalize(predictor.model.head(h))[0]
+        diff = float(np.abs(streamed - full).max())
+        print(f"stream vs full(45 steps) max |diff|: {diff:.3e}, stats: {predictor.stream_stats}")
+        assert diff < 1e-3
+    step("streaming LSTM state", _step_stream)
+
+    # 10. 윈도우 AE: NumPy == torch, tick 단위 증분 점수 == 윈도우 전체 재계산
+    def _step_sequence_ae():
+        import tempfile
+        from pathlib import Path
+        import numpy as np
+        import torch
+        from model import bundle as model_bundle
+        from model.ae_model import LoadSequenceAutoencoder
+        from model.features import FEATURE_KEYS
+        from engine.anomaly_detector import AEDetector
+
+        torch.manual_seed(0)
+        seq_t = LoadSequenceAutoencoder(len(FEATURE_KEYS)).eval()
+        th = {"error_mean": 1.0, "error_std": 0.5, "warn_threshold": 2.0, "critical_threshold": 3.0}
+        with tempfile.TemporaryDirectory() as d:
+            path = model_bundle.write_bundle(
+                Path(d) / "seq_ae.dfym", "ae", model_bundle.state_dict_arrays(seq_t.state_dict()),
+                arch=seq_t.arch(), feature_mean=[0.0] * len(FEATURE_KEYS), feature_std=[1.0] * len(FEATURE_KEYS),
+                thresholds=th,
+            )
+            det = AEDetector(model_bundle.read_bundle(path, kind="ae"), thresholds_path=None)
+            rows = np.random.default_rng(2).standard_normal((80, len(FEATURE_KEYS))).astype(np.float32)
+            with torch.no_grad():
+                ref = seq_t(torch.from_numpy(rows)[None])[0].numpy()
+            par = float(np.abs(det.model(rows) - ref).max())
+
+            det.stream_update(41, rows[:42])
+            for i in range(42, 80):
+                streamed = det.stream_update(i, rows[i : i + 1])
+            full = det.model.position_errors(rows[-det.model.span :])[det.model.receptive_field - 1 :].mean(axis=0)
+            diff = float(np.abs(streamed - full).max())
+            print(f"seq AE numpy vs torch: {par:.3e}, stream vs full: {diff:.3e}, stats: {det.stream_stats}")
+            assert par < 1e-4 and diff < 1e-4
+
+            # 빈 / 잘린 번들 파일은 numpy 의 ValueError 가 아니라 BundleError
+            for name, data in (("empty.dfym", b""), ("short.dfym", b"DFYM")):
+                (Path(d) / name).write_bytes(data)
+                try:
+                    model_bundle.read_bundle(Path(d) / name)
+                except model_bundle.BundleError:
+                    pass
+                else:
+                    raise AssertionError(f"{name} 가 BundleError 없이 열렸습니다")
+    step("windowed sequence AE (streaming score)", _step_sequence_ae)
+
+    # 11. multitask: 재구성 + 예측이 torch forward 한 번과 같고, 증분 코드 버퍼로도 같은 예측
+    def _step_multitask():
+        import tempfile
+        from pathlib import Path
+        import numpy as np
+        import torch
+        from model import bundle as model_bundle
+        from model.features import FEATURE_KEYS
+        from model.multitask_model import LoadMultitaskModel
+        from engine.multitask import MultitaskDetector
+
+        torch.manual_seed(0)
+        mt_t = LoadMultitaskModel(len(FEATURE_KEYS), horizons=(1, 10), targets=("cpu", "ram")).eval()
+        th = {"error_mean": 1.0, "error_std": 0.5, "warn_threshold": 2.0, "critical_threshold": 3.0}
+        with tempfile.TemporaryDirectory() as d:
+            path = model_bundle.write_bundle(
+                Path(d) / "mt.dfym", "multitask", model_bundle.state_dict_arrays(mt_t.state_dict()),
+                arch=mt_t.arch(), feature_mean=[0.0] * len(FEATURE_KEYS), feature_std=[1.0] * len(FEATURE_KEYS),
+                thresholds=th,
+            )
+            det = MultitaskDetector(model_bundle.read_bundle(path, kind="multitask"), thresholds_path=None)
+            rows = np.random.default_rng(3).standard_normal((90, len(FEATURE_KEYS))).astype(np.float32)
+            win = rows[-det.model.span :]
+            with torch.no_grad():
+                ref_recon, ref_fc = (t[0].numpy() for t in mt_t(torch.from_numpy(win)[None]))
+            recon, fc = det.model.forecast(win)
+            par = max(float(np.abs(recon - ref_recon).max()), float(np.abs(fc - ref_fc).max()))
+
+            det.stream_update(41, rows[:42])
+            for i in range(42, 90):
+                det.stream_update(i, rows[i : i + 1])
+            diff = float(np.abs(det.forecast().reshape(-1) - ref_fc).max())
+            print(f"multitask numpy vs torch: {par:.3e}, streamed forecast vs full: {diff:.3e}")
+            assert par < 1e-4 and diff < 1e-4
+    step("multitask shared encoder (score + forecast)", _step_multitask)
+
+    # 12. 배치 backfill 점수 == 실시간 AEDetector 점수, 구간 추출
+    def _step_score_log():
+        import numpy as np
+        from model import bundle as model_bundle
+        from model.score_log import ae_scores, intervals
+        from engine.anomaly_detector import AEDetector
+
+        det = AEDetector(model_bundle.open_in_dir("ae", "internal"), thresholds_path=None)
+        X = (np.random.default_rng(4).random((500, len(det.feature_keys))) * 100).astype(np.float32)
+        arr = ae_scores(det.model, X, det.feature_mean, det.feature_std, batch_rows=128)
+        ref = np.array([det._compute_error(x) for x in X])
+        diff = float(np.abs(arr["score"] - ref).max() / max(ref.max(), 1e-9))
+        events = intervals(np.array([0, 5, 5, 0, 0, 9, 0, 0, 0, 0, 0, 0, 0, 6], dtype=np.float32), 4.0, 8.0, merge_gap=2)
+        print(f"batch vs live rel diff: {diff:.3e}, events: {[(e['start'], e['end'], e['level']) for e in events]}")
+        assert diff < 1e-5
+        assert [(e["start"], e["end"], e["level"]) for e in events] == [(1, 5, "CRITICAL"), (13, 13, "WARN")]
+
+        # 윈도우 AE: batch 가 span 보다 작아도 (chunk 겹침 / cumsum 윈도우 합) 실시간 stream_update 와 같은 점수
+        import tempfile
+        from pathlib import Path
+        import torch
+        from model.ae_model import LoadSequenceAutoencoder
+        from model.features import FEATURE_KEYS
+
+        torch.manual_seed(0)
+        seq_t = LoadSequenceAutoencoder(len(FEATURE_KEYS)).eval()
+        th = {"error_mean": 1.0, "error_std": 0.5, "warn_threshold": 2.0, "critical_threshold": 3.0}
+        with tempfile.TemporaryDirectory() as d:
+            path = model_bundle.write_bundle(
+                Path(d) / "seq_ae.dfym", "ae", model_bundle.state_dict_arrays(seq_t.state_dict()),
+                arch=seq_t.arch(), feature_mean=[0.0] * len(FEATURE_KEYS), feature_std=[1.0] * len(FEATURE_KEYS),
+                thresholds=th,
+            )
+            seq_det = AEDetector(model_bundle.read_bundle(path, kind="ae"), thresholds_path=None)
+        span = seq_det.model.span
+        rows = np.random.default_rng(5).standard_normal((span + 60, len(FEATURE_KEYS))).astype(np.float32)
+        seq_arr = ae_scores(seq_det.model, rows, seq_det.feature_mean, seq_det.feature_std, batch_rows=16)
+        live = [float(seq_det.stream_update(span - 1, rows[:span]).mean())]
+        live += [float(seq_det.stream_update(i, rows[i : i + 1]).mean()) for i in range(span, rows.shape[0])]
+        seq_diff = float(np.abs(seq_arr["score"][span - 1 :] - np.array(live)).max() / max(max(live), 1e-9))
+        print(f"sequence batch vs stream rel diff: {seq_diff:.3e} (span={span}, batch_rows=16)")
+        assert np.isnan(seq_arr["score"][: span - 1]).all() and seq_diff < 1e-4
+    step("batch backfill scoring (score_log)", _step_score_log)
+
+    # 13. 영구 기록 세그먼트: 날짜 경계 rotation / 구간 읽기 / 잘린 꼬리 복구 후 이어쓰기
+    def _step_history_store():
+        import tempfile
+        from datetime import datetime
+        from pathlib import Path
+        import numpy as np
+        from engine import history_store
+
+        t0 = datetime(2026, 1, 1).timestamp() - 5      # 자정 5초 전부터 10초 기록
+        m = len(history_store.METRIC_KEYS)
+        rows = np.arange(11 * m, dtype=np.float32).reshape(11, m)
+        with tempfile.TemporaryDirectory() as d:
+            d = Path(d)
+            w = history_store.HistoryWriter(d)
+            for i in range(10):
+                w.append(t0 + i, rows[i])
+            w.close()
+            segs = history_store.list_segments(d)
+            ts, vals = history_store.read_range(t0 + 2, t0 + 7, directory=d)
+            assert [s.path.name for s in segs] == ["20251231.dfyh", "20260101.dfyh"]
+            assert np.array_equal(ts, t0 + np.arange(2, 8)) and np.array_equal(vals, rows[2:8])
+
+            # 미완성 레코드(timestamp 0) + 절반만 써진 레코드를 붙여 둔다
+            rec_size = history_store.record_dtype(m).itemsize
+            with segs[1].path.open("ab") as f:
+                f.write(b"\0" * rec_size + b"\x01" * (rec_size // 2))
+            cut = history_store.recover_tail(segs[1].path)
+            with segs[1].path.open("ab") as f:
+                f.write(b"\x01" * (rec_size // 2))
+
+            # 다시 열어 이어쓰면 tail recovery 후 붙는다
+            w = history_store.HistoryWriter(d)
+            w.append(t0 + 10, rows[10])
+            w.close()
+            ts, vals = history_store.read_range(directory=d)
+            print(f"segments: {[s.path.name for s in segs]}, recovered {cut} bytes, total rows: {len(ts)}")
+            assert cut == rec_size + rec_size // 2
+            assert np.array_equal(ts, t0 + np.arange(11)) and np.array_equal(vals, rows)
+
+            # 학습 소스: 세그먼트 / 기록이 끊긴 곳마다 구간을 나눈다
+            w = history_store.HistoryWriter(d)
+            w.append(t0 + 30, rows[0])
+            w.close()
+            runs = history_store.load_feature_runs(directory=d)
+            print(f"training runs: {[r.shape[0] for r in runs]}")
+            assert [r.shape[0] for r in runs] == [5, 6, 1]
+    step("history store segments (rotation / recovery / reopen)", _step_history_store)
+
+    # 14. 모델 registry: publish → activate → rollback, 다른 프로세스가 바꾼 CURRENT 의 hot swap
+    def _step_registry():
+        import tempfile
+        import time
+        from pathlib import Path
+        import numpy as np
+        from model import bundle as model_bundle
+        from engine.model_registry import ModelRegistry
+
+        with tempfile.TemporaryDirectory() as d:
+            reg = ModelRegistry(root=Path(d) / "models", legacy_dir=Path(d) / "legacy")
+            # 로더는 manifest 의 tag 를 "모델" 로 돌려준다 (어느 버전이 올라왔는지만 본다)
+            reg.register_loader("lstm", lambda b, manifest: manifest["metadata"]["tag"])
+            versions = []
+            for tag in ("v1", "v2"):
+                staging = reg.new_staging("lstm")
+                model_bundle.write_bundle(
+                    staging / model_bundle.BUNDLE_NAMES["lstm"], "lstm", {"w": np.zeros(4, dtype=np.float32)}, arch={}
+                )
+                versions.append(reg.publish("lstm", staging, metadata={"tag": tag}, activate=False))
+            assert reg.versions("lstm") == versions
+
+            reg.activate("lstm", versions[1], wait=True)
+            assert reg.get("lstm") == "v2" and reg.loaded_version("lstm") == versions[1]
+
+            assert reg.rollback("lstm", wait=True) == versions[0]
+            assert reg.current_version("lstm") == versions[0] and reg.loaded_version("lstm") == versions[0]
+            assert reg.get("lstm") == "v1"
+
+            # 학습 프로세스처럼 다른 registry 가 CURRENT 를 바꾸면 get() 이 백그라운드로 바꿔 끼운다
+            ModelRegistry(root=Path(d) / "models", legacy_dir=Path(d) / "legacy").activate("lstm", versions[1])
+            reg.WATCH_INTERVAL = 0.0
+            deadline = time.monotonic() + 5.0
+            while reg.get("lstm") != "v2" and time.monotonic() < deadline:
+                time.sleep(0.05)
+            print(f"versions: {versions}, loaded after swap: {reg.loaded_version('lstm')}")
+            assert reg.get("lstm") == "v2" and reg.loaded_version("lstm") == versions[1]
+    step("model registry publish / rollback / hot swap", _step_registry)
+
+    # 15. HWiNFO CSV: header 에 없는 피처는 0, 있는 컬럼의 빈 cpu 칸만 행을 버린다 (기존 train_ae 규칙)
+    def _step_hwinfo_missing_column():
+        import tempfile
+        from pathlib import Path
+        import numpy as np
+        from model import hwinfo_csv
+        from model.features import FEATURE_KEYS
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "log.CSV"
+            path.write_text(
+                "Date,Time,Total CPU Usage [%],GPU Temperature [°C],\n"
+                "1.1.2026,0:00:01.0,12.5,40,\n"
+                "1.1.2026,0:00:02.0,,41,\n"
+                "1.1.2026,0:00:03.0,30,42,\n",
+                encoding="utf-8",
+            )
+            X = hwinfo_csv.load_feature_matrix(path, verbose=False)
+        cpu, ram, gpu_temp = (FEATURE_KEYS.index(k) for k in ("cpu", "ram", "gpu_temp"))
+        print(f"rows without RAM column: {X.shape}")
+        assert X.shape == (2, len(FEATURE_KEYS))
+        assert X[:, cpu].tolist() == [12.5, 30.0] and X[:, gpu_temp].tolist() == [40.0, 42.0]
+        assert not X[:, ram].any()
+    step("HWiNFO CSV with a missing column", _step_hwinfo_missing_column)
+
+    # 16. 적응 임계값: 고정 임계값이 하한, 오래 이어지는 이상 점수는 임계값을 끌어올리지 못한다
+    def _step_adaptive_thresholds():
+        import numpy as np
+        from engine.score_thresholds import AdaptiveThresholds
+
+        def feed(a, scores):
+            for s in scores:
+                if s < a.current()["warn_threshold"]:     # AEDetector 와 같은 규칙 (정상 점수만)
+                    a.update(s)
+
+        rng = np.random.default_rng(5)
+        quiet = AdaptiveThresholds("t", 2.0, 3.0, path=None, min_samples=100)
+        feed(quiet, rng.exponential(0.2, 3000))
+        noisy = AdaptiveThresholds("t", 2.0, 3.0, path=None, min_samples=100)
+        feed(noisy, rng.exponential(1.0, 3000))
+        before = noisy.current()
+        feed(noisy, [9.0] * 3000)
+        after = noisy.current()
+        print(f"quiet: {quiet.current()['warn_threshold']:.3f}, noisy: {before['warn_threshold']:.3f} -> {after['warn_threshold']:.3f}")
+        assert (quiet.current()["warn_threshold"], quiet.current()["critical_threshold"]) == (2.0, 3.0)
+        assert before["source"] == "adaptive" and before["warn_threshold"] > 2.0
+        assert after["warn_threshold"] == before["warn_threshold"]
+    step("adaptive thresholds (floor / no self-raising)", _step_adaptive_thresholds)
+
     print("\n=== ALL STEPS COMPLETED ===")
 
 
@@ -1,5 +1,5 @@
 # model/ae_model.py
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import torch
 from torch import nn
@@ -16,7 +16,7 @@ class LoadAutoencoder(nn.Module):
     - decoder: Linear(code -> hidden) -> ReLU -> Linear(hidden -> input)
 
     기존 코드와의 호환을 위해 seq_len 인자를 받아두지만,
-    현재 구조에서는 사용하지 않는다.
+    현재 구조에서는 사용하지 않는다 (윈도우 단위 모델은 LoadSequenceAutoencoder).
     """
 
     def __init__(
@@ -53,4 +53,128 @@ class LoadAutoencoder(nn.Module):
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         z = self.encoder(x)
         out = self.decoder(z)
-        return out
\ No newline at end of file
+        return out
+
+    def reconstruction_error(self, x: torch.Tensor, reduction: str = "mean") -> torch.Tensor:
+        """
+        재구성 MSE. x 는 (B, F) 또는 (B, T, F) (시점마다 따로 재구성).
+        reduction="none" 이면 샘플별 (B,), "mean" 이면 스칼라.
+        """
+        diff = self(x) - x
+        err = (diff * diff).reshape(x.shape[0], -1).mean(dim=1)
+        return err if reduction == "none" else err.mean()
+
+    def arch(self) -> Dict[str, Any]:
+        """번들 header 에 저장할 구조 파라미터."""
+        return {"input_dim": self.input_dim, "hidden_dim": self.hidden_dim, "code_dim": self.code_dim}
+
+
+class CausalConv1d(nn.Conv1d):
+    """
+    왼쪽(과거)으로만 kernel_size-1 만큼 0 을 채우는 Conv1d.
+    출력 시점 t 는 입력 t-kernel_size+1 .. t 만 본다 (길이 유지).
+    """
+
+    def __init__(self, in_channels: int, out_channels: int, kernel_size: int) -> None:
+        super().__init__(in_channels, out_channels, kernel_size)
+        self.left_pad = kernel_size - 1
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return super().forward(nn.functional.pad(x, (self.left_pad, 0)))
+
+
+class LoadSequenceAutoencoder(nn.Module):
+    """
+    윈도우(시계열) 단위 Autoencoder.
+
+    - 입력: (B, L, F) 연속된 피처 행렬
+    - encoder: CausalConv(input -> hidden, k) -> ReLU -> CausalConv(hidden -> code, k) -> ReLU
+    - decoder: CausalConv(code -> hidden, k) -> ReLU -> Conv(hidden -> input, 1)
+    - 시점 t 의 재구성은 과거 receptive_field 개 시점(t 포함)의 압축 코드로만 만든다.
+      한 시점 값은 정상 범위라도 진동 / 느린 온도 상승처럼 시간 패턴이 평소와 다르면
+      코드로 설명이 안 되어 오차가 커진다.
+
+    윈도우 점수 = 마지막 seq_len 개 시점의 재구성 오차 평균.
+    각 시점은 앞쪽 receptive_field-1 행이 있어야 0 패딩 없이 계산되므로,
+    점수 하나에는 seq_len + receptive_field - 1 행(span)이 필요하다.
+    receptive field 가 유한해서 실시간에는 tick 마다 새 시점 하나만 계산하면 된다
+    (model.numpy_infer.NumpySequenceAutoencoder.step).
+    """
+
+    def __init__(
+        self,
+        input_dim: Optional[int] = None,
+        hidden_dim: int = 32,
+        code_dim: int = 8,
+        kernel_size: int = 5,
+        seq_len: int = 30,
+        **kwargs,
+    ) -> None:
+        super().__init__()
+
+        if input_dim is None:
+            input_dim = len(FEATURE_KEYS)
+
+        self.input_dim = input_dim
+        self.hidden_dim = hidden_dim
+        self.code_dim = code_dim
+        self.kernel_size = kernel_size
+        self.seq_len = seq_len
+        # 인과 conv 3개(k) + 1x1 conv 1개
+        self.receptive_field = 3 * (kernel_size - 1) + 1
+        self.span = seq_len + self.receptive_field - 1
+
+        self.encoder = nn.Sequential(
+            CausalConv1d(input_dim, hidden_dim, kernel_size),
+            nn.ReLU(),
+            CausalConv1d(hidden_dim, code_dim, kernel_size),
+            nn.ReLU(),
+        )
+
+        self.decoder = nn.Sequential(
+            CausalConv1d(code_dim, hidden_dim, kernel_size),
+            nn.ReLU(),
+            nn.Conv1d(hidden_dim, input_dim, 1),
+        )
+
+    def encode(self, x: torch.Tensor) -> torch.Tensor:
+        """(B, L, F) → 시점별 코드 (B, code_dim, L) (conv 는 (B, C, L) 배치)."""
+        return self.encoder(x.transpose(1, 2))
+
+    def decode(self, z: torch.Tensor) -> torch.Tensor:
+        """시점별 코드 (B, code_dim, L) → 재구성 (B, L, F)."""
+        return self.decoder(z).transpose(1, 2)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.decode(self.encode(x))
+
+    def reconstruction_error(
+        self, x: torch.Tensor, reduction: str = "mean", recon: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        윈도우 점수: 앞쪽 receptive_field-1 개(0 패딩 구간)를 뺀 시점들의 재구성 MSE.
+        reduction="none" 이면 윈도우별 (B,), "mean" 이면 스칼라.
+        recon 을 주면 forward 를 다시 돌리지 않는다.
+        """
+        warm = min(self.receptive_field - 1, x.shape[1] - 1)
+        recon = self(x) if recon is None else recon
+        diff = (recon - x)[:, warm:]
+        err = (diff * diff).mean(dim=(1, 2))
+        return err if reduction == "none" else err.mean()
+
+    def arch(self) -> Dict[str, Any]:
+        return {
+            "type": "sequence",
+            "input_dim": self.input_dim,
+            "hidden_dim": self.hidden_dim,
+            "code_dim": self.code_dim,
+            "kernel_size": self.kernel_size,
+            "seq_len": self.seq_len,
+        }
+
+
+def build_autoencoder(arch: Dict[str, Any]) -> nn.Module:
+    """번들 arch 로 torch 모델 생성 ("type" 이 없으면 예전 점 단위 AE)."""
+    if arch.get("type") == "sequence":
+        return LoadSequenceAutoencoder(**arch)
+    return LoadAutoencoder(**arch)
\ No newline at end of file
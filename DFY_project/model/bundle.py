@@ -0,0 +1,357 @@
+# model/bundle.py
+import json
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from model.features import FEATURE_KEYS
+
+# 파일 구조 (리틀 엔디언):
+#   [0:8]    MAGIC
+#   [8:12]   uint32 FORMAT_VERSION
+#   [12:16]  uint32 header 길이 (바이트)
+#   [16:..]  header (UTF-8 JSON)
+#   ALIGN 경계부터 텐서 데이터. 각 텐서도 ALIGN 바이트 경계에서 시작하는 C-order 배열이고,
+#   header["tensors"][name] = {"dtype", "shape", "offset"(데이터 영역 기준), "nbytes"}
+# 가중치는 np.memmap 위의 view 로 바로 열리므로 pickle(torch.load) 없이, 복사 없이 읽힌다.
+MAGIC = b"DFYMODEL"
+FORMAT_VERSION = 1
+ALIGN = 64
+BUNDLE_SUFFIX = ".dfym"
+
+# 종류별 번들 파일 이름 (모델 폴더 / 레지스트리 버전 폴더 안)
+BUNDLE_NAMES: Dict[str, str] = {
+    "ae": "model_autoencoder" + BUNDLE_SUFFIX,
+    "lstm": "model_load_lstm" + BUNDLE_SUFFIX,
+    "multitask": "model_multitask" + BUNDLE_SUFFIX,
+}
+# 번들 이전 형식 (torch state_dict + 별도 임계값 JSON). 번들로만 저장되는 종류는 없음
+LEGACY_FILES: Dict[str, Sequence[str]] = {
+    "ae": ("model_autoencoder.pth", "ae_thresholds.json"),
+    "lstm": ("model_load_lstm.pth",),
+}
+
+_PREAMBLE = struct.Struct("<8sII")
+# 텐서로 허용하는 dtype (임의 객체 / pickle 이 끼어들 여지가 없도록 숫자형만)
+_ALLOWED_DTYPES = ("<f4", "<f8", "<i4", "<i8")
+
+
+class BundleError(ValueError):
+    """번들 파일이 깨졌거나, 기대한 종류 / 피처 스키마와 맞지 않을 때."""
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _as_stored(arr: Any) -> np.ndarray:
+    """저장용으로 리틀 엔디언 float32/64, int32/64 C-order 배열로 맞춘다."""
+    a = np.asarray(arr)
+    if a.dtype.kind == "f":
+        a = a.astype("<f8" if a.dtype.itemsize == 8 else "<f4", copy=False)
+    elif a.dtype.kind in "iu":
+        a = a.astype("<i8" if a.dtype.itemsize == 8 else "<i4", copy=False)
+    return np.ascontiguousarray(a)
+
+
+class ModelBundle:
+    """
+    모델 번들 하나 (가중치 + 임계값 + 피처 스키마 + 구조 파라미터).
+
+    - tensors : 이름 → 읽기 전용 np.ndarray (파일 mmap 위의 view)
+    - arch    : 모델 생성자 인자 (ae_model.build_autoencoder(arch) / LoadLSTM(**arch))
+    """
+
+    def __init__(self, header: Dict[str, Any], tensors: Dict[str, np.ndarray], path: Optional[Path] = None) -> None:
+        self.header = header
+        self.tensors = tensors
+        self.path = path
+
+    @property
+    def kind(self) -> str:
+        return self.header.get("kind", "")
+
+    @property
+    def arch(self) -> Dict[str, Any]:
+        return dict(self.header.get("arch") or {})
+
+    @property
+    def feature_keys(self) -> list:
+        return list(self.header.get("feature_keys") or [])
+
+    @property
+    def feature_mean(self) -> Optional[np.ndarray]:
+        v = self.header.get("feature_mean")
+        return None if v is None else np.asarray(v, dtype=np.float32)
+
+    @property
+    def feature_std(self) -> Optional[np.ndarray]:
+        v = self.header.get("feature_std")
+        return None if v is None else np.asarray(v, dtype=np.float32)
+
+    @property
+    def thresholds(self) -> Dict[str, Any]:
+        return dict(self.header.get("thresholds") or {})
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return dict(self.header.get("metadata") or {})
+
+    def state_dict(self, device: str = "cpu") -> Dict[str, Any]:
+        """torch 모델의 load_state_dict 에 넣을 dict (학습 / torch 추론용, torch 는 여기서만 import)."""
+        import torch
+
+        return {name: torch.tensor(arr, device=device) for name, arr in self.tensors.items()}
+
+
+# ----------------------------------------------------------------------
+# 쓰기
+# ----------------------------------------------------------------------
+
+def state_dict_arrays(state_dict: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """torch state_dict → float32 NumPy 배열 dict."""
+    out = {}
+    for name, t in state_dict.items():
+        if hasattr(t, "detach"):
+            t = t.detach().cpu().numpy()
+        out[name] = np.asarray(t)
+    return out
+
+
+def write_bundle(
+    path: Path | str,
+    kind: str,
+    tensors: Mapping[str, np.ndarray],
+    arch: Dict[str, Any],
+    feature_keys: Sequence[str] = FEATURE_KEYS,
+    feature_mean: Optional[Sequence[float]] = None,
+    feature_std: Optional[Sequence[float]] = None,
+    thresholds: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """번들을 임시 파일에 쓴 뒤 os.replace 로 교체한다 (읽는 쪽이 반쯤 쓴 파일을 보지 않음)."""
+    path = Path(path)
+    arrays: Dict[str, np.ndarray] = {}
+    index: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, arr in tensors.items():
+        a = _as_stored(arr)
+        if a.dtype.str not in _ALLOWED_DTYPES:
+            raise BundleError(f"지원하지 않는 텐서 dtype: {name} ({a.dtype})")
+        arrays[name] = a
+        index[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset, "nbytes": a.nbytes}
+        offset = _align(offset + a.nbytes)
+
+    header = {
+        "kind": kind,
+        "arch": arch,
+        "feature_keys": list(feature_keys),
+        "feature_mean": None if feature_mean is None else [float(v) for v in feature_mean],
+        "feature_std": None if feature_std is None else [float(v) for v in feature_std],
+        "thresholds": thresholds or {},
+        "metadata": metadata or {},
+        "tensors": index,
+    }
+    raw = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(raw))
+
+    tmp = path.with_name(path.name + ".tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tmp.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(raw)))
+        f.write(raw)
+        for name, a in arrays.items():
+            f.seek(data_start + index[name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+# ----------------------------------------------------------------------
+# 읽기
+# ----------------------------------------------------------------------
+
+def is_bundle(path: Path | str) -> bool:
+    """파일 앞부분이 MAGIC 인지 (확장자가 아니라 내용으로 판별)."""
+    try:
+        with Path(path).open("rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_bundle(
+    path: Path | str,
+    kind: Optional[str] = None,
+    feature_keys: Optional[Sequence[str]] = FEATURE_KEYS,
+) -> ModelBundle:
+    """
+    번들을 mmap 으로 연다. header 만 파싱하고 텐서는 파일 위의 view 로 만든다.
+    kind / feature_keys 가 주어지면 일치하는지 확인한다 (feature_keys=None 이면 생략).
+    """
+    path = Path(path)
+    # 빈 파일은 np.memmap 자체가 ValueError 를 내므로 mmap 전에 크기부터 본다
+    if path.stat().st_size < _PREAMBLE.size:
+        raise BundleError(f"번들 파일이 너무 짧습니다: {path}")
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, header_len = _PREAMBLE.unpack(mm[: _PREAMBLE.size].tobytes())
+    if magic != MAGIC:
+        raise BundleError(f"DFY 모델 번들이 아닙니다: {path}")
+    if version != FORMAT_VERSION:
+        raise BundleError(f"지원하지 않는 번들 버전 {version}: {path}")
+    if _PREAMBLE.size + header_len > mm.size:
+        raise BundleError(f"번들 header 가 잘렸습니다: {path}")
+    try:
+        header = json.loads(mm[_PREAMBLE.size : _PREAMBLE.size + header_len].tobytes().decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise BundleError(f"번들 header 를 읽을 수 없습니다: {path} ({e})") from e
+
+    data_start = _align(_PREAMBLE.size + header_len)
+    tensors: Dict[str, np.ndarray] = {}
+    for name, info in (header.get("tensors") or {}).items():
+        dtype = info.get("dtype")
+        if dtype not in _ALLOWED_DTYPES:
+            raise BundleError(f"지원하지 않는 텐서 dtype: {name} ({dtype})")
+        shape = tuple(int(s) for s in info.get("shape", ()))
+        nbytes = int(info.get("nbytes", -1))
+        start = data_start + int(info.get("offset", -1))
+        if nbytes != math.prod(shape) * np.dtype(dtype).itemsize or start < data_start or start + nbytes > mm.size:
+            raise BundleError(f"텐서 범위가 잘못되었습니다: {name}")
+        tensors[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=mm, offset=start)
+
+    bundle = ModelBundle(header, tensors, path)
+    validate(bundle, kind, feature_keys)
+    return bundle
+
+
+def validate(
+    bundle: ModelBundle,
+    kind: Optional[str] = None,
+    feature_keys: Optional[Sequence[str]] = FEATURE_KEYS,
+) -> None:
+    """종류 / 피처 순서 / 표준화 통계 길이 확인."""
+    if kind is not None and bundle.kind != kind:
+        raise BundleError(f"모델 종류가 다릅니다: {bundle.kind} != {kind}")
+    if feature_keys is not None and bundle.feature_keys != list(feature_keys):
+        raise BundleError(f"피처 스키마가 다릅니다: {bundle.feature_keys} != {list(feature_keys)}")
+    n = len(bundle.feature_keys)
+    for name in ("feature_mean", "feature_std"):
+        v = bundle.header.get(name)
+        if v is not None and len(v) != n:
+            raise BundleError(f"{name} 길이({len(v)})가 피처 수({n})와 다릅니다.")
+
+
+# ----------------------------------------------------------------------
+# 예전 형식 (torch state_dict .pth + ae_thresholds.json)
+# ----------------------------------------------------------------------
+
+# 예전 파일에는 구조 파라미터가 없으므로 당시 기본 구조를 쓴다
+LEGACY_ARCH: Dict[str, Dict[str, Any]] = {
+    "ae": {"input_dim": len(FEATURE_KEYS), "hidden_dim": 32, "code_dim": 8},
+    "lstm": {"input_dim": len(FEATURE_KEYS), "hidden_dim": 64, "num_layers": 2, "dropout": 0.2},
+}
+
+
+def from_legacy(kind: str, weights_path: Path | str, thresholds_path: Optional[Path | str] = None) -> ModelBundle:
+    """
+    예전 .pth(+ 임계값 JSON)를 메모리 번들로 읽는다.
+    torch.load 는 weights_only=True 로만 호출해서 임의 객체 unpickle 은 막는다.
+    """
+    import torch
+
+    state = torch.load(weights_path, map_location="cpu", weights_only=True)
+    header: Dict[str, Any] = {
+        "kind": kind,
+        "arch": dict(LEGACY_ARCH[kind]),
+        "feature_keys": list(FEATURE_KEYS),
+        "thresholds": {},
+        "metadata": {"legacy": True},
+    }
+    if thresholds_path is not None:
+        with Path(thresholds_path).open("r", encoding="utf-8") as f:
+            th = json.load(f)
+        header["feature_keys"] = th.get("feature_keys", FEATURE_KEYS)
+        header["feature_mean"] = th.get("feature_mean")
+        header["feature_std"] = th.get("feature_std")
+        header["thresholds"] = {
+            k: th[k] for k in ("error_mean", "error_std", "warn_threshold", "critical_threshold") if k in th
+        }
+        header["metadata"]["num_samples"] = th.get("num_samples", 0)
+        header["arch"]["input_dim"] = len(header["feature_keys"])
+    return ModelBundle(header, state_dict_arrays(state), Path(weights_path))
+
+
+def open_model(kind: str, path: Path | str, thresholds_path: Optional[Path | str] = None) -> ModelBundle:
+    """path 가 번들이면 mmap 으로, 아니면 예전 .pth 로 읽는다 (둘 다 FEATURE_KEYS 로 검증)."""
+    if is_bundle(path):
+        return read_bundle(path, kind=kind)
+    b = from_legacy(kind, path, thresholds_path)
+    validate(b, kind)
+    return b
+
+
+def has_model(kind: str, directory: Path | str) -> bool:
+    d = Path(directory)
+    legacy = LEGACY_FILES.get(kind, ())
+    return (d / BUNDLE_NAMES[kind]).exists() or (bool(legacy) and all((d / n).exists() for n in legacy))
+
+
+def open_in_dir(kind: str, directory: Path | str, cache: bool = False) -> ModelBundle:
+    """
+    폴더 안의 kind 모델을 연다: 번들 파일이 있으면 그것을, 없으면 예전 파일들을.
+
+    - 예전 파일이 번들보다 새로우면 (다시 덮어쓴 경우) 예전 파일 쪽을 쓴다
+    - cache=True 면 예전 파일을 읽은 김에 번들로 변환해 옆에 저장한다.
+      다음부터는 torch 없이 mmap 으로 바로 열린다
+    """
+    d = Path(directory)
+    path = d / BUNDLE_NAMES[kind]
+    legacy = [d / n for n in LEGACY_FILES.get(kind, ())]
+    missing = [p.name for p in legacy if not p.exists()]
+    if path.exists() and (not legacy or missing or path.stat().st_mtime >= max(p.stat().st_mtime for p in legacy)):
+        return read_bundle(path, kind=kind)
+    if not legacy:
+        raise FileNotFoundError(f"{kind} 모델 파일이 없습니다: {path.name}")
+    if missing:
+        raise FileNotFoundError(f"{kind} 모델 파일이 없습니다: {path.name} (또는 {', '.join(missing)})")
+    thresholds_path = legacy[1] if len(legacy) > 1 else None
+    if cache:
+        try:
+            return read_bundle(convert_legacy(kind, legacy[0], path, thresholds_path), kind=kind)
+        except OSError as e:
+            # 읽기 전용 폴더 등: 변환은 건너뛰고 예전 파일을 그대로 쓴다
+            print(f"[DFY][Bundle] {kind} 번들 캐시 저장 실패: {e}")
+    return open_model(kind, legacy[0], thresholds_path)
+
+
+def convert_legacy(
+    kind: str, weights_path: Path | str, out_path: Path | str, thresholds_path: Optional[Path | str] = None
+) -> Path:
+    """예전 파일을 번들 파일 하나로 변환해서 저장."""
+    b = from_legacy(kind, weights_path, thresholds_path)
+    return write_bundle(
+        out_path,
+        kind,
+        b.tensors,
+        b.arch,
+        b.feature_keys,
+        b.header.get("feature_mean"),
+        b.header.get("feature_std"),
+        b.thresholds,
+        b.metadata,
+    )
+
+
+if __name__ == "__main__":
+    # internal/ 의 예전 .pth(+json)를 번들로 변환: python -m model.bundle
+    model_dir = Path(__file__).resolve().parents[1] / "internal"
+    for k, names in LEGACY_FILES.items():
+        files = [model_dir / n for n in names]
+        if all(p.exists() for p in files):
+            out = convert_legacy(k, files[0], model_dir / BUNDLE_NAMES[k], files[1] if len(files) > 1 else None)
+            print(f"[DFY][Bundle] {k}: {out}")
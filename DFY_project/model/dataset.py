@@ -2,25 +2,15 @@
 from __future__ import annotations
 
 import csv
+from collections.abc import Sequence
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Iterable
-import json
-import glob
+from typing import List, Dict, Iterable
+import numpy as np
 import torch
-from torch.utils.data import Dataset, DataLoader
-
-# Collector / Analyzer / Predictor에서 공통으로 쓰는 피처 목록
-# 키 이름과 순서는 runtime 쪽(metrics_buffer, predictor 등)과 반드시 같아야 한다.
-FEATURE_KEYS: List[str] = [
-    "cpu",
-    "ram",
-    "gpu",
-    "gpu_temp",
-    "disk_read",
-    "disk_write",
-    "net_upload",
-    "net_download",
-]
+from torch.utils.data import Dataset, DataLoader, default_collate
+
+from model.features import FEATURE_KEYS
+from model.report_json import load_report_series  # noqa: F401  (torch 없는 모듈로 이동, 예전 import 경로 유지)
 
 
 def _find_column(fieldnames: List[str], patterns: Iterable[str]) -> str | None:
@@ -118,167 +108,157 @@ def _build_column_map(fieldnames: List[str]) -> Dict[str, str | None]:
     return colmap
 
 
+def window_starts(series: np.ndarray, seq_len: int, horizon: int = 1) -> np.ndarray:
+    """
+    시계열 행렬 series (N, feature_dim) 에서 (x_seq, target) 윈도우를 만들 수 있는 시작 위치.
+
+    - 윈도우 = 입력 seq_len + 가장 먼 타겟까지 horizon (총 seq_len+horizon 행)
+    - cpu 가 없는(NaN) 시점이 하나라도 섞인 윈도우는 제외
+    """
+    span = seq_len + horizon
+    if len(series) < span:
+        return np.empty(0, dtype=np.int64)
+
+    # cpu 가 없는 시점 개수의 누적합 → 윈도우 구간 합이 0 인 시작 위치만
+    bad = np.concatenate([[0], np.cumsum(np.isnan(series[:, FEATURE_KEYS.index("cpu")]))])
+    return np.flatnonzero(bad[span:] - bad[:-span] == 0).astype(np.int64)
+
+
+def target_offsets(seq_len: int, horizons: Sequence[int] = (1,), targets: Sequence[str] = ("cpu",)):
+    """
+    윈도우 (seq_len + max(horizons) 행) 안에서 타겟 값의 (행 위치 (H, 1), 피처 위치 (1, T)).
+    win[:, rows, cols] 가 (B, H, T) 타겟이 된다 (horizon h = 입력 마지막 시점의 h step 뒤).
+    """
+    rows = np.asarray([seq_len - 1 + int(h) for h in horizons], dtype=np.int64)[:, None]
+    cols = np.asarray([FEATURE_KEYS.index(k) for k in targets], dtype=np.int64)[None, :]
+    return rows, cols
+
+
 class LoadDataset(Dataset):
     """
     data/daily/report_*.json 을 읽어서
-    (seq_len, feature_dim) -> target_cpu 형태로 만드는 Dataset.
+    (seq_len, feature_dim) -> target 형태로 만드는 Dataset.
+
+    - target 은 horizons (step 뒤) x targets (피처) 값을 이어 붙인 (H*T,) 벡터.
+      기본값은 예전처럼 다음 시점 cpu 하나 (1,).
 
     - JSON 인코딩이 UTF-8 / CP949 뒤섞여 있어도 최대한 대응.
     - JSON이 아닌 파일(실제로는 CSV인데 .json으로 저장된 것 등)은 자동으로 스킵.
     - 실제 데이터에서 나온 시계열만 사용하고,
       아무 샘플도 없으면 그냥 빈 Dataset으로 둔다.
+    - 파일별 파싱 결과((N, feature_dim) 행렬)는 model.feature_cache 에 저장되어,
+      바뀌지 않은 report 는 다시 JSON 파싱하지 않는다.
+    - 윈도우를 미리 만들어 두지 않는다: 모든 시계열을 이어 붙인 (N, feature_dim) 텐서 하나와
+      유효한 윈도우 시작 위치 배열만 들고, 샘플은 slice view / 인덱스 계산으로 꺼낸다.
+      (메모리 O(N), seq_len 배 복사 없음)
     """
 
-    def __init__(self, daily_dir: str = "data/daily", seq_len: int = 30) -> None:
+    def __init__(
+        self,
+        daily_dir: str = "data/daily",
+        seq_len: int = 30,
+        horizons: Sequence[int] = (1,),
+        targets: Sequence[str] = ("cpu",),
+    ) -> None:
         self.seq_len = seq_len
-        # samples: List[(x_tensor, y_tensor)]
-        self.samples: List[Tuple[torch.Tensor, torch.Tensor]] = []
-
-        daily_path = Path(daily_dir)
-        json_files = sorted(glob.glob(str(daily_path / "report_*.json")))
-
-        for jf in json_files:
-            report = None
-
-            # 1) UTF-8로 먼저 시도
-            try:
-                with open(jf, "r", encoding="utf-8") as f:
-                    report = json.load(f)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # 2) 안 되면 CP949(EUC-KR)로 재시도
-                try:
-                    with open(jf, "r", encoding="cp949") as f:
-                        report = json.load(f)
-                except Exception as e:
-                    print(f"[DFY][dataset][WARN] JSON/인코딩 오류, 파일 스킵: {jf} ({e})")
-                    continue
-
-            # report 형태 확인
-            if not isinstance(report, (list, dict)):
-                print(f"[DFY][dataset][WARN] 예상치 못한 JSON 구조, 파일 스킵: {jf}")
-                continue
+        self.horizon = max(int(h) for h in horizons)
+        rows, cols = target_offsets(seq_len, horizons, targets)
+        self._target_rows = torch.from_numpy(rows)
+        self._target_cols = torch.from_numpy(cols)
+
+        parts: List[np.ndarray] = []
+        start_parts: List[np.ndarray] = []
+        offset = 0
 
-            # 시계열 추출
-            series = self._extract_series(report)
-            if not series or len(series) <= seq_len:
+        for series in load_report_series(daily_dir):
+            if series.shape[0] < seq_len + self.horizon:
                 continue
 
-            # 시계열 → 슬라이딩 윈도우 샘플 생성
-            self._add_series_samples(series)
+            # 시계열 → 유효한 슬라이딩 윈도우 시작 위치
+            parts.append(series)
+            start_parts.append(self._window_starts(series) + offset)
+            offset += series.shape[0]
+
+        if parts:
+            data = np.concatenate(parts).astype(np.float32, copy=False)
+            # 윈도우 안에 cpu 가 없는 시점은 없으므로 NaN 은 0 으로 채워 둔다 (입력으로 쓰이지 않음)
+            data = np.nan_to_num(data, nan=0.0)
+        else:
+            data = np.empty((0, len(FEATURE_KEYS)), dtype=np.float32)
+        self._data = torch.from_numpy(data)
+        self._starts = torch.from_numpy(
+            np.concatenate(start_parts) if start_parts else np.empty(0, dtype=np.int64)
+        )
+        # 한 윈도우(입력 seq_len + 타겟 horizon) 안의 상대 위치, batch gather 용
+        self._offsets = torch.arange(seq_len + self.horizon)
 
         # 실제 데이터로 만든 샘플이 하나도 없을 때
-        if not self.samples:
+        if len(self) == 0:
             print("[DFY][dataset][WARN] data/daily 에서 학습에 쓸 샘플을 찾지 못했습니다.")
             print("[DFY][dataset][WARN] Autoencoder/LSTM은 실제 데이터가 쌓인 뒤에야 학습할 수 있습니다.")
         else:
-            print(f"[DFY][dataset] 총 샘플 수: {len(self.samples)} (윈도우 길이={self.seq_len})")
+            print(f"[DFY][dataset] 총 샘플 수: {len(self)} (윈도우 길이={self.seq_len})")
 
     # ---------------- 내부 메서드들 ----------------
 
-    def _extract_series(self, report: Any) -> List[Dict[str, Any]]:
+    def feature_matrix(self) -> np.ndarray:
+        """모든 시계열을 이어 붙인 (N, feature_dim) 행렬 (내부 텐서와 메모리 공유, 표준화 통계용)."""
+        return self._data.numpy()
+
+    def _window_starts(self, series: np.ndarray) -> np.ndarray:
+        return window_starts(series, self.seq_len, self.horizon)
+
+    def __len__(self) -> int:
+        return int(self._starts.shape[0])
+
+    def __getitem__(self, idx: int):
         """
-        report 구조가 어떻게 생겼든 간에, 가능한 한
-        'cpu'를 포함한 dict들의 리스트를 찾아서 반환한다.
+        (x_seq (seq_len, feature_dim), target (H*T,)).
+        x 는 내부 텐서의 view 이므로 수정하지 말 것 (DataLoader collate 시 복사됨).
         """
+        s = int(self._starts[idx])
+        x = self._data[s : s + self.seq_len]
+        y = self._data[s + self._target_rows, self._target_cols].reshape(-1)
+        return x, y
 
-        # case 1: report 자체가 리스트인 경우
-        if isinstance(report, list):
-            # 리스트 첫 원소가 dict이고 'cpu'를 가지면 바로 사용
-            if report and isinstance(report[0], dict) and "cpu" in report[0]:
-                return report
-
-            # 리스트 안에 또 다른 구조들이 섞여 있으면 재귀적으로 탐색
-            for item in report:
-                sub = self._extract_series(item)
-                if sub:
-                    return sub
-            return []
-
-        # case 2: dict인 경우 – 여러 키 후보를 순서대로 검사
-        if isinstance(report, dict):
-            # 가장 흔하게 쓰일 법한 키들
-            candidate_keys = [
-                "time_series",
-                "samples",
-                "data",
-                "history",
-                "series",
-                "metrics",
-                "records",
-            ]
-            for key in candidate_keys:
-                if key in report:
-                    v = report[key]
-                    if isinstance(v, list) and v:
-                        if isinstance(v[0], dict) and "cpu" in v[0]:
-                            return v
-
-            # 위에서 못 찾았으면 dict 내부 값들을 재귀적으로 훑기
-            for v in report.values():
-                sub = self._extract_series(v)
-                if sub:
-                    return sub
-
-            # 최후의 수단: dict 자신이 시점 하나일 수 있음
-            if "cpu" in report:
-                return [report]
-
-        # 그 외 타입은 시계열 정보가 아니라고 판단
-        return []
-
-    def _add_series_samples(self, series: List[Dict[str, Any]]) -> None:
+    def __getitems__(self, indices: List[int]) -> "WindowBatch":
         """
-        시계열 series(각 원소가 dict)를 받아서
-        슬라이딩 윈도우로 (x_seq, target_cpu) 샘플들을 self.samples에 추가한다.
-
-        - x_seq      : (seq_len, feature_dim)
-        - target_cpu : 다음 시점의 CPU 사용량 (스칼라)
+        DataLoader 가 batch 인덱스를 한 번에 넘길 때 호출된다.
+        (B, seq_len+1) 인덱스로 한 번에 gather 해서 이미 batch 로 묶인 (x, y) 를 만든다.
+        collate_windows(create_dataloader 가 설정)는 그것을 그대로 쓰고,
+        기본 collate 를 쓰는 DataLoader 에서도 샘플 리스트로 동작한다.
         """
-        if len(series) <= self.seq_len:
-            return
-
-        for i in range(len(series) - self.seq_len):
-            # 입력 seq_len + 타겟 1 (총 seq_len+1 길이의 윈도우)
-            window = series[i : i + self.seq_len + 1]
-
-            # cpu가 없는 시점이 섞여 있으면 스킵
-            valid = True
-            for step in window:
-                if "cpu" not in step:
-                    valid = False
-                    break
-            if not valid:
-                continue
+        starts = self._starts[torch.as_tensor(indices, dtype=torch.long)]
+        win = self._data[starts[:, None] + self._offsets]      # (B, seq_len+horizon, feature_dim)
+        x = win[:, : self.seq_len]
+        y = win[:, self._target_rows, self._target_cols].reshape(len(indices), -1)
+        return WindowBatch(x, y)
 
-            # 입력 시퀀스 x_seq
-            x_seq: List[List[float]] = []
-            for step in window[:-1]:
-                vec: List[float] = []
-                for k in FEATURE_KEYS:
-                    v = step.get(k, 0.0)
-                    try:
-                        v = float(v) if v is not None else 0.0
-                    except (TypeError, ValueError):
-                        v = 0.0
-                    vec.append(v)
-                x_seq.append(vec)
-
-            # 타겟: 마지막 시점의 cpu
-            target_cpu = window[-1].get("cpu", 0.0)
-            try:
-                target_cpu_f = float(target_cpu)
-            except (TypeError, ValueError):
-                continue
 
-            x_tensor = torch.tensor(x_seq, dtype=torch.float32)
-            y_tensor = torch.tensor([target_cpu_f], dtype=torch.float32)
-            self.samples.append((x_tensor, y_tensor))
+class WindowBatch(Sequence):
+    """
+    LoadDataset.__getitems__ 결과.
+    .x / .y 에 batch 로 묶인 텐서를 들고 있고, 시퀀스로 접근하면 샘플별 (x, y) view 를 돌려준다.
+    """
+
+    def __init__(self, x: torch.Tensor, y: torch.Tensor) -> None:
+        self.x = x
+        self.y = y
 
     def __len__(self) -> int:
-        return len(self.samples)
+        return int(self.x.shape[0])
 
-    def __getitem__(self, idx: int):
-        return self.samples[idx]
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.x[i], self.y[i]
+
+
+def collate_windows(batch):
+    """WindowBatch 는 이미 묶인 (x, y) 를 그대로, 그 외는 기본 collate."""
+    if isinstance(batch, WindowBatch):
+        return batch.x, batch.y
+    return default_collate(batch)
 
 
 def create_dataloader(
@@ -286,6 +266,8 @@ def create_dataloader(
     seq_len: int = 30,
     batch_size: int = 64,
     shuffle: bool = True,
+    horizons: Sequence[int] = (1,),
+    targets: Sequence[str] = ("cpu",),
 ):
     """
     LoadDataset으로부터 DataLoader를 만든다.
@@ -293,10 +275,10 @@ def create_dataloader(
     - 실제 샘플이 하나도 없으면(None 반환):
         * Autoencoder/LSTM 학습 쪽에서 그냥 '데이터 없음' 처리하고 종료하도록.
     """
-    dataset = LoadDataset(daily_dir=daily_dir, seq_len=seq_len)
+    dataset = LoadDataset(daily_dir=daily_dir, seq_len=seq_len, horizons=horizons, targets=targets)
 
     if len(dataset) == 0:
         print("[DFY][dataset][WARN] Empty dataset, DataLoader를 생성하지 않습니다.")
         return None
 
-    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
\ No newline at end of file
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, collate_fn=collate_windows)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# model/feature_cache.py
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+
+from model import hwinfo_csv
+from model.features import FEATURE_KEYS
+
+# 파싱된 피처 행렬 캐시 위치 (data/daily 옆, 프로젝트 루트 기준)
+CACHE_DIR = Path("data/cache/features")
+
+# 캐시 파일 형식 / 파싱 규칙이 바뀌면 올려서 기존 캐시를 모두 무효화
+_FORMAT_VERSION = 2
+
+
+def cache_dir() -> Path:
+    root = Path(__file__).resolve().parents[1]
+    return root / CACHE_DIR
+
+
+def _schema_hash(kind: str) -> str:
+    """파싱 결과에 영향을 주는 설정(피처 순서, CSV 컬럼 패턴)의 해시."""
+    schema = {"version": _FORMAT_VERSION, "kind": kind, "feature_keys": FEATURE_KEYS}
+    if kind == "hwinfo_csv":
+        schema["patterns"] = hwinfo_csv.COLUMN_PATTERNS
+    raw = json.dumps(schema, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def cache_key(src: Path, kind: str) -> str:
+    """원본 경로 / 크기 / 수정 시각 / 스키마 해시로 만든 캐시 키."""
+    st = src.stat()
+    raw = f"{src.resolve()}|{st.st_size}|{st.st_mtime_ns}|{_schema_hash(kind)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_prefix(src: Path) -> str:
+    # 같은 이름의 파일이 다른 폴더에 있어도 섞이지 않도록 경로 해시를 붙인다
+    path_hash = hashlib.sha1(str(src.resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"{src.name}.{path_hash}."
+
+
+def _remove_stale(src: Path, keep: Path) -> None:
+    """같은 원본에 대한 예전 키의 캐시 파일 정리."""
+    for old in keep.parent.glob(_cache_prefix(src) + "*.npy"):
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+# .npy header 자리 (shape 를 모르는 채로 chunk 를 먼저 쓰고, 끝나면 header 를 채운다)
+_NPY_HEADER_SIZE = 128
+
+
+def _npy_header(shape) -> bytes:
+    """float32 C-order 배열용 .npy v1.0 header 를 _NPY_HEADER_SIZE 바이트로 패딩해서 만든다."""
+    body = ("{'descr': '<f4', 'fortran_order': False, 'shape': %r, }" % (tuple(shape),)).encode("latin1")
+    prefix = np.lib.format.magic(1, 0) + struct.pack("<H", _NPY_HEADER_SIZE - 10)
+    return prefix + body + b" " * (_NPY_HEADER_SIZE - 10 - len(body) - 1) + b"\n"
+
+
+def _write_npy_chunks(f, chunks: Iterable[np.ndarray]) -> None:
+    """(n, F) chunk 들을 메모리에 모으지 않고 그대로 이어 써서 하나의 .npy 로 만든다."""
+    f.write(b"\0" * _NPY_HEADER_SIZE)
+    rows, cols = 0, len(FEATURE_KEYS)
+    for chunk in chunks:
+        c = np.ascontiguousarray(chunk, dtype="<f4")
+        f.write(c.data)
+        rows += c.shape[0]
+        cols = c.shape[1]
+    f.seek(0)
+    f.write(_npy_header((rows, cols)))
+
+
+Built = Union[np.ndarray, Iterable[np.ndarray]]
+
+
+def load_cached(src: Path | str, kind: str, build: Callable[[Path], Built]) -> np.ndarray:
+    """
+    src 를 build(src) 로 파싱한 (N, F) float32 행렬을 캐시를 거쳐 반환한다.
+
+    - 키(경로, 크기, mtime, 스키마 해시)가 같은 캐시가 있으면 np.load(mmap_mode="r") 로 바로 연다
+    - 없으면 파싱해서 임시 파일에 쓴 뒤 os.replace 로 교체 (중간에 죽어도 깨진 캐시가 남지 않음)
+    - build 가 chunk iterator 를 돌려주면 chunk 단위로 바로 파일에 써서, 원본이 RAM 보다 커도 된다
+    - 캐시 폴더에 쓸 수 없으면 파싱 결과를 그대로 반환
+    반환된 배열은 읽기 전용일 수 있다.
+    """
+    src = Path(src)
+    out_dir = cache_dir()
+    path = out_dir / f"{_cache_prefix(src)}{cache_key(src, kind)}.npy"
+
+    if path.exists():
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"[DFY][Cache][WARN] 캐시를 열 수 없어 다시 만듭니다: {path.name} ({e})")
+
+    built = build(src)
+    chunks = [built] if isinstance(built, np.ndarray) else built
+
+    tmp = path.with_suffix(".tmp")
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            _write_npy_chunks(f, chunks)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[DFY][Cache][WARN] 피처 캐시 저장 실패: {e}")
+        if isinstance(built, np.ndarray):
+            return np.ascontiguousarray(built, dtype=np.float32)
+        parts = list(build(src))
+        if not parts:
+            return np.empty((0, len(FEATURE_KEYS)), dtype=np.float32)
+        return np.concatenate(parts).astype(np.float32, copy=False)
+    _remove_stale(src, path)
+    return np.load(path, mmap_mode="r")
+
+
+def load_csv_features(csv_path: Path | str = hwinfo_csv.HWINFO_LOG_PATH) -> np.ndarray:
+    """HWiNFO CSV → 정리된 피처 행렬 (hwinfo_csv.iter_clean_chunks 결과를 chunk 단위로 캐시)."""
+    src = hwinfo_csv.resolve_path(csv_path)
+    if not src.exists():
+        raise FileNotFoundError(f"HWiNFO 로그 파일을 찾을 수 없습니다: {src}")
+    return load_cached(src, "hwinfo_csv", hwinfo_csv.iter_clean_chunks)
+
+
+def clear(src: Optional[Path | str] = None) -> None:
+    """캐시 삭제 (src 를 주면 그 원본에 대한 캐시만)."""
+    out_dir = cache_dir()
+    pattern = (_cache_prefix(Path(src)) + "*.npy") if src is not None else "*.npy"
+    for p in out_dir.glob(pattern):
+        try:
+            p.unlink()
+        except OSError:
+            pass
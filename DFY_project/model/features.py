@@ -0,0 +1,16 @@
+# model/features.py
+from typing import List
+
+# Collector / Analyzer / Predictor에서 공통으로 쓰는 피처 목록
+# 키 이름과 순서는 runtime 쪽(metrics_buffer, predictor 등)과 반드시 같아야 한다.
+# (torch 없이 import 할 수 있도록 model.dataset 에서 분리. model.dataset 도 그대로 re-export 한다)
+FEATURE_KEYS: List[str] = [
+    "cpu",
+    "ram",
+    "gpu",
+    "gpu_temp",
+    "disk_read",
+    "disk_write",
+    "net_upload",
+    "net_download",
+]
@@ -0,0 +1,232 @@
+# model/hwinfo_csv.py
+import csv
+import glob
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from model.features import FEATURE_KEYS
+
+# HWiNFO 로그 기본 경로 (프로젝트 루트 기준)
+HWINFO_LOG_PATH = Path("data/daily/time_log.CSV")
+
+# 한 번에 변환하는 행 수 (chunk 당 메모리 = 행 수 x 피처 수 만큼만 사용)
+DEFAULT_CHUNK_ROWS = 65536
+
+# FEATURE_KEYS 별 HWiNFO 헤더 후보 (앞에 있는 패턴이 우선)
+COLUMN_PATTERNS: Dict[str, List[str]] = {
+    "cpu": ["총 CPU 사용량", "Total CPU Usage", "Total CPU"],
+    "ram": ["Physical Memory Load", "메모리 사용량", "Memory Load [%]"],
+    "gpu": ["GPU 활용률", "GPU Core Usage", "GPU Core Load", "GPU Usage"],
+    "gpu_temp": ["GPU 온도", "GPU Temperature"],
+    "disk_read": ["Read Rate [MB/s]", "Read Rate [KB/s]"],
+    "disk_write": ["Write Rate [MB/s]", "Write Rate [KB/s]"],
+    "net_download": ["Current DL rate", "Download Rate"],
+    "net_upload": ["Current UP rate", "Upload Rate"],
+}
+
+# KB/s 라벨이면 MB/s 로 바꿔 주는 피처
+_RATE_KEYS = ("disk_read", "disk_write", "net_download", "net_upload")
+
+# 값이 없으면 행 자체를 버리는 핵심 피처
+REQUIRED_KEYS = ("cpu", "ram")
+
+
+def resolve_path(csv_path: Path | str) -> Path:
+    """상대 경로는 프로젝트 루트 기준으로 해석."""
+    csv_path = Path(csv_path)
+    if not csv_path.is_absolute():
+        root = Path(__file__).resolve().parents[1]
+        csv_path = root / csv_path
+    return csv_path
+
+
+def resolve_sources(paths) -> List[Path]:
+    """
+    학습 입력 경로 정리: 단일 경로 / 경로 리스트 / glob 패턴("data/logs/*.CSV") 모두 허용.
+    상대 경로는 프로젝트 루트 기준.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    out: List[Path] = []
+    for p in paths:
+        p = resolve_path(p)
+        if any(ch in str(p) for ch in "*?["):
+            out.extend(Path(m) for m in sorted(glob.glob(str(p))))
+        else:
+            out.append(p)
+    return out
+
+
+def _find_column(fieldnames: List[str], patterns: Iterable[str]) -> Optional[str]:
+    """여러 후보 문자열 중에서 header 안에 들어있는 이름을 찾아서 반환."""
+    for p in patterns:
+        for name in fieldnames:
+            if p in name:
+                return name
+    return None
+
+
+def build_column_map(fieldnames: List[str]) -> Dict[str, Optional[str]]:
+    """HWiNFO header 에서 FEATURE_KEYS 각각에 해당하는 컬럼 이름을 찾는다 (패턴 포함 여부)."""
+    return {key: _find_column(fieldnames, COLUMN_PATTERNS.get(key, [])) for key in FEATURE_KEYS}
+
+
+def column_indices(fieldnames: List[str], colmap: Dict[str, Optional[str]]) -> List[int]:
+    """
+    FEATURE_KEYS 순서의 컬럼 인덱스 (못 찾으면 -1).
+    HWiNFO header 에는 같은 이름(GPU 온도, Current DL rate 등)이 여러 번 나오므로,
+    기존 csv.DictReader 와 같게 마지막으로 나온 컬럼을 쓴다.
+    """
+    last: Dict[str, int] = {name: i for i, name in enumerate(fieldnames)}
+    return [last[colmap[k]] if colmap.get(k) else -1 for k in FEATURE_KEYS]
+
+
+def column_scales(colmap: Dict[str, Optional[str]]) -> np.ndarray:
+    """피처별 배율: KB/s 라벨인 디스크/네트워크 속도는 1/1024 (→ MB/s)."""
+    scales = np.ones(len(FEATURE_KEYS), dtype=np.float64)
+    for j, key in enumerate(FEATURE_KEYS):
+        name = colmap.get(key)
+        if key in _RATE_KEYS and name and "KB/s" in name:
+            scales[j] = 1.0 / 1024.0
+    return scales
+
+
+def _parse_float(raw: str) -> float:
+    """문자열 하나를 float 로 (실패하면 NaN). chunk 일괄 변환이 실패했을 때만 쓰인다."""
+    raw = raw.strip().replace(",", ".")
+    if not raw:
+        return np.nan
+    try:
+        return float(raw)
+    except ValueError:
+        return np.nan
+
+
+_parse_cells = np.frompyfunc(_parse_float, 1, 1)
+
+
+def cells_to_float(cells: List[Tuple[str, ...]]) -> np.ndarray:
+    """
+    문자열 셀 (n, k) 을 한 번에 float64 로 변환.
+    - 소수점 쉼표("1,5")는 "." 로 바꾼 뒤 변환
+    - 빈 칸 / 숫자가 아닌 값은 NaN (이 경우에만 셀 단위로 다시 파싱)
+    """
+    arr = np.array(cells, dtype=np.str_)
+    if arr.size == 0:
+        return np.empty(arr.shape, dtype=np.float64)
+    arr = np.char.replace(arr, ",", ".")
+    try:
+        return arr.astype(np.float64)
+    except ValueError:
+        return _parse_cells(arr).astype(np.float64)
+
+
+def _sniff_delimiter(header_line: str) -> str:
+    """지역 설정에 따라 ';' 로 구분된 로그도 있어서 header 로 구분자를 고른다."""
+    return ";" if header_line.count(";") > header_line.count(",") else ","
+
+
+def iter_feature_chunks(
+    csv_path: Path | str = HWINFO_LOG_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    verbose: bool = True,
+) -> Iterator[np.ndarray]:
+    """
+    HWiNFO CSV 를 chunk_rows 행씩 읽어 (n, len(FEATURE_KEYS)) float32 배열을 내보낸다.
+
+    - header 에서 컬럼 위치를 한 번만 찾고, 각 행에서는 그 컬럼들만 꺼낸다 (수백 개 컬럼 dict 생성 없음)
+    - 따옴표가 없는 행(HWiNFO 본문 행 대부분)은 필요한 마지막 컬럼까지만 str.split 으로 자르고,
+      따옴표가 있는 행만 csv 모듈로 파싱한다
+    - 변환 / KB/s → MB/s 배율은 chunk 단위로 벡터화
+    - header 에 없는 피처는 0.0 으로 채우고, 있는 컬럼의 빈 칸 / 숫자가 아닌 값만 NaN 으로 남긴다
+      (정리는 호출하는 쪽 / load_feature_matrix)
+    - Date 칸이 숫자로 시작하지 않는 행(끝부분에 반복되는 header, 센서 이름 행)은 건너뛴다
+    """
+    csv_path = resolve_path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"HWiNFO 로그 파일을 찾을 수 없습니다: {csv_path}")
+
+    # 인코딩이 섞여 있어도 강제로 읽는다 (잘못된 바이트는 버림, 숫자 컬럼만 쓰므로 문제 없음)
+    with csv_path.open("r", encoding="utf-8-sig", errors="ignore", newline="") as f:
+        header_line = f.readline()
+        delimiter = _sniff_delimiter(header_line)
+        fieldnames = next(csv.reader([header_line], delimiter=delimiter), None)
+        if not fieldnames:
+            raise RuntimeError("CSV header(fieldnames)를 읽지 못했습니다.")
+
+        colmap = build_column_map(fieldnames)
+        if verbose:
+            print(f"[DFY][CSV] HWiNFO CSV 읽는 중: {csv_path}")
+            print("[DFY][CSV] Column mapping:")
+            for k in FEATURE_KEYS:
+                print(f"   {k:<12} <- {colmap.get(k)}")
+
+        idx = column_indices(fieldnames, colmap)
+        present = [j for j, i in enumerate(idx) if i >= 0]
+        if not present:
+            raise RuntimeError("CSV 에서 사용할 수 있는 피처 컬럼을 하나도 찾지 못했습니다.")
+        pick = itemgetter(*[idx[j] for j in present])
+        min_len = max(idx) + 1
+        scales = column_scales(colmap)[present]
+        single = len(present) == 1
+
+        def _convert(cells: List[Tuple[str, ...]]) -> np.ndarray:
+            vals = cells_to_float([(c,) for c in cells] if single else cells) * scales
+            # header 에 없는 피처 자리는 0 (기존 train_ae 와 같음), NaN 은 있는 컬럼의 빈 칸뿐
+            out = np.zeros((len(cells), len(FEATURE_KEYS)), dtype=np.float32)
+            out[:, present] = vals
+            return out
+
+        cells: List[Tuple[str, ...]] = []
+        for line in f:
+            if not line[:1].isdigit():
+                continue
+            if '"' in line:
+                row = next(csv.reader([line], delimiter=delimiter))
+            else:
+                row = line.rstrip("\r\n").split(delimiter, min_len)
+            if len(row) < min_len:
+                continue
+            cells.append(pick(row))
+            if len(cells) >= chunk_rows:
+                yield _convert(cells)
+                cells = []
+        if cells:
+            yield _convert(cells)
+
+
+def clean_features(chunk: np.ndarray) -> np.ndarray:
+    """
+    학습용 정리: 핵심 피처(cpu / ram) 칸이 비어 있는 행은 버리고, 나머지 빈 값은 0 으로 채운다.
+    iter_feature_chunks 가 header 에 없는 피처를 0 으로 채워 두므로, 기존 train_ae 와 같게
+    컬럼이 있는데 값이 빈 경우에만 행이 빠진다.
+    """
+    req = [FEATURE_KEYS.index(k) for k in REQUIRED_KEYS if k in FEATURE_KEYS]
+    keep = ~np.isnan(chunk[:, req]).any(axis=1)
+    return np.nan_to_num(chunk[keep], nan=0.0)
+
+
+def iter_clean_chunks(
+    csv_path: Path | str = HWINFO_LOG_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    verbose: bool = True,
+) -> Iterator[np.ndarray]:
+    """iter_feature_chunks + clean_features (학습용으로 정리된 chunk 스트림)."""
+    for chunk in iter_feature_chunks(csv_path, chunk_rows, verbose):
+        yield clean_features(chunk)
+
+
+def load_feature_matrix(
+    csv_path: Path | str = HWINFO_LOG_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    verbose: bool = True,
+) -> np.ndarray:
+    """HWiNFO CSV 전체를 정리된 (num_samples, feature_dim) float32 행렬로 읽는다."""
+    parts = list(iter_clean_chunks(csv_path, chunk_rows, verbose))
+    if not parts:
+        return np.empty((0, len(FEATURE_KEYS)), dtype=np.float32)
+    return np.concatenate(parts)
@@ -1,13 +1,19 @@
 # model/lstm_model.py
+from typing import Sequence
+
 import torch
 import torch.nn as nn
 
 
 class LoadLSTM(nn.Module):
     """
-    시스템 부하(cpu 중심) 예측용 LSTM 모델.
+    시스템 부하 예측용 LSTM 모델.
     입력: (batch, seq_len, input_dim)
-    출력: (batch, 1)  -> 다음 시점의 CPU 사용률 예측
+    출력: (batch, len(horizons) * len(targets))
+      - horizons : 몇 step 뒤를 예측할지 (1 = 다음 시점)
+      - targets  : 예측할 피처 이름 (FEATURE_KEYS 의 일부)
+      - 출력 순서는 horizon 별로 targets 를 이어 붙인 것 ([h0 의 targets..., h1 의 targets..., ...])
+    기본값 (horizons=(1,), targets=("cpu",)) 은 예전처럼 (batch, 1) 다음 시점 CPU 사용률.
     """
 
     def __init__(
@@ -16,8 +22,12 @@ class LoadLSTM(nn.Module):
         hidden_dim: int = 64,
         num_layers: int = 2,
         dropout: float = 0.2,
+        horizons: Sequence[int] = (1,),
+        targets: Sequence[str] = ("cpu",),
     ) -> None:
         super().__init__()
+        self.horizons = [int(h) for h in horizons]
+        self.targets = list(targets)
         self.lstm = nn.LSTM(
             input_size=input_dim,
             hidden_size=hidden_dim,
@@ -25,14 +35,14 @@ class LoadLSTM(nn.Module):
             batch_first=True,
             dropout=dropout,
         )
-        self.fc = nn.Linear(hidden_dim, 1)
+        # 모든 horizon x target 을 Linear 하나로 한 번에
+        self.fc = nn.Linear(hidden_dim, len(self.horizons) * len(self.targets))
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         """
         x: (batch, seq_len, input_dim)
-        return: (batch, 1)  # 예측한 다음 시점 CPU 사용률
+        return: (batch, len(horizons) * len(targets))
         """
         out, _ = self.lstm(x)          # (batch, seq_len, hidden_dim)
         last_hidden = out[:, -1, :]    # (batch, hidden_dim)
-        cpu_pred = self.fc(last_hidden)  # (batch, 1)
-        return cpu_pred
+        return self.fc(last_hidden)
@@ -0,0 +1,71 @@
+# model/multitask_model.py
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import torch
+from torch import nn
+
+from model.ae_model import LoadSequenceAutoencoder
+
+
+class LoadMultitaskModel(LoadSequenceAutoencoder):
+    """
+    AE 와 LSTM 예측을 encoder 하나로 처리하는 multi-task 모델.
+
+    - encoder / decoder: LoadSequenceAutoencoder 와 같음 (인과 conv, 시점별 코드 → 재구성)
+    - forecast head: 마지막 seq_len 시점의 코드를 펴서
+      Linear(seq_len*code -> forecast_hidden) -> ReLU -> Linear(forecast_hidden -> H*T)
+      출력 순서는 LoadLSTM 과 같은 horizon-major ([h0 의 targets..., h1 의 targets..., ...])
+
+    입력 / 재구성 / 예측 모두 번들의 feature_mean / feature_std 로 정규화된 공간에서 다룬다.
+    시점별 코드는 encoder 의 유한한 receptive field 로만 정해지므로, 실시간에는
+    새 시점의 코드 하나만 계산해서 최근 seq_len 개 코드 버퍼에 붙이면
+    재구성 오차와 예측이 한 번에 나온다 (model.numpy_infer.NumpyMultitask).
+    """
+
+    def __init__(
+        self,
+        input_dim: Optional[int] = None,
+        hidden_dim: int = 32,
+        code_dim: int = 8,
+        kernel_size: int = 5,
+        seq_len: int = 30,
+        horizons: Sequence[int] = (1,),
+        targets: Sequence[str] = ("cpu",),
+        forecast_hidden: int = 64,
+        **kwargs,
+    ) -> None:
+        super().__init__(input_dim, hidden_dim, code_dim, kernel_size, seq_len)
+        self.horizons = [int(h) for h in horizons]
+        self.targets = list(targets)
+        self.forecast_hidden = forecast_hidden
+
+        self.forecast = nn.Sequential(
+            nn.Linear(seq_len * code_dim, forecast_hidden),
+            nn.ReLU(),
+            nn.Linear(forecast_hidden, len(self.horizons) * len(self.targets)),
+        )
+
+    def forward(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        x: (B, L, F), L >= seq_len (보통 span).
+        반환: (재구성 (B, L, F), 예측 (B, H*T)).
+        """
+        z = self.encode(x)
+        codes = z[:, :, -self.seq_len :].transpose(1, 2)          # (B, seq_len, code) 시점 순서
+        return self.decode(z), self.forecast(codes.reshape(codes.shape[0], -1))
+
+    def reconstruction_error(
+        self, x: torch.Tensor, reduction: str = "mean", recon: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        if recon is None:
+            recon = self(x)[0]
+        return super().reconstruction_error(x, reduction, recon)
+
+    def arch(self) -> Dict[str, Any]:
+        return {
+            **super().arch(),
+            "type": "multitask",
+            "horizons": self.horizons,
+            "targets": self.targets,
+            "forecast_hidden": self.forecast_hidden,
+        }
@@ -0,0 +1,292 @@
+# model/numpy_infer.py
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from model.bundle import BundleError, ModelBundle
+
+# 런타임 추론 전용 NumPy 구현.
+# - 번들(model.bundle)의 가중치를 그대로(mmap view) 써서 LoadAutoencoder / LoadSequenceAutoencoder / LoadLSTM 의
+#   forward 를 계산한다
+# - torch 는 학습에만 쓰고, 앱 실행 경로에서는 import 하지 않는다
+# - 결과는 torch 모델과 float32 오차 범위에서 같다 (engine_test.py 의 parity 단계에서 확인)
+
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    """exp overflow 경고 없는 sigmoid (tanh 형태)."""
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _weights(bundle: ModelBundle, names: List[str]) -> List[np.ndarray]:
+    missing = [n for n in names if n not in bundle.tensors]
+    if missing:
+        raise BundleError(f"{bundle.kind} 번들에 가중치가 없습니다: {', '.join(missing)}")
+    return [bundle.tensors[n] for n in names]
+
+
+class NumpyAutoencoder:
+    """
+    LoadAutoencoder 와 같은 계산:
+      encoder: Linear → ReLU → Linear → ReLU
+      decoder: Linear → ReLU → Linear
+    Linear 가중치는 torch 와 같은 (out, in) 배치라서 x @ W.T + b 로 쓴다.
+    """
+
+    def __init__(self, bundle: ModelBundle) -> None:
+        w = _weights(
+            bundle,
+            [
+                "encoder.0.weight", "encoder.0.bias", "encoder.2.weight", "encoder.2.bias",
+                "decoder.0.weight", "decoder.0.bias", "decoder.2.weight", "decoder.2.bias",
+            ],
+        )
+        # (in, out) 로 한 번 전치해 두면 매 호출마다 .T view 를 만들지 않아도 된다
+        self._layers = [(np.ascontiguousarray(w[i].T), w[i + 1]) for i in range(0, 8, 2)]
+        self.input_dim = self._layers[0][0].shape[0]
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        (w1, b1), (w2, b2) = self._layers[:2]
+        h = np.maximum(x @ w1 + b1, 0.0)
+        return np.maximum(h @ w2 + b2, 0.0)
+
+    def decode(self, z: np.ndarray) -> np.ndarray:
+        (w3, b3), (w4, b4) = self._layers[2:]
+        h = np.maximum(z @ w3 + b3, 0.0)
+        return h @ w4 + b4
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """x: (F,) 또는 (B, F) 정규화된 입력 → 같은 shape 의 재구성."""
+        return self.decode(self.encode(np.asarray(x, dtype=np.float32)))
+
+    def reconstruction_error(self, x: np.ndarray) -> np.ndarray:
+        """샘플별 평균 제곱 재구성 오차 ((B,) 또는 스칼라 배열)."""
+        x = np.asarray(x, dtype=np.float32)
+        diff = self(x) - x
+        return (diff * diff).mean(axis=-1)
+
+
+# 윈도우 AE 상태: 층별로 최근 kernel_size 개 시점의 입력 (k, in)
+ConvState = List[np.ndarray]
+
+
+class NumpySequenceAutoencoder:
+    """
+    LoadSequenceAutoencoder 와 같은 계산 (인과 conv 3개 + 1x1 conv).
+    conv 가중치 (out, in, k) 는 (k*in, out) 으로 펴 두고, 시점별 입력 k 개를 이어 붙인
+    (k*in,) 벡터와 matmul 한다.
+
+    - __call__(x)  : (L, F) 또는 (B, L, F) 전체를 왼쪽 0 패딩으로 계산 (torch 와 같음)
+    - run(x)       : (L, F) 를 계산하고, 이어서 step 할 수 있는 상태도 함께 반환
+    - step(x, st)  : 새 시점 하나만 계산 (층마다 최근 k 개 입력만 캐시)
+    run_codes / step_codes 는 encoder 출력(시점별 코드)도 같이 돌려준다 (NumpyMultitask 가 사용).
+    receptive field 가 유한하므로 step 결과는 윈도우를 다시 계산한 것과 (float32 오차 안에서) 같고,
+    LSTM 스트리밍처럼 주기적으로 다시 맞출 필요가 없다.
+    """
+
+    def __init__(self, bundle: ModelBundle) -> None:
+        arch = bundle.arch
+        names = ["encoder.0", "encoder.2", "decoder.0", "decoder.2"]
+        w = _weights(bundle, [f"{n}.{p}" for n in names for p in ("weight", "bias")])
+        self._layers = []
+        for i, relu in zip(range(0, 8, 2), (True, True, True, False)):
+            weight, bias = w[i], w[i + 1]
+            out_ch, in_ch, k = weight.shape
+            mat = np.ascontiguousarray(weight.transpose(2, 1, 0).reshape(k * in_ch, out_ch))
+            self._layers.append((mat, bias, k, in_ch, relu))
+        self.input_dim = self._layers[0][3]
+        self.seq_len = int(arch.get("seq_len", 30))
+        self.receptive_field = sum(k - 1 for _, _, k, _, _ in self._layers) + 1
+        self.span = self.seq_len + self.receptive_field - 1
+
+    # encoder 마지막 층 (이 층의 출력이 시점별 코드)
+    CODE_LAYER = 1
+
+    def _forward(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, ConvState]:
+        """x: (L, F) → (재구성 (L, F), 코드 (L, code), 마지막 k 개 입력으로 만든 층별 상태)."""
+        L = x.shape[0]
+        state: ConvState = []
+        seq = codes = x
+        for i, (mat, bias, k, in_ch, relu) in enumerate(self._layers):
+            padded = np.concatenate([np.zeros((k - 1, in_ch), dtype=np.float32), seq])
+            state.append(padded[-k:].copy())
+            # (L, k, in) 슬라이딩 윈도우를 펴서 matmul 한 번
+            win = np.lib.stride_tricks.sliding_window_view(padded, k, axis=0)     # (L, in, k)
+            seq = win.transpose(0, 2, 1).reshape(L, k * in_ch) @ mat + bias
+            if relu:
+                seq = np.maximum(seq, 0.0)
+            if i == self.CODE_LAYER:
+                codes = seq
+        return seq, codes, state
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 2:
+            return self._forward(x)[0]
+        return np.stack([self._forward(w)[0] for w in x])
+
+    def run(self, x: np.ndarray) -> Tuple[np.ndarray, ConvState]:
+        """x: (L, F) 를 처음부터 계산 → (재구성 (L, F), step 으로 이어갈 상태)."""
+        recon, _, state = self._forward(np.asarray(x, dtype=np.float32))
+        return recon, state
+
+    def run_codes(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, ConvState]:
+        """run 과 같지만 시점별 코드 (L, code) 도 반환: (재구성, 코드, 상태)."""
+        return self._forward(np.asarray(x, dtype=np.float32))
+
+    def position_errors(self, x: np.ndarray) -> np.ndarray:
+        """x: (L, F) 또는 (B, L, F) → 시점 / 피처별 제곱 재구성 오차 (같은 shape)."""
+        x = np.asarray(x, dtype=np.float32)
+        diff = self(x) - x
+        return diff * diff
+
+    def init_state(self) -> ConvState:
+        return [np.zeros((k, in_ch), dtype=np.float32) for _, _, k, in_ch, _ in self._layers]
+
+    def step_codes(
+        self, x: np.ndarray, state: Optional[ConvState] = None
+    ) -> Tuple[np.ndarray, np.ndarray, ConvState]:
+        """x: (F,) 새 시점 하나 → (그 시점의 재구성 (F,), 코드 (code,), 새 상태)."""
+        inp = code = np.asarray(x, dtype=np.float32)
+        state = state or self.init_state()
+        new_state: ConvState = []
+        for i, ((mat, bias, k, in_ch, relu), buf) in enumerate(zip(self._layers, state)):
+            buf = np.concatenate([buf[1:], inp[None]])
+            new_state.append(buf)
+            inp = buf.reshape(-1) @ mat + bias
+            if relu:
+                inp = np.maximum(inp, 0.0)
+            if i == self.CODE_LAYER:
+                code = inp
+        return inp, code, new_state
+
+    def step(self, x: np.ndarray, state: Optional[ConvState] = None) -> Tuple[np.ndarray, ConvState]:
+        """x: (F,) 새 시점 하나 → (그 시점의 재구성 (F,), 새 상태)."""
+        recon, _, state = self.step_codes(x, state)
+        return recon, state
+
+
+class NumpyMultitask(NumpySequenceAutoencoder):
+    """
+    LoadMultitaskModel 과 같은 계산: NumpySequenceAutoencoder + forecast head.
+
+    - head(codes): 최근 seq_len 개 코드 (seq_len, code) → 정규화된 예측 (H*T,)
+    - forecast(x): (L >= span, F) 윈도우 → 재구성 (L, F) 과 예측 (H*T,) 을 forward 한 번으로
+    실시간에는 step_codes 로 새 코드 하나만 만들고 코드 버퍼로 head 를 부른다
+    (engine.multitask.MultitaskDetector).
+    """
+
+    def __init__(self, bundle: ModelBundle) -> None:
+        super().__init__(bundle)
+        arch = bundle.arch
+        self.horizons = [int(h) for h in arch.get("horizons", [1])]
+        self.targets = list(arch.get("targets", ["cpu"]))
+        w = _weights(bundle, ["forecast.0.weight", "forecast.0.bias", "forecast.2.weight", "forecast.2.bias"])
+        self._head = [(np.ascontiguousarray(w[i].T), w[i + 1]) for i in (0, 2)]
+        self.code_dim = self._layers[self.CODE_LAYER][0].shape[1]
+
+    def head(self, codes: np.ndarray) -> np.ndarray:
+        """codes: (seq_len, code) 또는 (B, seq_len, code) → (H*T,) 또는 (B, H*T)."""
+        codes = np.asarray(codes, dtype=np.float32)
+        flat = codes.reshape(codes.shape[:-2] + (-1,))
+        (w1, b1), (w2, b2) = self._head
+        return np.maximum(flat @ w1 + b1, 0.0) @ w2 + b2
+
+    def forecast(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """x: (L, F), L >= span 권장 → (재구성 (L, F), 예측 (H*T,))."""
+        recon, codes, _ = self.run_codes(x)
+        return recon, self.head(codes[-self.seq_len :])
+
+
+def load_autoencoder(bundle: ModelBundle) -> Union[NumpyAutoencoder, NumpySequenceAutoencoder]:
+    """번들 arch type 에 맞는 NumPy AE (type 이 없으면 점 단위 AE, multitask 번들도 받는다)."""
+    kind = bundle.arch.get("type")
+    if kind == "multitask":
+        return NumpyMultitask(bundle)
+    if kind == "sequence":
+        return NumpySequenceAutoencoder(bundle)
+    return NumpyAutoencoder(bundle)
+
+
+# LSTM 상태: 층별 (h, c), 각각 (B, hidden)
+LSTMState = List[Tuple[np.ndarray, np.ndarray]]
+
+
+class NumpyLSTM:
+    """
+    LoadLSTM(nn.LSTM(batch_first) + Linear(hidden, H*T)) 와 같은 계산 (H = horizon 수, T = target 수).
+    게이트 순서는 torch 와 같은 (input, forget, cell, output).
+
+    - __call__(x) : (B, L, F) 윈도우 전체 → (B, H*T) 다중 horizon 예측
+      출력은 horizon-major ([h0 의 targets..., h1 의 targets..., ...]), reshape(B, H, T) 로 나눈다
+    - run(x, state): 상태를 이어서 진행하고 마지막 hidden 과 상태를 반환
+    - step(x, state): 한 시점만 진행 (스트리밍 추론용, 층마다 matmul 2번)
+    첫 층의 입력 투영은 모든 시점을 matmul 한 번으로 미리 계산한다.
+    """
+
+    def __init__(self, bundle: ModelBundle) -> None:
+        arch = bundle.arch
+        self.num_layers = int(arch.get("num_layers", 1))
+        self.hidden_dim = int(arch.get("hidden_dim", 64))
+        self._layers = []
+        for k in range(self.num_layers):
+            w_ih, w_hh, b_ih, b_hh = _weights(
+                bundle, [f"lstm.weight_ih_l{k}", f"lstm.weight_hh_l{k}", f"lstm.bias_ih_l{k}", f"lstm.bias_hh_l{k}"]
+            )
+            # 두 bias 는 항상 더해서 쓰므로 하나로 합친다
+            self._layers.append((np.ascontiguousarray(w_ih.T), np.ascontiguousarray(w_hh.T), b_ih + b_hh))
+        fc_w, fc_b = _weights(bundle, ["fc.weight", "fc.bias"])
+        self._fc = (np.ascontiguousarray(fc_w.T), fc_b)
+        self.input_dim = self._layers[0][0].shape[0]
+
+    def init_state(self, batch: int = 1) -> LSTMState:
+        z = np.zeros((batch, self.hidden_dim), dtype=np.float32)
+        return [(z, z) for _ in range(self.num_layers)]
+
+    def _cell(self, gates: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        H = self.hidden_dim
+        # 시점마다 ufunc 호출 수가 곧 비용이라 sigmoid 는 4H 전체에 한 번만 (g 구간은 안 씀)
+        s = sigmoid(gates)
+        g = np.tanh(gates[:, 2 * H : 3 * H])
+        c = s[:, H : 2 * H] * c + s[:, :H] * g
+        o = s[:, 3 * H :]
+        return o * np.tanh(c), c
+
+    def run(self, x: np.ndarray, state: Optional[LSTMState] = None) -> Tuple[np.ndarray, LSTMState]:
+        """
+        x: (B, L, F). 층마다 시점 순서대로 진행해서 마지막 층의 마지막 hidden (B, hidden) 과
+        끝난 뒤의 층별 상태를 반환한다.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        B, T, _ = x.shape
+        state = state or self.init_state(B)
+        seq = x
+        new_state: LSTMState = []
+        for (w_ih, w_hh, b), (h, c) in zip(self._layers, state):
+            proj = seq @ w_ih + b                      # (B, T, 4H) 입력 투영 한 번에
+            outs = np.empty((B, T, self.hidden_dim), dtype=np.float32)
+            for t in range(T):
+                h, c = self._cell(proj[:, t] + h @ w_hh, c)
+                outs[:, t] = h
+            new_state.append((h, c))
+            seq = outs
+        return seq[:, -1], new_state
+
+    def step(self, x: np.ndarray, state: Optional[LSTMState] = None) -> Tuple[np.ndarray, LSTMState]:
+        """x: (B, F) 한 시점. run(x[:, None], state) 와 같은 결과를 시점 루프 없이 계산한다."""
+        inp = np.asarray(x, dtype=np.float32)
+        state = state or self.init_state(inp.shape[0])
+        new_state: LSTMState = []
+        for (w_ih, w_hh, b), (h, c) in zip(self._layers, state):
+            h, c = self._cell(inp @ w_ih + b + h @ w_hh, c)
+            new_state.append((h, c))
+            inp = h
+        return inp, new_state
+
+    def head(self, h: np.ndarray) -> np.ndarray:
+        """마지막 hidden (B, hidden) → 예측 (B, H*T), horizon-major."""
+        w, b = self._fc
+        return h @ w + b
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        h, _ = self.run(x)
+        return self.head(h)
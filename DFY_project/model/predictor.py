@@ -2,58 +2,158 @@
 from __future__ import annotations
 
 import math
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 
-import torch
+import numpy as np
 
-from model.lstm_model import LoadLSTM
-from model.dataset import FEATURE_KEYS
+from model import bundle as model_bundle
+from model.bundle import BundleError, ModelBundle
+from model.features import FEATURE_KEYS
+from model.numpy_infer import NumpyLSTM
+
+# history 입력 형식:
+#   - np.ndarray (N, len(FEATURE_KEYS)) : metrics_buffer.get_feature_window() 결과 (권장)
+#   - list[dict]                         : 예전 get_feature_history() 포맷 (호환용)
+History = Union[np.ndarray, List[Dict[str, Any]]]
+
+_CPU_INDEX = FEATURE_KEYS.index("cpu")
+
+# 스트리밍 모드에서 (h, c) 를 윈도우 전체로 다시 계산하는 주기 (step 수).
+# 학습 때는 항상 0 상태에서 seq_len 만큼만 보므로, 상태를 계속 이어 가면
+# 윈도우 밖의 오래된 샘플 영향이 남는다. 주기적으로 다시 맞춰서 그 차이를 묶어 둔다.
+RESYNC_EVERY = 300
+
+
+def cpu_risk(pred_cpu: float) -> Tuple[str, float]:
+    """
+    예측 CPU(%) → (상태, 위험도 0~1).
+    기준: 75% 이상이면 위험 커짐, 그 이상일수록 risk_score ↑
+    ((pred_cpu - 75) / 7.5 를 sigmoid에 넣어서 0~1 스케일)
+    """
+    z = (pred_cpu - 75.0) / 7.5
+    risk_raw = 1 / (1 + math.exp(-z))
+    risk_score = max(0.0, min(1.0, risk_raw))
+
+    if risk_score < 0.33:
+        status = "NORMAL"
+    elif risk_score < 0.66:
+        status = "WARN"
+    else:
+        status = "CRITICAL"
+    return status, risk_score
 
 
 class LoadPredictor:
     """
     DFY Assistant용 부하 예측기.
-    최근 seq_len개의 snapshot 리스트를 받아
-    - 다음 시점의 CPU 사용률 예측
-    - 위험도(0~1), 상태 문자열 반환
+    최근 seq_len개의 피처 윈도우(또는 snapshot 리스트)를 받아
+    - 번들 arch 의 horizons (step 뒤) x targets (피처) 예측을 forward 한 번으로 계산
+      (예전 모델은 horizons=[1], targets=["cpu"])
+    - 가장 가까운 horizon 의 CPU 예측으로 위험도(0~1), 상태 문자열 반환
+    번들에 feature_mean/std 가 있으면 입력을 표준화하고 출력을 원래 단위로 되돌린다.
+
+    스트리밍 모드 (stream_update / assess_risk_stream):
+    - 층별 (h, c) 상태를 들고 있다가 새 샘플마다 한 step 만 진행한다
+      (윈도우 전체 재계산 대비 tick 당 비용 약 1/seq_len)
+    - 처음, 샘플을 놓쳤을 때, resync_every step 마다 최근 윈도우로 상태를 다시 만든다
     """
 
     def __init__(
         self,
-        model_path: str = "internal/model_load_lstm.pth",
+        model_path: Optional[str] = None,
         seq_len: int = 30,
         device: Optional[str] = None,
+        bundle: Optional[ModelBundle] = None,
+        resync_every: int = RESYNC_EVERY,
     ) -> None:
+        """
+        - bundle     : 이미 연 "lstm" 번들 (engine.model_registry 가 넘겨줌)
+        - model_path : 번들(.dfym) 또는 예전 state_dict(.pth) 경로
+        - 둘 다 없으면 internal/ 에서 번들 → 예전 .pth 순으로 찾는다
+        - device     : 호환용 (추론은 NumPy 로 CPU 에서 한다)
+        - resync_every : 스트리밍 상태를 윈도우 전체로 다시 계산하는 주기 (step 수)
+        """
         self.seq_len = seq_len
+        self.resync_every = max(1, int(resync_every))
 
         # 🔽 프로젝트 루트(new_dfy) 기준으로 상대 경로 처리
         root_dir = Path(__file__).resolve().parents[1]  # .../new_dfy
-        mp = Path(model_path)
-        if not mp.is_absolute():
-            mp = root_dir / mp
-        self.model_path = mp
-
-        if device is None:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.device = device
-
-        if not self.model_path.exists():
-            raise FileNotFoundError(
-                f"모델 가중치 파일이 없습니다: {self.model_path}\n"
-                f"먼저 `python -m model.train_lstm` 를 실행해 학습을 완료하세요."
-            )
-
-        self.model = LoadLSTM(input_dim=len(FEATURE_KEYS))
-        state = torch.load(self.model_path, map_location=self.device)
-        self.model.load_state_dict(state)
-        self.model.to(self.device)
-        self.model.eval()
-
-    def _build_sequence(self, history: List[Dict[str, Any]]) -> torch.Tensor:
+        self.device = "cpu"
+
+        if bundle is None:
+            try:
+                if model_path is None:
+                    bundle = model_bundle.open_in_dir("lstm", root_dir / "internal", cache=True)
+                else:
+                    mp = Path(model_path)
+                    if not mp.is_absolute():
+                        mp = root_dir / mp
+                    if not mp.exists():
+                        raise FileNotFoundError(mp)
+                    bundle = model_bundle.open_model("lstm", mp)
+            except FileNotFoundError as e:
+                raise FileNotFoundError(
+                    f"모델 가중치 파일이 없습니다: {e}\n"
+                    f"먼저 `python -m model.train_lstm` 를 실행해 학습을 완료하세요."
+                ) from e
+        self.model_path = bundle.path
+        self.metadata = bundle.metadata
+
+        self.model = NumpyLSTM(bundle)
+
+        # 출력 구성: (horizon, target) 순서로 이어 붙인 벡터
+        arch = bundle.arch
+        self.horizons: List[int] = [int(h) for h in arch.get("horizons", [1])]
+        self.targets: List[str] = list(arch.get("targets", ["cpu"]))
+        if "cpu" not in self.targets:
+            raise BundleError(f"lstm 번들 targets 에 cpu 가 없습니다: {self.targets}")
+        self._target_cols = np.asarray([FEATURE_KEYS.index(k) for k in self.targets], dtype=np.int64)
+        # 위험도는 가장 가까운 horizon 의 cpu 로 계산
+        self._risk_pos = (self.horizons.index(min(self.horizons)), self.targets.index("cpu"))
+
+        mean, std = bundle.feature_mean, bundle.feature_std
+        if mean is not None and std is not None:
+            self._mean = mean
+            self._std = np.where(std < 1e-6, 1.0, std).astype(np.float32)
+        else:
+            self._mean = self._std = None
+
+        # ---- 스트리밍 상태 (hub 샘플 스레드와 UI 스레드가 같이 쓴다) ----
+        self._stream_lock = threading.Lock()
+        self.stream_seq: Optional[int] = None         # 상태에 반영된 마지막 버퍼 sequence
+        self._stream_window: Optional[np.ndarray] = None   # (seq_len, dim) 최근 입력
+        self._stream_state = None
+        self._stream_out: Optional[np.ndarray] = None       # (H, T) 최신 예측
+        self._since_sync = 0
+        self.stream_stats = {"steps": 0, "resyncs": 0}
+
+    def _window_to_tensor(self, window: np.ndarray) -> np.ndarray:
+        """
+        (N, feature_dim) float32 배열 → (1, seq_len, dim) 배열.
+        길이가 맞고 contiguous 이면 복사 없이 view 로 넘긴다.
         """
-        history: 최근 N개의 snapshot (SystemCollector.get_data() 포맷)
+        n = window.shape[0]
+        if n > self.seq_len:
+            window = window[-self.seq_len :]
+        elif 0 < n < self.seq_len:
+            padding = np.repeat(window[:1], self.seq_len - n, axis=0)
+            window = np.concatenate([padding, window], axis=0)
+        elif n == 0:
+            window = np.zeros((self.seq_len, len(FEATURE_KEYS)), dtype=np.float32)
+
+        window = np.ascontiguousarray(window, dtype=np.float32)
+        return window[None]  # (1, seq_len, dim)
+
+    def _build_sequence(self, history: History) -> np.ndarray:
+        """
+        history: 최근 N개의 피처 윈도우 (np.ndarray) 또는
+                 snapshot 리스트 (SystemCollector.get_data() 포맷)
         """
+        if isinstance(history, np.ndarray):
+            return self._window_to_tensor(history)
+
         if len(history) < self.seq_len:
             pad_needed = self.seq_len - len(history)
             padding = [history[0]] * pad_needed if history else [{
@@ -75,21 +175,101 @@ class LoadPredictor:
                 vec.append(v)
             seq.append(vec)
 
-        x = torch.tensor(seq, dtype=torch.float32).unsqueeze(0)  # (1, seq_len, dim)
-        return x.to(self.device)
+        return np.asarray(seq, dtype=np.float32)[None]  # (1, seq_len, dim)
+
+    def _normalize(self, x: np.ndarray) -> np.ndarray:
+        if self._mean is None:
+            return x
+        return (x - self._mean) / self._std
+
+    def _denormalize(self, out: np.ndarray) -> np.ndarray:
+        """모델 출력 (B, H*T) → 원래 단위 (B, H, T)."""
+        out = out.reshape(out.shape[0], len(self.horizons), len(self.targets))
+        if self._mean is None:
+            return out
+        return out * self._std[self._target_cols] + self._mean[self._target_cols]
 
-    @torch.no_grad()
-    def predict_next_cpu(self, history: List[Dict[str, Any]]) -> float:
-        x = self._build_sequence(history)
-        pred = self.model(x)   # (1, 1)
-        return float(pred.item())
+    def forecast(self, history: History) -> np.ndarray:
+        """(H, T) 예측: [i, j] = horizons[i] step 뒤의 targets[j] 값."""
+        x = self._normalize(self._build_sequence(history))
+        return self._denormalize(self.model(x))[0]
 
-    @torch.no_grad()
-    def assess_risk(self, history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def forecast_windows(self, windows: np.ndarray) -> np.ndarray:
+        """(B, seq_len, F) 원래 단위 윈도우 여러 개 → (B, H, T) 예측 (배치 backfill 용)."""
+        x = self._normalize(np.asarray(windows, dtype=np.float32))
+        return self._denormalize(self.model(x))
+
+    def forecast_dict(self, out: np.ndarray) -> Dict[int, Dict[str, float]]:
+        """(H, T) 예측 → {horizon: {피처: 값}}."""
+        return {
+            h: {k: float(out[i, j]) for j, k in enumerate(self.targets)}
+            for i, h in enumerate(self.horizons)
+        }
+
+    def predict_next_cpu(self, history: History) -> float:
+        return float(self.forecast(history)[self._risk_pos])
+
+    # ---- 스트리밍 모드 ----
+
+    def _resync_stream(self) -> np.ndarray:
+        """최근 윈도우 전체로 상태를 다시 계산한다 (_stream_lock 안에서 호출)."""
+        h, self._stream_state = self.model.run(self._normalize(self._stream_window)[None])
+        self._since_sync = 0
+        self.stream_stats["resyncs"] += 1
+        return h
+
+    def stream_update(self, seq: int, rows: np.ndarray) -> Optional[np.ndarray]:
         """
-        history[-1]['cpu'] 와 예측된 cpu_next 를 비교해서 위험도 계산.
+        버퍼에 새로 들어온 피처 행들로 상태를 진행하고 최신 (H, T) 예측을 반환.
+
+        - seq  : rows 마지막 행의 버퍼 sequence (metrics_buffer.get_feature_rows_since)
+        - rows : stream_seq 이후의 행들 (최신 쪽 최대 seq_len개)
+        이미 반영한 seq 면 아무것도 하지 않고 이전 예측을 돌려준다.
         """
-        if not history:
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, len(FEATURE_KEYS))
+        with self._stream_lock:
+            if self.stream_seq is not None and seq <= self.stream_seq:
+                return self._stream_out
+            if rows.shape[0] == 0:
+                return self._stream_out
+
+            n_new = None if self.stream_seq is None else seq - self.stream_seq
+            if n_new is None or n_new > rows.shape[0] or n_new >= self.seq_len:
+                # 처음이거나 중간 샘플을 놓침: 있는 행으로 윈도우를 새로 만든다
+                self._stream_window = self._window_to_tensor(rows)[0].copy()
+                h = self._resync_stream()
+            else:
+                new = rows[-n_new:]
+                self._stream_window = np.concatenate([self._stream_window[n_new:], new])
+                if self._since_sync + n_new >= self.resync_every:
+                    h = self._resync_stream()
+                else:
+                    state = self._stream_state
+                    for r in self._normalize(new):
+                        h, state = self.model.step(r[None], state)
+                    self._stream_state = state
+                    self._since_sync += n_new
+                    self.stream_stats["steps"] += n_new
+
+            self.stream_seq = seq
+            self._stream_out = self._denormalize(self.model.head(h))[0]
+            return self._stream_out
+
+    def stream_reset(self) -> None:
+        """스트리밍 상태를 버린다 (다음 stream_update 에서 윈도우로 다시 시작)."""
+        with self._stream_lock:
+            self.stream_seq = None
+            self._stream_window = None
+            self._stream_state = None
+            self._stream_out = None
+            self._since_sync = 0
+
+    def assess_risk_stream(self) -> Dict[str, Any]:
+        """스트리밍 상태의 최신 예측으로 assess_risk 와 같은 형식의 결과를 만든다."""
+        with self._stream_lock:
+            out = self._stream_out
+            current_cpu = None if self._stream_window is None else float(self._stream_window[-1, _CPU_INDEX])
+        if out is None:
             return {
                 "status": "UNKNOWN",
                 "risk_score": 0.0,
@@ -97,26 +277,35 @@ class LoadPredictor:
                 "current_cpu": None,
                 "reason": "no history",
             }
+        return self._risk_result(current_cpu, out)
 
-        current_cpu = float(history[-1].get("cpu", 0.0))
-        pred_cpu = self.predict_next_cpu(history)
-
-        # 기준: 75% 이상이면 위험 커짐, 그 이상일수록 risk_score ↑
-        # (pred_cpu - 75) / 7.5 를 sigmoid에 넣어서 0~1 스케일
-        z = (pred_cpu - 75.0) / 7.5
-        risk_raw = 1 / (1 + math.exp(-z))
-        risk_score = max(0.0, min(1.0, risk_raw))
+    def assess_risk(self, history: History) -> Dict[str, Any]:
+        """
+        history[-1]['cpu'] 와 예측된 cpu_next 를 비교해서 위험도 계산.
+        """
+        if history is None or len(history) == 0:
+            return {
+                "status": "UNKNOWN",
+                "risk_score": 0.0,
+                "predicted_cpu": None,
+                "current_cpu": None,
+                "reason": "no history",
+            }
 
-        if risk_score < 0.33:
-            status = "NORMAL"
-        elif risk_score < 0.66:
-            status = "WARN"
+        if isinstance(history, np.ndarray):
+            current_cpu = float(history[-1, _CPU_INDEX])
         else:
-            status = "CRITICAL"
+            current_cpu = float(history[-1].get("cpu", 0.0))
+        return self._risk_result(current_cpu, self.forecast(history))
+
+    def _risk_result(self, current_cpu: float, out: np.ndarray) -> Dict[str, Any]:
+        pred_cpu = float(out[self._risk_pos])
+        status, risk_score = cpu_risk(pred_cpu)
 
         return {
             "status": status,
             "risk_score": risk_score,
             "predicted_cpu": pred_cpu,
             "current_cpu": current_cpu,
+            "forecast": self.forecast_dict(out),
         }
@@ -0,0 +1,125 @@
+# model/report_json.py
+import glob
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from model import feature_cache
+from model.features import FEATURE_KEYS
+
+# (torch 없이 import 할 수 있도록 model.dataset 에서 분리. model.dataset 도 load_report_series 를 그대로 re-export 한다)
+
+
+def load_report_series(daily_dir: str = "data/daily") -> List[np.ndarray]:
+    """
+    daily_dir 의 report_*.json 각각을 (N, feature_dim) 행렬로 (feature_cache 경유, mmap 일 수 있음).
+    읽을 수 없는 파일은 빈 행렬.
+    """
+    json_files = sorted(glob.glob(str(Path(daily_dir) / "report_*.json")))
+    return [feature_cache.load_cached(jf, "report_json", parse_report) for jf in json_files]
+
+
+def parse_report(jf: Path) -> np.ndarray:
+    """
+    report JSON 하나를 (N, feature_dim) float32 행렬로 변환한다 (캐시 miss 일 때만 호출).
+    읽을 수 없는 파일은 빈 행렬을 돌려줘서, 그 결과도 캐시되도록 한다.
+    """
+    empty = np.empty((0, len(FEATURE_KEYS)), dtype=np.float32)
+    report = None
+
+    # 1) UTF-8로 먼저 시도
+    try:
+        with open(jf, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # 2) 안 되면 CP949(EUC-KR)로 재시도
+        try:
+            with open(jf, "r", encoding="cp949") as f:
+                report = json.load(f)
+        except Exception as e:
+            print(f"[DFY][dataset][WARN] JSON/인코딩 오류, 파일 스킵: {jf} ({e})")
+            return empty
+
+    # report 형태 확인
+    if not isinstance(report, (list, dict)):
+        print(f"[DFY][dataset][WARN] 예상치 못한 JSON 구조, 파일 스킵: {jf}")
+        return empty
+
+    # 시계열 추출
+    series = extract_series(report)
+    if not series:
+        return empty
+    return series_to_array(series)
+
+
+def series_to_array(series: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    시계열(dict 리스트) → (N, feature_dim) 행렬.
+    - 'cpu' 가 없거나 숫자가 아닌 시점은 cpu 칸을 NaN 으로 둔다 (그 시점을 포함한 윈도우는 스킵)
+    - 나머지 피처는 없거나 숫자가 아니면 0.0
+    """
+    arr = np.zeros((len(series), len(FEATURE_KEYS)), dtype=np.float32)
+    for i, step in enumerate(series):
+        for j, k in enumerate(FEATURE_KEYS):
+            v = step.get(k, 0.0)
+            try:
+                arr[i, j] = float(v) if v is not None else 0.0
+            except (TypeError, ValueError):
+                arr[i, j] = np.nan if k == "cpu" else 0.0
+        if "cpu" not in step:
+            arr[i, FEATURE_KEYS.index("cpu")] = np.nan
+    return arr
+
+
+def extract_series(report: Any) -> List[Dict[str, Any]]:
+    """
+    report 구조가 어떻게 생겼든 간에, 가능한 한
+    'cpu'를 포함한 dict들의 리스트를 찾아서 반환한다.
+    """
+
+    # case 1: report 자체가 리스트인 경우
+    if isinstance(report, list):
+        # 리스트 첫 원소가 dict이고 'cpu'를 가지면 바로 사용
+        if report and isinstance(report[0], dict) and "cpu" in report[0]:
+            return report
+
+        # 리스트 안에 또 다른 구조들이 섞여 있으면 재귀적으로 탐색
+        for item in report:
+            sub = extract_series(item)
+            if sub:
+                return sub
+        return []
+
+    # case 2: dict인 경우 – 여러 키 후보를 순서대로 검사
+    if isinstance(report, dict):
+        # 가장 흔하게 쓰일 법한 키들
+        candidate_keys = [
+            "time_series",
+            "samples",
+            "data",
+            "history",
+            "series",
+            "metrics",
+            "records",
+        ]
+        for key in candidate_keys:
+            if key in report:
+                v = report[key]
+                if isinstance(v, list) and v:
+                    if isinstance(v[0], dict) and "cpu" in v[0]:
+                        return v
+
+        # 위에서 못 찾았으면 dict 내부 값들을 재귀적으로 훑기
+        for v in report.values():
+            sub = extract_series(v)
+            if sub:
+                return sub
+
+        # 최후의 수단: dict 자신이 시점 하나일 수 있음
+        if "cpu" in report:
+            return [report]
+
+    # 그 외 타입은 시계열 정보가 아니라고 판단
+    return []
@@ -0,0 +1,316 @@
+# model/score_log.py
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model import bundle as model_bundle
+from model import feature_cache, hwinfo_csv
+from model.bundle import ModelBundle
+from model.features import FEATURE_KEYS
+from model.numpy_infer import NumpyMultitask, NumpySequenceAutoencoder, load_autoencoder
+from model.predictor import LoadPredictor
+from model.report_json import load_report_series
+
+# 지난 로그 전체를 AE / LSTM 으로 한 번에 채점하는 오프라인 도구 (backfill).
+# - 입력: HWiNFO CSV(경로 / glob) 또는 data/daily 리포트 (feature_cache 로 mmap)
+# - 출력: 행마다 점수 하나 (compact 배열) + WARN / CRITICAL 구간 목록
+# - 점수는 실시간 경로(engine.anomaly_detector)와 같은 값이 되도록 계산한다.
+#   윈도우 AE 는 chunk 앞에 span-1 행을 겹쳐 읽어서, chunk 경계에서도 스트리밍 결과와 같다.
+#
+#   python -m model.score_log data/daily/time_log.CSV --out reports/backfill
+
+# 한 번에 forward 하는 행 수 (chunk 하나 = 행 수 x 피처 수 x 4바이트 + 중간 활성값)
+BATCH_ROWS = 65536
+# LSTM 은 윈도우 (seq_len, F) 단위라 batch 를 따로 잡는다
+LSTM_BATCH = 4096
+# 이 행 수 이하로 떨어진 이상 구간은 하나로 합친다 (잠깐 임계값 아래로 내려간 경우)
+MERGE_GAP = 5
+# 오프라인 보정용 분위수 (engine.score_thresholds 의 WARN / CRITICAL 분위수와 같게)
+WARN_QUANTILE = 0.99
+CRITICAL_QUANTILE = 0.999
+
+_CPU_INDEX = FEATURE_KEYS.index("cpu")
+
+
+# ---------------------------------------------------------------------------
+# 채점
+# ---------------------------------------------------------------------------
+
+def ae_scores(
+    model: Any,
+    X: np.ndarray,
+    mean: np.ndarray,
+    std: np.ndarray,
+    batch_rows: int = BATCH_ROWS,
+) -> Dict[str, np.ndarray]:
+    """
+    X: (N, F) 원래 단위 → {"score": (N,) float32, "top_feature": (N,) int8, ["mt_cpu": (N,) float32]}.
+
+    - 점 단위 AE: 행마다 재구성 MSE
+    - 윈도우 AE / multitask: 행 i 로 끝나는 seq_len 윈도우의 점수 (실시간 stream_update 와 같은 값).
+      앞쪽 span-1 행은 문맥이 모자라 NaN
+    - multitask 면 같은 pass 의 encoder 코드로 가장 가까운 horizon 의 cpu 예측(mt_cpu)도 만든다
+    top_feature 는 재구성 오차가 가장 큰 피처 번호 (FEATURE_KEYS 순서, 점수가 없으면 -1).
+    cpu 가 비어 있는(NaN) 행은 0 으로 채워 계산하고 점수만 NaN 으로 둔다.
+    """
+    N = X.shape[0]
+    score = np.full(N, np.nan, dtype=np.float32)
+    top = np.full(N, -1, dtype=np.int8)
+    out = {"score": score, "top_feature": top}
+    sequence = isinstance(model, NumpySequenceAutoencoder)
+    multitask = isinstance(model, NumpyMultitask)
+    if multitask:
+        mt_cpu = out["mt_cpu"] = np.full(N, np.nan, dtype=np.float32)
+        h_idx = model.horizons.index(min(model.horizons))
+        t_idx = model.targets.index("cpu")
+        col = FEATURE_KEYS.index("cpu")
+
+    ctx = model.span - 1 if sequence else 0
+    for a in range(0, N, batch_rows):
+        b = min(a + batch_rows, N)
+        lo = max(0, a - ctx)
+        x = (np.nan_to_num(np.asarray(X[lo:b], dtype=np.float32)) - mean) / std
+        if not sequence:
+            diff = model(x) - x
+            err = diff * diff
+            score[a:b] = err.mean(axis=1)
+            top[a:b] = err.argmax(axis=1)
+            continue
+
+        recon, codes, _ = model.run_codes(x)
+        S = model.seq_len
+        err = ((recon - x) ** 2).astype(np.float64)
+        csum = np.concatenate([np.zeros((1, err.shape[1])), np.cumsum(err, axis=0)])
+        win = (csum[S:] - csum[:-S]) / S                 # [k] = 윈도우가 x[k + S - 1] 에서 끝남
+        first = max(a, lo + ctx)                         # 0 패딩 구간을 벗어난 첫 끝 행
+        if first >= b:
+            continue
+        sel = win[first - lo - (S - 1) : b - lo - (S - 1)]
+        score[first:b] = sel.mean(axis=1)
+        top[first:b] = sel.argmax(axis=1)
+
+        if multitask:
+            # 행 e 의 예측 = 코드 [e-S+1, e] 로 head (실시간 코드 버퍼와 같은 구성)
+            cw = np.lib.stride_tricks.sliding_window_view(codes, S, axis=0)    # (n-S+1, code, S)
+            cw = cw[first - lo - (S - 1) : b - lo - (S - 1)].transpose(0, 2, 1)
+            pred = model.head(cw).reshape(-1, len(model.horizons), len(model.targets))[:, h_idx, t_idx]
+            mt_cpu[first:b] = pred * std[col] + mean[col]
+
+    invalid = np.isnan(np.asarray(X[:, _CPU_INDEX], dtype=np.float32))
+    score[invalid] = np.nan
+    top[invalid] = -1
+    return out
+
+
+def lstm_forecasts(predictor: LoadPredictor, X: np.ndarray, batch: int = LSTM_BATCH) -> Tuple[np.ndarray, int]:
+    """
+    행 i 에서 (그때까지 seq_len 행으로) 예측한 가장 가까운 horizon 의 cpu 값 (N,) 과 그 horizon.
+    윈도우가 안 되는 앞쪽 seq_len-1 행은 NaN.
+    """
+    N, S = X.shape[0], predictor.seq_len
+    horizon = min(predictor.horizons)
+    h_idx, t_idx = predictor.horizons.index(horizon), predictor.targets.index("cpu")
+    pred = np.full(N, np.nan, dtype=np.float32)
+    for a in range(S - 1, N, batch):
+        b = min(a + batch, N)
+        x = np.nan_to_num(np.asarray(X[a - S + 1 : b], dtype=np.float32))
+        windows = np.lib.stride_tricks.sliding_window_view(x, S, axis=0).transpose(0, 2, 1)   # (b-a, S, F)
+        pred[a:b] = predictor.forecast_windows(windows)[:, h_idx, t_idx]
+    return pred, horizon
+
+
+def intervals(
+    scores: np.ndarray,
+    warn: float,
+    critical: float,
+    merge_gap: int = MERGE_GAP,
+) -> List[Dict[str, Any]]:
+    """
+    점수가 warn 이상인 연속 구간 목록 (merge_gap 행 이하로 끊긴 구간은 합침, NaN 은 정상 취급).
+    각 구간: {"start", "end"(포함), "rows", "level": "WARN" | "CRITICAL", "peak_row", "peak_score"}.
+    """
+    above = np.nan_to_num(scores, nan=-np.inf) >= warn
+    if not above.any():
+        return []
+    edges = np.diff(np.concatenate([[0], above.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+
+    merged: List[List[int]] = []
+    for s, e in zip(starts, ends):
+        if merged and s - merged[-1][1] - 1 <= merge_gap:
+            merged[-1][1] = e
+        else:
+            merged.append([s, e])
+
+    events = []
+    for s, e in merged:
+        seg = np.nan_to_num(scores[s : e + 1], nan=-np.inf)
+        peak = int(s + seg.argmax())
+        events.append({
+            "start": int(s),
+            "end": int(e),
+            "rows": int(e - s + 1),
+            "level": "CRITICAL" if scores[peak] >= critical else "WARN",
+            "peak_row": peak,
+            "peak_score": float(scores[peak]),
+        })
+    return events
+
+
+def score_series(
+    X: np.ndarray,
+    ae_bundle: ModelBundle,
+    predictor: Optional[LoadPredictor] = None,
+    warn: Optional[float] = None,
+    critical: Optional[float] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Tuple[Dict[str, np.ndarray], List[Dict[str, Any]]]:
+    """
+    시계열 하나를 채점: (행별 배열 dict, 이상 구간 목록).
+    임계값을 주지 않으면 번들에 저장된 학습 때 임계값을 쓴다.
+    predictor 를 주면 LSTM 예측 cpu(lstm_cpu)와 실제값과의 절대 오차(lstm_abs_err)도 더한다.
+    """
+    model = load_autoencoder(ae_bundle)
+    mean = np.asarray(ae_bundle.feature_mean, dtype=np.float32)
+    std = np.maximum(np.asarray(ae_bundle.feature_std, dtype=np.float32), 1e-6)
+    arrays = ae_scores(model, X, mean, std, batch_rows)
+
+    if predictor is not None:
+        pred, h = lstm_forecasts(predictor, X)
+        actual = np.full_like(pred, np.nan)
+        actual[: X.shape[0] - h] = X[h:, _CPU_INDEX]
+        arrays["lstm_cpu"] = pred
+        arrays["lstm_abs_err"] = np.abs(pred - actual)
+
+    th = ae_bundle.thresholds
+    warn = float(th["warn_threshold"]) if warn is None else warn
+    critical = float(th["critical_threshold"]) if critical is None else critical
+    return arrays, intervals(arrays["score"], warn, critical)
+
+
+def summarize(
+    arrays: Dict[str, np.ndarray], events: List[Dict[str, Any]], warn: float, critical: float
+) -> Dict[str, Any]:
+    """점수 분포 / 이벤트 수 요약 (분위수는 오프라인 임계값 보정용)."""
+    s = arrays["score"][~np.isnan(arrays["score"])]
+    out: Dict[str, Any] = {
+        "rows": int(arrays["score"].shape[0]),
+        "scored_rows": int(s.size),
+        "warn_threshold": warn,
+        "critical_threshold": critical,
+        "warn_events": sum(e["level"] == "WARN" for e in events),
+        "critical_events": sum(e["level"] == "CRITICAL" for e in events),
+        "rows_above_warn": int((s >= warn).sum()),
+    }
+    if s.size:
+        out.update({
+            "score_mean": float(s.mean()),
+            "score_p50": float(np.quantile(s, 0.5)),
+            "score_p99": float(np.quantile(s, WARN_QUANTILE)),
+            "score_p999": float(np.quantile(s, CRITICAL_QUANTILE)),
+        })
+    if "lstm_abs_err" in arrays:
+        e = arrays["lstm_abs_err"][~np.isnan(arrays["lstm_abs_err"])]
+        out["lstm_cpu_mae"] = float(e.mean()) if e.size else None
+    return out
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _open_bundle(kind: str, model_dir: Optional[str]) -> ModelBundle:
+    """model_dir 를 주면 그 폴더에서, 아니면 registry 의 현재 버전 (앱이 쓰는 것과 같은 모델)."""
+    if model_dir is not None:
+        return model_bundle.open_in_dir(kind, model_dir, cache=True)
+    from engine import model_registry  # 도구 실행 시에만 필요
+
+    return model_registry.get_registry().open_bundle(kind)
+
+
+def _load_sources(paths: Sequence[str], reports: Optional[str]) -> List[Tuple[str, np.ndarray]]:
+    sources = []
+    for p in hwinfo_csv.resolve_sources(paths):
+        try:
+            sources.append((str(p), feature_cache.load_csv_features(p)))
+        except Exception as e:
+            print(f"[DFY][Score][WARN] CSV 로드 실패, 건너뜀: {p} ({e})")
+    if reports:
+        for i, X in enumerate(load_report_series(reports)):
+            if X.shape[0]:
+                sources.append((f"{reports}#report{i}", X))
+    return sources
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DFY 로그 일괄 채점 (AE 점수 + WARN/CRITICAL 구간)")
+    parser.add_argument("paths", nargs="*", help="HWiNFO CSV 경로 / glob (없고 --reports 도 없으면 기본 로그)")
+    parser.add_argument("--reports", help="data/daily 처럼 report_*.json 이 있는 폴더")
+    parser.add_argument("--kind", choices=["ae", "multitask"], default="ae", help="채점할 모델 종류")
+    parser.add_argument("--model-dir", help="번들 폴더 (기본: 레지스트리 현재 버전)")
+    parser.add_argument("--no-lstm", action="store_true", help="LSTM 예측 채점 생략")
+    parser.add_argument("--warn", type=float, help="WARN 임계값 (기본: 번들 값)")
+    parser.add_argument("--critical", type=float, help="CRITICAL 임계값 (기본: 번들 값)")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--out", help="결과 접두사: <out>.npz (행별 배열) + <out>.json (요약 / 구간)")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or ([] if args.reports else [str(hwinfo_csv.HWINFO_LOG_PATH)])
+    sources = _load_sources(paths, args.reports)
+    if not sources:
+        print("[DFY][Score][ERROR] 채점할 데이터가 없습니다.")
+        return 1
+
+    ae_b = _open_bundle(args.kind, args.model_dir)
+    predictor = None
+    if args.kind == "ae" and not args.no_lstm:
+        try:
+            predictor = LoadPredictor(bundle=_open_bundle("lstm", args.model_dir))
+        except Exception as e:
+            print(f"[DFY][Score][WARN] LSTM 모델을 열 수 없어 예측 채점은 생략합니다: {e}")
+    warn = args.warn if args.warn is not None else float(ae_b.thresholds["warn_threshold"])
+    critical = args.critical if args.critical is not None else float(ae_b.thresholds["critical_threshold"])
+
+    results = []
+    per_row: Dict[str, List[np.ndarray]] = {}
+    t0 = time.perf_counter()
+    for name, X in sources:
+        arrays, events = score_series(X, ae_b, predictor, warn, critical, args.batch_rows)
+        summary = summarize(arrays, events, warn, critical)
+        results.append({"source": name, "summary": summary, "events": events})
+        for k, v in arrays.items():
+            per_row.setdefault(k, []).append(v)
+        print(
+            f"[DFY][Score] {name}: rows={summary['rows']}, WARN={summary['warn_events']}, "
+            f"CRITICAL={summary['critical_events']}, p99={summary.get('score_p99', float('nan')):.4f}"
+        )
+    elapsed = time.perf_counter() - t0
+    total = sum(r["summary"]["rows"] for r in results)
+    print(f"[DFY][Score] {total} 행 채점 완료 ({elapsed:.2f}s, {total / max(elapsed, 1e-9):,.0f} 행/s)")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        lengths = [r["summary"]["rows"] for r in results]
+        np.savez_compressed(
+            out.with_suffix(".npz"),
+            source_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            **{k: np.concatenate(v) for k, v in per_row.items()},
+        )
+        with out.with_suffix(".json").open("w", encoding="utf-8") as f:
+            json.dump(
+                {"kind": args.kind, "feature_keys": FEATURE_KEYS, "sources": results},
+                f, indent=2, ensure_ascii=False,
+            )
+        print(f"[DFY][Score] 저장: {out.with_suffix('.npz')}, {out.with_suffix('.json')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
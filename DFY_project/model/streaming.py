@@ -0,0 +1,283 @@
+# model/streaming.py
+import math
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+
+from model import feature_cache
+from model.hwinfo_csv import resolve_sources  # noqa: F401  (torch 없는 모듈로 이동, 예전 import 경로 유지)
+from model.dataset import FEATURE_KEYS, target_offsets, window_starts
+
+# 한 번에 메모리로 올리는 행 수 (chunk 하나 = 행 수 x 피처 수 x 4바이트)
+DEFAULT_CHUNK_ROWS = 65536
+
+# 학습 입력 경로 자리에 이 이름을 주면 앱이 직접 기록한 영구 기록(data/history)을 쓴다
+HISTORY_SOURCE = "history"
+
+
+def load_feature_sources(paths, min_rows: int = 1, tag: str = "DFY") -> List[np.ndarray]:
+    """
+    학습 입력을 (n, len(FEATURE_KEYS)) 피처 행렬 목록으로 연다.
+
+    - HISTORY_SOURCE("history"): engine.history_store 세그먼트, 연속 기록 구간마다 하나
+      (HWiNFO 로그를 따로 내보내지 않아도 앱이 쌓아 둔 기록으로 학습할 수 있다)
+    - 그 밖의 경로 / 리스트 / glob: HWiNFO CSV, feature_cache(mmap)로 연다. 읽지 못한 파일은 건너뛴다
+    min_rows 보다 짧은 행렬은 뺀다.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    sources: List[np.ndarray] = []
+    for p in paths or []:
+        if str(p) == HISTORY_SOURCE:
+            from engine import history_store  # 앱 기록을 쓸 때만 필요
+
+            runs = history_store.load_feature_runs(min_rows=min_rows)
+            print(f"[DFY][{tag}] 영구 기록: 구간 {len(runs)}개, {sum(r.shape[0] for r in runs)}행")
+            sources.extend(runs)
+            continue
+        for path in resolve_sources(p):
+            try:
+                X = feature_cache.load_csv_features(path)
+            except Exception as e:
+                print(f"[DFY][{tag}][WARN] CSV 로드 실패, 건너뜀: {path} ({e})")
+                continue
+            if X.shape[0] >= min_rows:
+                sources.append(X)
+    return sources
+
+
+# ---------------------------------------------------------------------------
+# chunk 단위 평균 / 분산 (Welford + Chan 병합)
+# ---------------------------------------------------------------------------
+
+class RunningMoments:
+    """
+    (n, F) chunk 를 여러 번 넣어서 컬럼별 평균 / 분산을 구한다.
+    chunk 안은 NumPy 로 한 번에 계산하고, chunk 끼리는 Chan 병렬 병합으로 합친다.
+    """
+
+    def __init__(self, num_columns: int) -> None:
+        self.count = 0
+        self.mean = np.zeros(num_columns, dtype=np.float64)
+        self._m2 = np.zeros(num_columns, dtype=np.float64)
+
+    def update(self, chunk: np.ndarray) -> None:
+        c = np.asarray(chunk, dtype=np.float64)
+        if c.ndim == 1:
+            c = c[:, None]
+        n_b = c.shape[0]
+        if n_b == 0:
+            return
+        mean_b = c.mean(axis=0)
+        m2_b = ((c - mean_b) ** 2).sum(axis=0)
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self._m2 = self._m2 + m2_b + delta * delta * (self.count * n_b / n)
+        self.count = n
+
+    def var(self, ddof: int = 0) -> np.ndarray:
+        if self.count - ddof <= 0:
+            return np.zeros_like(self.mean)
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        return np.sqrt(self.var(ddof))
+
+
+def _chunk_ranges(sources: Sequence[np.ndarray], chunk_rows: int) -> List[Tuple[int, int, int]]:
+    """(source 번호, 시작 행, 끝 행) 목록."""
+    ranges = []
+    for si, src in enumerate(sources):
+        n = src.shape[0]
+        for a in range(0, n, chunk_rows):
+            ranges.append((si, a, min(a + chunk_rows, n)))
+    return ranges
+
+
+def feature_moments(
+    sources: Sequence[np.ndarray], chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> RunningMoments:
+    """
+    1차 패스: 여러 (N, F) 행렬(보통 feature_cache 의 mmap)을 chunk 씩 읽어 평균 / 분산을 구한다.
+    한 번에 chunk_rows 행만 메모리에 올라온다.
+    """
+    moments = RunningMoments(sources[0].shape[1] if sources else len(FEATURE_KEYS))
+    for si, a, b in _chunk_ranges(sources, chunk_rows):
+        moments.update(sources[si][a:b])
+    return moments
+
+
+# ---------------------------------------------------------------------------
+# IterableDataset: 디스크(mmap)의 chunk 를 섞어서 batch 로 흘려보냄
+# ---------------------------------------------------------------------------
+
+class _ChunkedBase(IterableDataset):
+    """
+    공통 동작:
+    - 매 epoch 마다 chunk 순서를 섞고, chunk 하나를 메모리로 올려 그 안에서 다시 섞는다
+    - DataLoader worker 가 여러 개면 chunk 를 worker 별로 나눠 맡는다
+    - batch 단위 텐서를 바로 내보내므로 DataLoader(batch_size=None) 로 쓴다
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[np.ndarray],
+        batch_size: int,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        shuffle: bool = True,
+        seed: int = 0,
+    ) -> None:
+        super().__init__()
+        self.sources = list(sources)
+        self.batch_size = int(batch_size)
+        self.chunk_rows = int(chunk_rows)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """epoch 마다 다른 순서로 섞이도록 학습 루프에서 호출."""
+        self.epoch = epoch
+
+    def _my_ranges(self) -> Tuple[List[Tuple[int, int, int]], np.random.Generator]:
+        ranges = _chunk_ranges(self.sources, self.chunk_rows)
+        rng = np.random.default_rng(self.seed + self.epoch)
+        if self.shuffle:
+            order = rng.permutation(len(ranges))
+            ranges = [ranges[i] for i in order]
+        info = get_worker_info()
+        if info is not None:
+            ranges = ranges[info.id :: info.num_workers]
+            rng = np.random.default_rng((self.seed + self.epoch) * 1000 + info.id)
+        return ranges, rng
+
+    def _order(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.permutation(n) if self.shuffle else np.arange(n)
+
+
+class ChunkedRowDataset(_ChunkedBase):
+    """
+    AE 학습용: 한 시점 피처 벡터를 (x - mean) / std 로 정규화한 (B, F) batch.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[np.ndarray],
+        mean: np.ndarray,
+        std: np.ndarray,
+        batch_size: int,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        shuffle: bool = True,
+        seed: int = 0,
+    ) -> None:
+        super().__init__(sources, batch_size, chunk_rows, shuffle, seed)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+
+    def num_rows(self) -> int:
+        return sum(s.shape[0] for s in self.sources)
+
+    def __len__(self) -> int:
+        # batch 수 (chunk 경계에서 batch 가 잘리므로 위쪽 근사)
+        return sum(math.ceil((b - a) / self.batch_size) for _, a, b in _chunk_ranges(self.sources, self.chunk_rows))
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        ranges, rng = self._my_ranges()
+        for si, a, b in ranges:
+            block = (np.asarray(self.sources[si][a:b], dtype=np.float32) - self.mean) / self.std
+            order = self._order(block.shape[0], rng)
+            for i in range(0, block.shape[0], self.batch_size):
+                yield torch.from_numpy(block[order[i : i + self.batch_size]])
+
+
+class ChunkedWindowDataset(_ChunkedBase):
+    """
+    LSTM 학습용: (x_seq (B, seq_len, F), target (B, H*T)) batch (target 구성은 LoadDataset 과 같음).
+    chunk 는 뒤로 seq_len + horizon 행을 더 읽어서, chunk 안에서 시작하는 윈도우가 끊기지 않게 한다.
+    cpu 가 없는 시점이 섞인 윈도우는 LoadDataset 과 같은 규칙으로 제외.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[np.ndarray],
+        seq_len: int,
+        batch_size: int,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        shuffle: bool = True,
+        seed: int = 0,
+        horizons: Sequence[int] = (1,),
+        targets: Sequence[str] = ("cpu",),
+    ) -> None:
+        super().__init__(sources, batch_size, chunk_rows, shuffle, seed)
+        self.seq_len = int(seq_len)
+        self.horizon = max(int(h) for h in horizons)
+        self._target_rows, self._target_cols = target_offsets(self.seq_len, horizons, targets)
+        self._offsets = np.arange(self.seq_len + self.horizon)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        ranges, rng = self._my_ranges()
+        for si, a, b in ranges:
+            src = self.sources[si]
+            block = np.asarray(src[a : min(b + self.seq_len + self.horizon, src.shape[0])], dtype=np.float32)
+            starts = window_starts(block, self.seq_len, self.horizon)
+            starts = starts[starts < b - a]
+            if starts.size == 0:
+                continue
+            block = np.nan_to_num(block, nan=0.0)
+            starts = starts[self._order(starts.size, rng)]
+            for i in range(0, starts.size, self.batch_size):
+                win = block[starts[i : i + self.batch_size, None] + self._offsets]   # (B, seq_len+horizon, F)
+                x = torch.from_numpy(np.ascontiguousarray(win[:, : self.seq_len]))
+                y = torch.from_numpy(win[:, self._target_rows, self._target_cols].reshape(win.shape[0], -1))
+                yield x, y
+
+
+class ChunkedSequenceDataset(_ChunkedBase):
+    """
+    윈도우 AE 학습용: (x - mean) / std 로 정규화한 연속 span 행 윈도우 (B, span, F) batch.
+    chunk 는 뒤로 span-1 행을 더 읽어서, chunk 안에서 시작하는 윈도우가 끊기지 않게 한다.
+    stride 행마다 하나씩 시작 위치를 잡는다 (1 이면 모든 위치).
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[np.ndarray],
+        mean: np.ndarray,
+        std: np.ndarray,
+        span: int,
+        batch_size: int,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        shuffle: bool = True,
+        seed: int = 0,
+        stride: int = 1,
+    ) -> None:
+        super().__init__(sources, batch_size, chunk_rows, shuffle, seed)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.span = int(span)
+        self.stride = max(1, int(stride))
+        self._offsets = np.arange(self.span)
+
+    def num_windows(self) -> int:
+        return sum(len(range(0, max(s.shape[0] - self.span + 1, 0), self.stride)) for s in self.sources)
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        ranges, rng = self._my_ranges()
+        for si, a, b in ranges:
+            src = self.sources[si]
+            block = np.asarray(src[a : min(b + self.span - 1, src.shape[0])], dtype=np.float32)
+            # 원본 기준으로 stride 간격이 되도록 chunk 안의 첫 시작 위치를 맞춘다
+            first = (-a) % self.stride
+            starts = np.arange(first, min(b - a, block.shape[0] - self.span + 1), self.stride)
+            if starts.size == 0:
+                continue
+            block = (block - self.mean) / self.std
+            starts = starts[self._order(starts.size, rng)]
+            for i in range(0, starts.size, self.batch_size):
+                yield torch.from_numpy(block[starts[i : i + self.batch_size, None] + self._offsets])
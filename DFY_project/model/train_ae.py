@@ -1,18 +1,38 @@
 # model/train_ae.py
-import csv
-import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
 import torch
 from torch import nn
 from torch.utils.data import TensorDataset, DataLoader
-from model.ae_model import LoadAutoencoder
+from model.ae_model import LoadAutoencoder, LoadSequenceAutoencoder
+from model import bundle, feature_cache, hwinfo_csv
+from model.streaming import (
+    DEFAULT_CHUNK_ROWS,
+    ChunkedRowDataset,
+    ChunkedSequenceDataset,
+    RunningMoments,
+    feature_moments,
+    load_feature_sources,
+)
 
 # 기존 LSTM/Predictor와 동일한 피처 순서 사용
 from model.dataset import FEATURE_KEYS  # ["cpu","ram","gpu","gpu_temp","disk_read","disk_write","net_upload","net_download"]
 
 # HWiNFO 로그 경로 (collector에서 쓰는 것과 맞춰 주세요)
-HWINF0_LOG_PATH = Path("data/daily/time_log.CSV")
+HWINF0_LOG_PATH = hwinfo_csv.HWINFO_LOG_PATH
+
+# 학습 진행 콜백: epoch 이 끝날 때마다 {"epoch", "epochs", "loss"} dict 로 호출
+ProgressFn = Callable[[Dict[str, Any]], None]
+# 중단 확인 콜백: True 를 돌려주면 다음 batch 전에 학습을 멈춘다 (저장하지 않음)
+StopFn = Callable[[], bool]
+
+# model_type: "point" = 한 시점 벡터 AE (LoadAutoencoder),
+#             "sequence" = 윈도우 AE (LoadSequenceAutoencoder, 진동 / 느린 상승 같은 시간 패턴까지 봄)
+MODEL_TYPES = ("point", "sequence")
+# 윈도우 AE 구조: 점수는 마지막 SEQ_LEN 시점 평균, conv kernel 은 SEQ_KERNEL 시점
+SEQ_LEN = 30
+SEQ_KERNEL = 5
 
 
 # ---------------------------------------------------------------------------
@@ -49,134 +69,189 @@ class SimpleAE(nn.Module):
 # HWiNFO CSV → 학습용 피처 행렬로 변환
 # ---------------------------------------------------------------------------
 
-def _find_column(fieldnames: List[str], patterns: List[str]) -> Optional[str]:
-    """여러 후보 문자열 중에서 header 안에 들어있는 이름을 찾아서 반환."""
-    for p in patterns:
-        for name in fieldnames:
-            if p in name:
-                return name
-    return None
-
-
-def _build_column_map(fieldnames: List[str]) -> Dict[str, str]:
-    """
-    HWiNFO header에서 우리가 쓸 컬럼 이름들을 찾아 매핑한다.
-    (이름이 약간 달라도 패턴 포함 여부로 찾도록 설계)
-    """
-    colmap: Dict[str, str] = {}
-
-    colmap["cpu"] = _find_column(fieldnames, ["총 CPU 사용량", "Total CPU Usage"])
-    colmap["ram"] = _find_column(fieldnames, ["Physical Memory Load", "메모리 사용량"])
-    colmap["gpu"] = _find_column(fieldnames, ["GPU 활용률", "GPU Core Usage", "GPU Usage"])
-    colmap["gpu_temp"] = _find_column(fieldnames, ["GPU 온도", "GPU Temperature"])
-    colmap["disk_read"] = _find_column(fieldnames, ["Read Rate [MB/s]", "Read Rate [KB/s]"])
-    colmap["disk_write"] = _find_column(fieldnames, ["Write Rate [MB/s]", "Write Rate [KB/s]"])
-    colmap["net_download"] = _find_column(fieldnames, ["Current DL rate", "Download Rate"])
-    colmap["net_upload"] = _find_column(fieldnames, ["Current UP rate", "Upload Rate"])
-
-    return colmap
-
-
-def _parse_float(raw: str) -> Optional[float]:
-    """문자열을 float로 바꾸되, 실패하면 None."""
-    if raw is None:
-        return None
-    raw = raw.strip()
-    if raw == "":
-        return None
-    # , 를 . 로 바꿔서 유럽식 소수점도 방어
-    raw = raw.replace(",", ".")
-    try:
-        return float(raw)
-    except ValueError:
-        return None
-
 def load_hwinfo_features_from_csv(csv_path: Path) -> torch.Tensor:
     """
     HWiNFO time_log.CSV에서 FEATURE_KEYS 순서대로 값만 뽑아
     (num_samples, feature_dim) 텐서를 만들어 반환.
 
-    - 파일 인코딩이 깨져 있어도 상관없이, utf-8-sig + errors="ignore" 로 강제 디코딩.
-    - 우리는 숫자 컬럼만 사용하므로, 본문 중간의 한글 텍스트가 깨지더라도 문제 없음.
+    - 파싱은 model.hwinfo_csv 가 담당 (필요한 컬럼만 projection, chunk 단위 벡터 변환)
+    - cpu / ram 이 비어 있는 행은 버리고, 나머지 빈 값은 0 으로 채운다.
+    - 파싱 결과는 model.feature_cache 에 저장되어, CSV 가 바뀌지 않았으면 다시 파싱하지 않는다.
     """
-    if not csv_path.is_absolute():
-        root = Path(__file__).resolve().parents[1]
-        csv_path = root / csv_path
-
-    if not csv_path.exists():
-        raise FileNotFoundError(f"HWiNFO 로그 파일을 찾을 수 없습니다: {csv_path}")
-
-    print(f"[DFY][AE] HWiNFO CSV 읽는 중: {csv_path}")
-
-    features_list: List[List[float]] = []
-
-    # ✅ 인코딩이 섞여 있어도 강제로 읽는다 (잘못된 바이트는 버림)
-    with csv_path.open("r", encoding="utf-8-sig", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
-            raise RuntimeError("CSV header(fieldnames)를 읽지 못했습니다.")
-
-        colmap = _build_column_map(reader.fieldnames)
-        print("[DFY][AE] Column mapping:")
-        for k in FEATURE_KEYS:
-            print(f"   {k:<12} <- {colmap.get(k)}")
-
-        for row in reader:
-            vec: List[float] = []
-            skip_row = False
-            for key in FEATURE_KEYS:
-                colname = colmap.get(key)
-                if not colname:
-                    # 해당 피처를 못 찾으면 그 자리는 0으로 채움
-                    val = 0.0
-                else:
-                    val = _parse_float(row.get(colname))
-                    if val is None:
-                        # CPU / RAM 같이 핵심 피처가 None이면 행 자체를 버리는 게 낫다
-                        if key in ("cpu", "ram"):
-                            skip_row = True
-                            break
-                        val = 0.0
-
-                    # 네트워크는 KB/s → MB/s 변환 (헤더에 KB/s 라벨이 있는 경우)
-                    if key in ("net_download", "net_upload") and "KB/s" in colname:
-                        val /= 1024.0
-
-                    # 디스크도 KB/s 인 경우가 있으면 MB/s 로 변환
-                    if key in ("disk_read", "disk_write") and "KB/s" in colname:
-                        val /= 1024.0
-
-                vec.append(float(val))
-
-            if skip_row:
-                continue
-            features_list.append(vec)
-
-    if not features_list:
+    X = feature_cache.load_csv_features(csv_path)
+    if X.shape[0] == 0:
         raise RuntimeError("CSV에서 유효한 피처 행을 하나도 찾지 못했습니다.")
 
-    X = torch.tensor(features_list, dtype=torch.float32)
     print(f"[DFY][AE] 로드된 샘플 수: {X.shape[0]}, feature_dim: {X.shape[1]}")
-    return X
+    # 캐시는 읽기 전용 mmap 이므로 학습용 텐서는 복사본으로 만든다
+    return torch.from_numpy(np.array(X))
 
 # ---------------------------------------------------------------------------
 # 학습 메인 루틴
 # ---------------------------------------------------------------------------
 
+def _build_model(feature_dim: int, device: str, model_type: str = "point") -> nn.Module:
+    # AE 모델 생성 (ae_model.LoadAutoencoder / LoadSequenceAutoencoder 사용)
+    if model_type == "sequence":
+        return LoadSequenceAutoencoder(
+            input_dim=feature_dim,
+            hidden_dim=32,
+            code_dim=8,
+            kernel_size=SEQ_KERNEL,
+            seq_len=SEQ_LEN,
+        ).to(device)
+    return LoadAutoencoder(
+        input_dim=feature_dim,
+        hidden_dim=32,
+        code_dim=8,
+    ).to(device)
+
+
+def _window_error_moments(model: LoadSequenceAutoencoder, dataset: ChunkedSequenceDataset, device: str) -> RunningMoments:
+    """윈도우 점수(model.reconstruction_error) 분포를 batch 단위로 누적."""
+    err_moments = RunningMoments(1)
+    model.eval()
+    with torch.no_grad():
+        for batch_x in DataLoader(dataset, batch_size=None):
+            errors = model.reconstruction_error(batch_x.to(device), reduction="none")
+            err_moments.update(errors.cpu().numpy())
+    return err_moments
+
+
+def _fit(
+    model: nn.Module,
+    dataloader: DataLoader,
+    epochs: int,
+    lr: float,
+    device: str,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+) -> bool:
+    """
+    재구성 MSE(model.reconstruction_error) 로 학습. dataloader 는 (batch_x,) 튜플(TensorDataset) 또는
+    batch 텐서(streaming.ChunkedRowDataset / ChunkedSequenceDataset)를 내보낸다.
+    should_stop 으로 중단되면 False 를 반환한다.
+    """
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    dataset = dataloader.dataset
+
+    model.train()
+    for epoch in range(1, epochs + 1):
+        if hasattr(dataset, "set_epoch"):
+            dataset.set_epoch(epoch)
+        epoch_loss = 0.0
+        n = 0
+        for batch in dataloader:
+            if should_stop is not None and should_stop():
+                print(f"[DFY][AE] 학습이 중단되었습니다 (epoch {epoch}/{epochs}).")
+                return False
+            batch_x = batch[0] if isinstance(batch, (list, tuple)) else batch
+            batch_x = batch_x.to(device)
+
+            optimizer.zero_grad()
+            loss = model.reconstruction_error(batch_x)
+            loss.backward()
+            optimizer.step()
+
+            batch_size_actual = batch_x.size(0)
+            epoch_loss += loss.item() * batch_size_actual
+            n += batch_size_actual
+
+        avg_loss = epoch_loss / max(n, 1)
+        print(f"[DFY][AE][Epoch {epoch}/{epochs}] MSE: {avg_loss:.6f}")
+        if progress is not None:
+            progress({"epoch": epoch, "epochs": epochs, "loss": avg_loss})
+    return True
+
+
+def _save_model_and_thresholds(
+    model: nn.Module,
+    model_dir: Path,
+    feat_mean,
+    feat_std,
+    err_mean: float,
+    err_std: float,
+    num_samples: int,
+) -> Dict[str, Any]:
+    """
+    가중치와 재구성 오차 기반 WARN / CRITICAL 임계값, 표준화 통계, 구조 파라미터를
+    번들 파일 하나(model_autoencoder.dfym)로 저장하고, 임계값 dict 를 반환.
+    """
+    if err_std < 1e-9:
+        err_std = 1e-9
+
+    warn_threshold = err_mean + 2.0 * err_std
+    critical_threshold = err_mean + 4.0 * err_std
+
+    thresholds = {
+        "feature_keys": FEATURE_KEYS,
+        "feature_mean": [float(v) for v in feat_mean],
+        "feature_std": [float(v) for v in feat_std],
+        "error_mean": err_mean,
+        "error_std": err_std,
+        "warn_threshold": warn_threshold,
+        "critical_threshold": critical_threshold,
+        "num_samples": int(num_samples),
+    }
+
+    path = bundle.write_bundle(
+        model_dir / bundle.BUNDLE_NAMES["ae"],
+        "ae",
+        bundle.state_dict_arrays(model.state_dict()),
+        arch=model.arch(),
+        feature_keys=FEATURE_KEYS,
+        feature_mean=thresholds["feature_mean"],
+        feature_std=thresholds["feature_std"],
+        thresholds={k: thresholds[k] for k in ("error_mean", "error_std", "warn_threshold", "critical_threshold")},
+        metadata={"num_samples": int(num_samples)},
+    )
+
+    print(f"[DFY][AE] Autoencoder 모델 / Thresholds 저장 ({model.arch().get('type', 'point')}):")
+    print(f"   mean error      : {err_mean:.6f}")
+    print(f"   warn threshold  : {warn_threshold:.6f}")
+    print(f"   critical thres. : {critical_threshold:.6f}")
+    print(f"   file            : {path}")
+    print("[DFY][AE] Autoencoder 학습이 완료되었습니다.")
+    return thresholds
+
+
 def train_ae(
-    csv_rel_path: Path | str = HWINF0_LOG_PATH,
+    csv_rel_path: Path | str | List[Path | str] = HWINF0_LOG_PATH,
     batch_size: int = 256,
     epochs: int = 15,
     lr: float = 1e-3,
-):
+    streaming: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    model_dir: Path | str | None = None,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+    model_type: str = "point",
+    stride: int = 1,
+) -> Optional[Dict[str, Any]]:
     """
     HWiNFO CSV(time_log.CSV)에서 직접 피처를 읽어와 Autoencoder를 학습한다.
+    - model_type="sequence" 면 윈도우 AE 를 학습한다 (연속 span 행 윈도우, stride 행 간격).
+      임계값도 윈도우 점수(마지막 SEQ_LEN 시점 평균 오차) 분포로 잡는다.
     - Reconstruction Error 분포로부터 WARN / CRITICAL 임계값도 계산하여 저장한다.
+    - streaming=True 면 RAM 보다 큰 로그도 학습할 수 있는 out-of-core 모드로 동작한다
+      (_train_ae_streaming 참고). 이때 csv_rel_path 로 여러 로그(리스트 / glob 패턴)를 줄 수 있고,
+      "history"(model.streaming.HISTORY_SOURCE)를 넣으면 앱이 기록한 data/history 도 학습에 쓴다.
+    - model_dir 를 주면 internal/ 대신 그 폴더에 저장한다 (engine.training_jobs 가 임시 폴더에
+      학습시킨 뒤 한 번에 교체할 때 사용).
+    - progress / should_stop 은 백그라운드 학습용 진행 보고 / 취소 훅.
+    성공하면 저장한 임계값 dict, 데이터 부족 / 로드 실패 / 취소면 None 을 반환한다.
     """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"알 수 없는 AE model_type: {model_type} ({', '.join(MODEL_TYPES)})")
     root = Path(__file__).resolve().parents[1]
-    model_dir = root / "internal"
+    model_dir = Path(model_dir) if model_dir is not None else root / "internal"
     model_dir.mkdir(parents=True, exist_ok=True)
 
+    if streaming:
+        return _train_ae_streaming(
+            csv_rel_path, model_dir, batch_size, epochs, lr, chunk_rows, progress, should_stop, model_type, stride
+        )
+
     # 1) 데이터 로드
     try:
         X = load_hwinfo_features_from_csv(Path(csv_rel_path))
@@ -197,49 +272,23 @@ def train_ae(
     feat_std = X.std(dim=0)
     feat_std_clamped = torch.clamp(feat_std, min=1e-6)
 
+    if model_type == "sequence":
+        return _train_sequence(
+            [X.numpy()], model_dir, feat_mean.numpy(), feat_std_clamped.numpy(), num_samples,
+            batch_size, epochs, lr, DEFAULT_CHUNK_ROWS, stride, device, progress, should_stop,
+        )
+
     X_norm = (X - feat_mean) / feat_std_clamped
 
     dataset = TensorDataset(X_norm)
     dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
 
-    # 3) 모델 / 옵티마이저 설정
-        # AE 모델 생성 (ae_model.LoadAutoencoder 사용)
-    model = LoadAutoencoder(
-        input_dim=feature_dim,
-        hidden_dim=32,
-        code_dim=8,
-    ).to(device)
-
-    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
-    criterion = nn.MSELoss()
-
-    # 4) 학습 루프
-    model.train()
-    for epoch in range(1, epochs + 1):
-        epoch_loss = 0.0
-        n = 0
-        for (batch_x,) in dataloader:
-            batch_x = batch_x.to(device)
-
-            optimizer.zero_grad()
-            recon = model(batch_x)
-            loss = criterion(recon, batch_x)
-            loss.backward()
-            optimizer.step()
-
-            batch_size_actual = batch_x.size(0)
-            epoch_loss += loss.item() * batch_size_actual
-            n += batch_size_actual
-
-        avg_loss = epoch_loss / max(n, 1)
-        print(f"[DFY][AE][Epoch {epoch}/{epochs}] MSE: {avg_loss:.6f}")
-
-    # 5) 모델 저장 (state_dict)
-    model_path = model_dir / "model_autoencoder.pth"
-    torch.save(model.state_dict(), model_path)
-    print(f"[DFY][AE] Autoencoder 모델 저장: {model_path}")
+    # 3) 모델 생성 / 4) 학습 루프
+    model = _build_model(feature_dim, device)
+    if not _fit(model, dataloader, epochs, lr, device, progress, should_stop):
+        return None
 
-    # 6) 학습 데이터에 대한 Reconstruction Error 분포 계산 → 임계값 설정
+    # 5) 학습 데이터에 대한 Reconstruction Error 분포 계산 → 임계값 설정
     model.eval()
     with torch.no_grad():
         X_norm_device = X_norm.to(device)
@@ -249,34 +298,137 @@ def train_ae(
 
     err_mean = float(errors.mean().item())
     err_std = float(errors.std(unbiased=False).item())
-    if err_std < 1e-9:
-        err_std = 1e-9
 
-    warn_threshold = err_mean + 2.0 * err_std
-    critical_threshold = err_mean + 4.0 * err_std
+    # 6) 모델 / 임계값 저장
+    return _save_model_and_thresholds(
+        model, model_dir, feat_mean.tolist(), feat_std_clamped.tolist(), err_mean, err_std, num_samples
+    )
+
+
+def _train_ae_streaming(
+    csv_paths,
+    model_dir: Path,
+    batch_size: int,
+    epochs: int,
+    lr: float,
+    chunk_rows: int,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+    model_type: str = "point",
+    stride: int = 1,
+) -> Optional[Dict[str, Any]]:
+    """
+    out-of-core 학습.
+
+    - 각 로그는 feature_cache 로 한 번만 파싱되어 .npy 로 저장되고, 이후에는 mmap 으로만 읽는다
+      ("history" 소스는 history_store 세그먼트를 연속 기록 구간별로 읽는다)
+      (파싱도 chunk 단위로 써 내려가므로 원본 CSV 를 통째로 메모리에 올리지 않는다)
+    - 1차 패스: chunk 단위 Welford(Chan 병합)로 피처 평균 / 표준편차
+    - 학습: ChunkedRowDataset 이 chunk 순서와 chunk 안의 행을 섞어 batch 를 흘려보낸다
+    - 마지막 패스: 재구성 오차 평균 / 표준편차도 chunk 단위로 누적
+    어느 단계에서도 메모리에 올라오는 것은 chunk_rows 행 정도뿐이다.
+    """
+    sources = load_feature_sources(csv_paths, min_rows=1, tag="AE")
 
-    thresholds = {
-        "feature_keys": FEATURE_KEYS,
-        "feature_mean": feat_mean.tolist(),
-        "feature_std": feat_std_clamped.tolist(),
-        "error_mean": err_mean,
-        "error_std": err_std,
-        "warn_threshold": warn_threshold,
-        "critical_threshold": critical_threshold,
-        "num_samples": int(num_samples),
-    }
+    num_samples = sum(x.shape[0] for x in sources)
+    if num_samples < 100:
+        print("[DFY][AE][WARN] 샘플 수가 너무 적어 Autoencoder 학습이 어렵습니다.")
+        return
+    feature_dim = sources[0].shape[1]
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(
+        f"[DFY][AE] Streaming training on {device} | files={len(sources)}, "
+        f"samples={num_samples}, dim={feature_dim}, chunk={chunk_rows}"
+    )
+
+    # 1) 표준화 통계 (chunk 단위)
+    moments = feature_moments(sources, chunk_rows)
+    feat_mean = moments.mean.astype(np.float32)
+    feat_std = np.maximum(moments.std(ddof=1), 1e-6).astype(np.float32)
+
+    if model_type == "sequence":
+        return _train_sequence(
+            sources, model_dir, feat_mean, feat_std, num_samples,
+            batch_size, epochs, lr, chunk_rows, stride, device, progress, should_stop,
+        )
 
-    th_path = model_dir / "ae_thresholds.json"
-    with th_path.open("w", encoding="utf-8") as f:
-        json.dump(thresholds, f, indent=2, ensure_ascii=False)
+    # 2) 학습
+    dataset = ChunkedRowDataset(sources, feat_mean, feat_std, batch_size, chunk_rows, shuffle=True)
+    model = _build_model(feature_dim, device)
+    if not _fit(model, DataLoader(dataset, batch_size=None), epochs, lr, device, progress, should_stop):
+        return None
 
-    print("[DFY][AE] Thresholds 저장:")
-    print(f"   mean error      : {err_mean:.6f}")
-    print(f"   warn threshold  : {warn_threshold:.6f}")
-    print(f"   critical thres. : {critical_threshold:.6f}")
-    print(f"   file            : {th_path}")
-    print("[DFY][AE] Autoencoder 학습이 완료되었습니다.")
+    # 3) 재구성 오차 분포 (chunk 단위 누적)
+    eval_set = ChunkedRowDataset(sources, feat_mean, feat_std, 4096, chunk_rows, shuffle=False)
+    err_moments = RunningMoments(1)
+    model.eval()
+    with torch.no_grad():
+        for batch_x in DataLoader(eval_set, batch_size=None):
+            batch_x = batch_x.to(device)
+            errors = ((model(batch_x) - batch_x) ** 2).mean(dim=1)
+            err_moments.update(errors.cpu().numpy())
+
+    return _save_model_and_thresholds(
+        model,
+        model_dir,
+        feat_mean,
+        feat_std,
+        float(err_moments.mean[0]),
+        float(err_moments.std()[0]),
+        num_samples,
+    )
+
+
+
+def _train_sequence(
+    sources,
+    model_dir: Path,
+    feat_mean: np.ndarray,
+    feat_std: np.ndarray,
+    num_samples: int,
+    batch_size: int,
+    epochs: int,
+    lr: float,
+    chunk_rows: int,
+    stride: int,
+    device: str,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    윈도우 AE 학습 (메모리 / 스트리밍 모드 공통).
+    sources 는 원래 단위 (N, F) 행렬들이고, 윈도우는 ChunkedSequenceDataset 이 chunk 단위로 잘라 정규화한다.
+    """
+    model = _build_model(sources[0].shape[1], device, "sequence")
+    dataset = ChunkedSequenceDataset(
+        sources, feat_mean, feat_std, model.span, batch_size, chunk_rows, shuffle=True, stride=stride
+    )
+    if dataset.num_windows() == 0:
+        print(f"[DFY][AE][WARN] 연속 {model.span}행 윈도우를 만들 수 없어 윈도우 AE 학습을 건너뜁니다.")
+        return None
+    print(f"[DFY][AE] Sequence AE | windows={dataset.num_windows()}, span={model.span}, stride={dataset.stride}")
+
+    if not _fit(model, DataLoader(dataset, batch_size=None), epochs, lr, device, progress, should_stop):
+        return None
+
+    eval_set = ChunkedSequenceDataset(
+        sources, feat_mean, feat_std, model.span, 4096, chunk_rows, shuffle=False, stride=stride
+    )
+    err_moments = _window_error_moments(model, eval_set, device)
+    return _save_model_and_thresholds(
+        model,
+        model_dir,
+        feat_mean,
+        feat_std,
+        float(err_moments.mean[0]),
+        float(err_moments.std()[0]),
+        num_samples,
+    )
 
 
 if __name__ == "__main__":
-    train_ae()
+    import sys
+
+    # python -m model.train_ae [point|sequence]
+    train_ae(model_type=sys.argv[1] if len(sys.argv) > 1 else "point")
@@ -1,12 +1,64 @@
 # model/train_lstm.py
 import os
 from pathlib import Path
+from typing import Optional, Sequence
 
+import numpy as np
 import torch
 from torch import nn, optim
+from torch.utils.data import DataLoader
 
-from model.dataset import create_dataloader
+from model import bundle
+from model.dataset import FEATURE_KEYS, create_dataloader, load_report_series
 from model.lstm_model import LoadLSTM
+from model.train_ae import ProgressFn, StopFn
+from model.streaming import DEFAULT_CHUNK_ROWS, ChunkedWindowDataset, RunningMoments, load_feature_sources
+
+# LoadLSTM 구조 (번들 header 의 arch 로 같이 저장되어 추론 쪽에서 그대로 다시 만든다)
+LSTM_ARCH = {"input_dim": len(FEATURE_KEYS), "hidden_dim": 64, "num_layers": 2, "dropout": 0.2}
+
+# 기본 예측 대상: 모든 피처의 +1 / +10 / +60 step (sampler 1초 주기 기준 +1s / +10s / +60s)
+LSTM_HORIZONS = (1, 10, 60)
+LSTM_TARGETS = tuple(FEATURE_KEYS)
+
+
+def _streaming_dataloader(
+    daily_dir: str, csv_paths, seq_len: int, batch_size: int, chunk_rows: int, horizons, targets
+):
+    """
+    out-of-core 학습용 DataLoader.
+    daily_dir 의 report_*.json 과 csv_paths 의 HWiNFO 로그(feature_cache mmap) / "history" 영구 기록을 열고,
+    ChunkedWindowDataset 이 chunk 단위로 섞어서 (x, y) batch 를 흘려보낸다.
+    """
+    span = seq_len + max(horizons)
+    sources = [s for s in load_report_series(daily_dir) if s.shape[0] >= span]
+    sources.extend(load_feature_sources(csv_paths, min_rows=span, tag="LSTM"))
+
+    if not sources:
+        return None
+    rows = sum(s.shape[0] for s in sources)
+    print(f"[DFY][LSTM] Streaming dataset | files={len(sources)}, rows={rows}, chunk={chunk_rows}")
+    dataset = ChunkedWindowDataset(
+        sources, seq_len, batch_size, chunk_rows, shuffle=True, horizons=horizons, targets=targets
+    )
+    return DataLoader(dataset, batch_size=None)
+
+
+def _feature_stats(dataloader, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> tuple:
+    """
+    입력 / 타겟 표준화용 피처별 (평균, 표준편차), float32.
+    cpu 가 없는(NaN) 시점은 빼고 chunk 단위로 계산한다. 값이 일정한 피처는 std 를 1 로 둔다.
+    """
+    ds = dataloader.dataset
+    sources = ds.sources if isinstance(ds, ChunkedWindowDataset) else [ds.feature_matrix()]
+    moments = RunningMoments(len(FEATURE_KEYS))
+    for src in sources:
+        for a in range(0, src.shape[0], chunk_rows):
+            chunk = np.asarray(src[a : a + chunk_rows], dtype=np.float32)
+            moments.update(chunk[~np.isnan(chunk).any(axis=1)])
+    std = moments.std()
+    return moments.mean.astype(np.float32), np.where(std < 1e-6, 1.0, std).astype(np.float32)
+
 
 def train(
     daily_dir: str = "data/daily",
@@ -16,29 +68,71 @@ def train(
     lr: float = 1e-3,
     device: str | None = None,
     # 🔽 절대 경로 → 프로젝트 내부 상대 경로로 변경
-    save_path: str = "internal/model_load_lstm.pth",
-):
+    save_path: str = "internal/" + bundle.BUNDLE_NAMES["lstm"],
+    streaming: bool = False,
+    csv_paths=None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+    horizons: Sequence[int] = LSTM_HORIZONS,
+    targets: Sequence[str] = LSTM_TARGETS,
+) -> Optional[Path]:
+    """
+    LoadLSTM 학습.
+    - horizons x targets 를 한 번에 예측하는 head 로 학습한다 (기본: 8개 피처 x +1/+10/+60 step).
+      입력과 타겟은 학습 데이터의 피처별 평균 / 표준편차로 표준화하고, 그 통계는 번들에 같이 저장한다.
+    - streaming=True 면 윈도우를 메모리에 모으지 않고 디스크(mmap)의 chunk 를 섞어 가며 학습한다.
+      csv_paths 로 HWiNFO 로그(경로 / 리스트 / glob)나 "history"(앱이 기록한 data/history)를
+      학습 데이터에 더할 수 있다.
+    - progress / should_stop 은 백그라운드 학습(engine.training_jobs)용 진행 보고 / 취소 훅.
+    가중치와 구조 파라미터는 번들 파일 하나(model.bundle 형식)로 저장한다.
+    저장한 경로를 반환한다 (데이터가 없거나 취소되면 None).
+    """
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    dataloader = create_dataloader(daily_dir, seq_len, batch_size)
+    horizons = sorted({int(h) for h in horizons})
+    targets = list(targets)
+    if streaming:
+        dataloader = _streaming_dataloader(daily_dir, csv_paths, seq_len, batch_size, chunk_rows, horizons, targets)
+    else:
+        dataloader = create_dataloader(daily_dir, seq_len, batch_size, horizons=horizons, targets=targets)
     if dataloader is None:
         print("[DFY][LSTM][WARN] Dataset is empty. Check data/daily or dataset.py.")
         return
-    
-    model = LoadLSTM(input_dim=8).to(device)
+
+    feature_mean, feature_std = _feature_stats(dataloader, chunk_rows)
+    cols = [FEATURE_KEYS.index(k) for k in targets]
+    x_mean = torch.from_numpy(feature_mean).to(device)
+    x_std = torch.from_numpy(feature_std).to(device)
+    # y 는 (B, H*T) 로 horizon 마다 targets 가 반복되므로 통계도 같은 순서로 반복
+    y_mean = x_mean[cols].repeat(len(horizons))
+    y_std = x_std[cols].repeat(len(horizons))
+
+    arch = dict(LSTM_ARCH, horizons=horizons, targets=targets)
+    model = LoadLSTM(**arch).to(device)
     criterion = nn.MSELoss()
     optimizer = optim.Adam(model.parameters(), lr=lr)
 
-    print(f"[DFY] Training on {device} | samples={len(dataloader.dataset)}")
+    if streaming:
+        print(f"[DFY] Training on {device} | streaming")
+    else:
+        print(f"[DFY] Training on {device} | samples={len(dataloader.dataset)}")
 
+    epoch_loss = None
     for epoch in range(1, num_epochs + 1):
         model.train()
+        if hasattr(dataloader.dataset, "set_epoch"):
+            dataloader.dataset.set_epoch(epoch)
         running_loss = 0.0
+        seen = 0
 
         for x_batch, y_batch in dataloader:
-            x_batch = x_batch.to(device)
-            y_batch = y_batch.to(device)
+            if should_stop is not None and should_stop():
+                print(f"[DFY] 학습이 중단되었습니다 (epoch {epoch}/{num_epochs}).")
+                return None
+            x_batch = (x_batch.to(device) - x_mean) / x_std
+            y_batch = (y_batch.to(device) - y_mean) / y_std
 
             optimizer.zero_grad()
             preds = model(x_batch)
@@ -47,9 +141,12 @@ def train(
             optimizer.step()
 
             running_loss += loss.item() * x_batch.size(0)
+            seen += x_batch.size(0)
 
-        epoch_loss = running_loss / len(dataloader.dataset)
+        epoch_loss = running_loss / max(seen, 1)
         print(f"[Epoch {epoch}/{num_epochs}] MSE: {epoch_loss:.4f}")
+        if progress is not None:
+            progress({"epoch": epoch, "epochs": num_epochs, "loss": epoch_loss})
 
     root_dir = Path(__file__).resolve().parents[1]  # new_dfy 루트
     save_path = Path(save_path)
@@ -58,8 +155,18 @@ def train(
 
     save_dir = save_path.parent
     os.makedirs(save_dir, exist_ok=True)
-    torch.save(model.state_dict(), save_path)
+    bundle.write_bundle(
+        save_path,
+        "lstm",
+        bundle.state_dict_arrays(model.state_dict()),
+        arch=arch,
+        feature_keys=FEATURE_KEYS,
+        feature_mean=feature_mean,
+        feature_std=feature_std,
+        metadata={"seq_len": seq_len, "epochs": num_epochs, "final_loss": epoch_loss},
+    )
     print(f"[DFY] Model saved at {save_path}")
+    return save_path
 
 
 if __name__ == "__main__":
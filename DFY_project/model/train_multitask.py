@@ -0,0 +1,145 @@
+# model/train_multitask.py
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import torch
+from torch import nn, optim
+from torch.utils.data import DataLoader
+
+from model import bundle, hwinfo_csv
+from model.dataset import FEATURE_KEYS
+from model.multitask_model import LoadMultitaskModel
+from model.streaming import DEFAULT_CHUNK_ROWS, HISTORY_SOURCE, ChunkedWindowDataset, RunningMoments
+from model.train_ae import SEQ_KERNEL, SEQ_LEN, ProgressFn, StopFn
+from model.train_lstm import LSTM_HORIZONS, LSTM_TARGETS, _feature_stats, _streaming_dataloader
+
+# encoder / 재구성 head 는 윈도우 AE 와 같은 크기, forecast head 만 더 붙는다
+MULTITASK_ARCH = {"input_dim": len(FEATURE_KEYS), "hidden_dim": 32, "code_dim": 8, "forecast_hidden": 64}
+# 전체 loss = 재구성 MSE + FORECAST_WEIGHT * 예측 MSE (둘 다 표준화 공간)
+FORECAST_WEIGHT = 1.0
+
+
+def train_multitask(
+    csv_paths=(hwinfo_csv.HWINFO_LOG_PATH, HISTORY_SOURCE),
+    daily_dir: str = "data/daily",
+    batch_size: int = 256,
+    epochs: int = 10,
+    lr: float = 1e-3,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    model_dir: Path | str | None = None,
+    progress: Optional[ProgressFn] = None,
+    should_stop: Optional[StopFn] = None,
+    horizons: Sequence[int] = LSTM_HORIZONS,
+    targets: Sequence[str] = LSTM_TARGETS,
+    forecast_weight: float = FORECAST_WEIGHT,
+) -> Optional[Dict[str, Any]]:
+    """
+    LoadMultitaskModel 학습 (재구성 + 예측 동시 학습).
+
+    - 데이터는 LSTM 스트리밍 학습과 같은 소스 (data/daily 리포트 + HWiNFO 로그(feature_cache mmap)
+      + 앱이 기록한 data/history)
+    - 윈도우 = span(seq_len + receptive_field - 1) 행 입력 + 가장 먼 horizon 까지의 타겟
+    - 입력 / 타겟은 피처별 평균 / 표준편차로 표준화하고, 그 통계는 번들에 같이 저장한다
+    - 재구성 WARN / CRITICAL 임계값은 학습 데이터 윈도우 점수의 mean + 2σ / 4σ (train_ae 와 같음)
+    model_dir(기본 internal/)에 "multitask" 번들로 저장하고 임계값 dict 를 반환한다
+    (데이터가 없거나 취소되면 None).
+    """
+    root = Path(__file__).resolve().parents[1]
+    model_dir = Path(model_dir) if model_dir is not None else root / "internal"
+    os.makedirs(model_dir, exist_ok=True)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    horizons = sorted({int(h) for h in horizons})
+    targets = list(targets)
+    model = LoadMultitaskModel(
+        kernel_size=SEQ_KERNEL, seq_len=SEQ_LEN, horizons=horizons, targets=targets, **MULTITASK_ARCH
+    ).to(device)
+
+    dataloader = _streaming_dataloader(daily_dir, csv_paths, model.span, batch_size, chunk_rows, horizons, targets)
+    if dataloader is None:
+        print("[DFY][MT][WARN] 학습할 데이터가 없습니다. data/daily 또는 HWiNFO 로그를 확인해 주세요.")
+        return None
+
+    feature_mean, feature_std = _feature_stats(dataloader, chunk_rows)
+    cols = [FEATURE_KEYS.index(k) for k in targets]
+    x_mean = torch.from_numpy(feature_mean).to(device)
+    x_std = torch.from_numpy(feature_std).to(device)
+    # y 는 (B, H*T) 로 horizon 마다 targets 가 반복되므로 통계도 같은 순서로 반복
+    y_mean = x_mean[cols].repeat(len(horizons))
+    y_std = x_std[cols].repeat(len(horizons))
+
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    print(f"[DFY][MT] Training multitask model on {device} | span={model.span}, horizons={horizons}")
+
+    epoch_loss = None
+    for epoch in range(1, epochs + 1):
+        model.train()
+        dataloader.dataset.set_epoch(epoch)
+        running = np.zeros(2)
+        seen = 0
+        for x_batch, y_batch in dataloader:
+            if should_stop is not None and should_stop():
+                print(f"[DFY][MT] 학습이 중단되었습니다 (epoch {epoch}/{epochs}).")
+                return None
+            x_batch = (x_batch.to(device) - x_mean) / x_std
+            y_batch = (y_batch.to(device) - y_mean) / y_std
+
+            optimizer.zero_grad()
+            recon, preds = model(x_batch)
+            recon_loss = model.reconstruction_error(x_batch, recon=recon)
+            forecast_loss = criterion(preds, y_batch)
+            loss = recon_loss + forecast_weight * forecast_loss
+            loss.backward()
+            optimizer.step()
+
+            running += np.array([recon_loss.item(), forecast_loss.item()]) * x_batch.size(0)
+            seen += x_batch.size(0)
+
+        recon_avg, forecast_avg = running / max(seen, 1)
+        epoch_loss = float(recon_avg + forecast_weight * forecast_avg)
+        print(f"[DFY][MT][Epoch {epoch}/{epochs}] recon: {recon_avg:.6f}, forecast: {forecast_avg:.6f}")
+        if progress is not None:
+            progress({"epoch": epoch, "epochs": epochs, "loss": epoch_loss})
+
+    # 재구성 점수 분포 (섞지 않고 한 번 더 훑기)
+    eval_set = ChunkedWindowDataset(
+        dataloader.dataset.sources, model.span, 4096, chunk_rows, shuffle=False, horizons=horizons, targets=targets
+    )
+    err_moments = RunningMoments(1)
+    model.eval()
+    with torch.no_grad():
+        for x_batch, _ in DataLoader(eval_set, batch_size=None):
+            x_batch = (x_batch.to(device) - x_mean) / x_std
+            err_moments.update(model.reconstruction_error(x_batch, reduction="none").cpu().numpy())
+
+    err_mean = float(err_moments.mean[0])
+    err_std = max(float(err_moments.std()[0]), 1e-9)
+    thresholds = {
+        "error_mean": err_mean,
+        "error_std": err_std,
+        "warn_threshold": err_mean + 2.0 * err_std,
+        "critical_threshold": err_mean + 4.0 * err_std,
+    }
+    num_samples = int(err_moments.count)
+
+    path = bundle.write_bundle(
+        model_dir / bundle.BUNDLE_NAMES["multitask"],
+        "multitask",
+        bundle.state_dict_arrays(model.state_dict()),
+        arch=model.arch(),
+        feature_keys=FEATURE_KEYS,
+        feature_mean=feature_mean,
+        feature_std=feature_std,
+        thresholds=thresholds,
+        metadata={"num_samples": num_samples, "epochs": epochs, "final_loss": epoch_loss},
+    )
+    print(f"[DFY][MT] Multitask 모델 저장: {path} (warn={thresholds['warn_threshold']:.4f}, "
+          f"critical={thresholds['critical_threshold']:.4f})")
+    return {**thresholds, "num_samples": num_samples}
+
+
+if __name__ == "__main__":
+    train_multitask()